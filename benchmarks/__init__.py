@@ -0,0 +1 @@
+"""Benchmarks do painel. Rode cada um com ``python -m benchmarks.<nome> --help``."""
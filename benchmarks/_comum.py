@@ -0,0 +1,25 @@
+"""Utilidades compartilhadas pelos benchmarks."""
+import time
+
+from painel.ingestao import COLUNAS_CATEGORICAS
+from painel.sintetico import gerar_pesquisa
+
+
+def frame_categorico(linhas, colunas=None, seed=0):
+    """Frame do gerador sintético (só as ``colunas`` pedidas, categóricas por padrão), com ~1% de nulos."""
+    return gerar_pesquisa(linhas, seed=seed, colunas=colunas or COLUNAS_CATEGORICAS, nulos=0.01)
+
+
+def cronometrar(funcao, repeticoes=3):
+    """Menor tempo (s) entre ``repeticoes`` execuções e o último resultado."""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def parse_linhas(valores):
+    return [int(float(v)) for v in valores]
@@ -0,0 +1,80 @@
+"""Codificação dos atributos do modelo: vetorizada x lista montada linha a linha.
+
+    python -m benchmarks.bench_codificacao --linhas 1e6
+
+O caminho antigo é o do formulário da aba preditiva aplicado a cada linha
+(lista Python com consultas aos dicts de mapeamento); o novo é
+``CodificadorAtributos.codificar``. Mede também o caminho de uma linha só.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks._comum import cronometrar, frame_categorico, parse_linhas
+from painel.beneficios import LETRAS
+from painel.predicao import CODIFICADOR, MAPEAMENTO, MAPEAMENTO_COR_PESSOA, MAPEAMENTO_SIM_NAO
+
+
+def frame_questionario(linhas, seed=0):
+    colunas = [col for col in CODIFICADOR.colunas if col not in ('Idade', 'Idade em Meses')]
+    df = frame_categorico(linhas, colunas, seed)
+    rng = np.random.default_rng(seed)
+    df['Idade'] = rng.integers(0, 5, linhas)
+    df['Idade em Meses'] = rng.integers(0, 60, linhas)
+    return df
+
+
+def linha_legado(r):
+    resposta = r['Beneficios']
+    beneficios = set() if resposta is None else {parte.strip() for parte in resposta.split(',')} & set(LETRAS)
+    return [
+        r['Idade'],
+        r['Idade em Meses'],
+        MAPEAMENTO["Região"].get(r['Região'], np.nan),
+        MAPEAMENTO["Sexo"].get(r['Sexo'], np.nan),
+        np.nan if r['Tipo de Domicílio'] is None else MAPEAMENTO["Domicílio"].get(r['Tipo de Domicílio'], 3),
+        MAPEAMENTO["Cozinha"].get(r['Possui Cozinha'], np.nan),
+        MAPEAMENTO["Ocupação"].get(r['Ocupação'], np.nan),
+        MAPEAMENTO["Registro"].get(r['Situação do Registro'], np.nan),
+        MAPEAMENTO["Tosse"].get(r['Presença de Tosse'], np.nan),
+        MAPEAMENTO["Respiração"].get(r['Tipo de Respiração'], np.nan),
+        MAPEAMENTO["Escolaridade"].get(r['Nivel Escolaridade'], np.nan),
+        MAPEAMENTO["Renda"].get(r['Faixa de Renda'], np.nan),
+    ] + [1 if letra in beneficios else 0 for letra in LETRAS] + [
+        len(beneficios),
+        MAPEAMENTO_COR_PESSOA.get(r['Cor Pessoa'], np.nan),
+        MAPEAMENTO_SIM_NAO.get(r['Moradores que Alimentaram Acabamento (Sim)'], np.nan),
+        MAPEAMENTO_SIM_NAO.get(r['Moradores que Alimentaram Acabamento (Não)'], np.nan),
+    ]
+
+
+def codificar_legado(df):
+    return np.array([linha_legado(r) for r in df.to_dict('records')], dtype='float32')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', nargs='+', default=['1e6'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'linhas':>12} {'por linha (s)':>14} {'vetorizado (s)':>15} {'ganho':>8} {'linhas/s':>12}")
+    for linhas in parse_linhas(args.linhas):
+        df = frame_questionario(linhas)
+        # nulos (código -1) viram None no legado, como no caminho vetorizado
+        df_objeto = df.astype(object).where(df.notna(), None)
+        t_legado, esperado = cronometrar(lambda: codificar_legado(df_objeto), 1)
+        t_vetor, (obtido, _) = cronometrar(lambda: CODIFICADOR.codificar(df), args.repeticoes)
+        if not np.array_equal(esperado, obtido, equal_nan=True):
+            raise AssertionError("matriz vetorizada difere da montada linha a linha")
+        print(f"{linhas:>12,} {t_legado:>14.3f} {t_vetor:>15.4f} {t_legado / t_vetor:>7.1f}x "
+              f"{linhas / t_vetor:>12,.0f}")
+        del df, df_objeto
+
+    respostas = frame_questionario(1).to_dict('records')[0]
+    t_linha, _ = cronometrar(lambda: CODIFICADOR.codificar_linha(respostas), 1000)
+    print(f"uma linha (formulário): {t_linha * 1e6:.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
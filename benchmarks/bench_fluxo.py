@@ -0,0 +1,65 @@
+"""Memória de pico e vazão da agregação em fluxo por tamanho de bloco.
+
+    python -m benchmarks.bench_fluxo --linhas 2e6 --blocos 5e4 2e5 5e5
+
+Grava um CSV do gerador sintético (``painel.sintetico``) e, para cada
+tamanho de bloco, roda ``agregar_csv`` num processo novo (o pico de RSS de um
+processo só cresce). A última linha é a leitura inteira com ``read_survey``,
+para comparação: o pico do modo em fluxo acompanha o tamanho do bloco, o da
+leitura inteira acompanha o arquivo.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks._comum import parse_linhas
+from painel.sintetico import gravar_csv
+
+
+def _medir(caminho, tamanho_bloco, saida):
+    inicio = time.perf_counter()
+    if tamanho_bloco:
+        from painel.fluxo import agregar_csv
+        agregado, _ = agregar_csv(caminho, tamanho_chunk=tamanho_bloco)
+        celulas = agregado.celulas
+    else:
+        from painel.ingestao import read_survey
+        read_survey(caminho)
+        celulas = 0
+    saida.put((time.perf_counter() - inicio, celulas, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def medir(caminho, tamanho_bloco):
+    """``(segundos, células, pico de RSS em MB)`` num processo novo; ``tamanho_bloco=0`` lê o arquivo inteiro."""
+    contexto = multiprocessing.get_context('spawn')
+    saida = contexto.Queue()
+    processo = contexto.Process(target=_medir, args=(caminho, tamanho_bloco, saida))
+    processo.start()
+    segundos, celulas, pico_kb = saida.get()
+    processo.join()
+    return segundos, celulas, pico_kb / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', default='2e6')
+    parser.add_argument('--blocos', nargs='+', default=['5e4', '2e5', '5e5'])
+    args = parser.parse_args(argv)
+
+    linhas = parse_linhas([args.linhas])[0]
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'pesquisa.csv')
+        gravar_csv(caminho, linhas, nulos=0.01)
+        print(f"{linhas:,} linhas, {os.path.getsize(caminho) / 1e6:.0f} MB em disco")
+        print(f"{'bloco':>12} {'tempo (s)':>10} {'linhas/s':>10} {'células':>9} {'pico (MB)':>10}")
+        for bloco in parse_linhas(args.blocos) + [0]:
+            segundos, celulas, pico = medir(caminho, bloco)
+            rotulo = f"{bloco:>12,}" if bloco else f"{'inteiro':>12}"
+            print(f"{rotulo} {segundos:>10.2f} {linhas / segundos:>10,.0f} {celulas:>9,} {pico:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Escalabilidade da matriz de indicadores (mapa de calor por Região).
+
+    python -m benchmarks.bench_indicadores --linhas 1e6 2e6 4e6 8e6 16e6
+
+Para cada tamanho mostra o tempo, o custo por linha e a razão de tempo em
+relação ao menor tamanho; crescimento linear aparece como ns/linha estável.
+Com ``--legado`` mede também as list comprehensions que filtravam o frame
+uma vez por região e indicador.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks._comum import cronometrar, frame_categorico, parse_linhas
+from painel.cubo import matriz_indicadores
+from painel.recodificacao import recode_scores
+
+MEDIDAS = ['alimentos_score', 'tosse_score', 'cozinha_score']
+
+
+def frame_scores(linhas, seed=0):
+    df = frame_categorico(linhas, ['Região', 'Alimentos Básicos', 'Presença de Tosse', 'Possui Cozinha'], seed)
+    for nome, valores in recode_scores(df).items():
+        df[nome] = valores
+    return df
+
+
+def matriz_legado(df):
+    regioes = df['Região'].dropna().unique()
+    return pd.DataFrame(
+        {m: [df[df['Região'] == r][m].mean() for r in regioes] for m in MEDIDAS},
+        index=regioes,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', nargs='+', default=['1e6', '2e6', '4e6', '8e6', '16e6'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--legado', action='store_true', help="mede também o caminho antigo")
+    args = parser.parse_args(argv)
+
+    cabecalho = f"{'linhas':>12} {'tempo (s)':>10} {'ns/linha':>9} {'x tempo':>8} {'x linhas':>9}"
+    print(cabecalho + (f" {'legado (s)':>11}" if args.legado else ''))
+    base = None
+    for linhas in parse_linhas(args.linhas):
+        df = frame_scores(linhas)
+        tempo, matriz = cronometrar(lambda: matriz_indicadores(df, 'Região', MEDIDAS), args.repeticoes)
+        base = base or (linhas, tempo)
+        linha = (f"{linhas:>12,} {tempo:>10.4f} {tempo / linhas * 1e9:>9.2f} "
+                 f"{tempo / base[1]:>8.2f} {linhas / base[0]:>9.2f}")
+        if args.legado:
+            t_legado, esperado = cronometrar(lambda: matriz_legado(df), 1)
+            esperado = esperado.loc[matriz.index.astype(str)]
+            if not np.allclose(esperado.to_numpy(), matriz.to_numpy()):
+                raise AssertionError("matriz de indicadores difere do caminho antigo")
+            linha += f" {t_legado:>11.3f}"
+        print(linha)
+        del df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Latência de inferência: ``predict_proba`` do scikit-learn x floresta compilada.
+
+    python -m benchmarks.bench_inferencia --lotes 1 100 100000
+
+Treina uma floresta sobre atributos codificados como os do app (mesmo
+codificador, rótulos sorteados) e mede, para cada tamanho de lote, o menor
+tempo dos dois caminhos, conferindo que as probabilidades são idênticas.
+"""
+import argparse
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks._comum import cronometrar, parse_linhas
+from benchmarks.bench_codificacao import frame_questionario
+from painel.arvores import FlorestaCompilada
+from painel.predicao import CODIFICADOR
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lotes', nargs='+', default=['1', '100', '1e5'])
+    parser.add_argument('--arvores', type=int, default=100)
+    parser.add_argument('--treino', default='2e4', help="linhas de treino")
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    X, _ = CODIFICADOR.codificar(frame_questionario(parse_linhas([args.treino])[0], seed=1))
+    X = np.nan_to_num(X)
+    modelo = RandomForestClassifier(n_estimators=args.arvores, random_state=0)
+    modelo.fit(X, rng.integers(1, 7, len(X)))
+    compilada = FlorestaCompilada.de_sklearn(modelo)
+
+    print(f"{'lote':>10} {'sklearn (ms)':>13} {'compilada (ms)':>15} {'ganho':>8}")
+    for lote in parse_linhas(args.lotes):
+        X_lote, _ = CODIFICADOR.codificar(frame_questionario(lote, seed=2))
+        X_lote = np.nan_to_num(X_lote)
+        repeticoes = max(1, args.repeticoes if lote <= 1000 else 3)
+        t_sklearn, esperado = cronometrar(lambda: modelo.predict_proba(X_lote), repeticoes)
+        t_compilada, obtido = cronometrar(lambda: compilada.predict_proba(X_lote), repeticoes)
+        if not np.array_equal(esperado, obtido):
+            raise AssertionError(f"lote {lote}: probabilidades diferentes do scikit-learn")
+        print(f"{lote:>10,} {t_sklearn * 1e3:>13.3f} {t_compilada * 1e3:>15.3f} {t_sklearn / t_compilada:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
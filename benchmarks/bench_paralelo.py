@@ -0,0 +1,67 @@
+"""Cubo em um núcleo (``Cubo.construir``) contra partições num pool de processos.
+
+    python -m benchmarks.bench_paralelo --linhas 1e7 2e7 --processos 4 8 16 32
+
+Para cada tamanho monta um frame já pontuado (``preparar_dataset``) com todas
+as dimensões do cubo e mede a agregação completa e com um filtro de ~40% das
+linhas. ``preparo`` é o custo único por dataset de copiar códigos e medidas
+para a memória compartilhada; o pool é criado (e aquecido) antes da medição,
+como no app. Os cubos de cada configuração são comparados com o de um núcleo.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks._comum import cronometrar, parse_linhas
+from painel.cubo import Cubo
+from painel.filtros import IndiceFiltros
+from painel.paralelo import CuboParticionado, criar_executor
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+
+
+def frame_pontuado(linhas, seed=0):
+    return preparar_dataset(gerar_pesquisa(linhas, seed=seed, nulos=0.01))
+
+
+def conferir(esperado, obtido):
+    for nome in esperado.conjuntos:
+        a, b = esperado.tabela(nome), obtido.tabela(nome)
+        if len(a) != len(b) or not np.array_equal(a['n'].to_numpy(), b['n'].to_numpy()) or not all(
+                np.allclose(a[c].to_numpy(), b[c].to_numpy()) for c in a.columns if c.startswith('soma_')):
+            raise AssertionError(f"cubo particionado difere no conjunto {nome!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', nargs='+', default=['1e7'])
+    parser.add_argument('--processos', nargs='+', type=int, default=[2, 4, 8])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'linhas':>12} {'motor':>12} {'preparo (s)':>12} {'todas (s)':>10} {'filtro (s)':>11} {'x':>6}")
+    for linhas in parse_linhas(args.linhas):
+        df = frame_pontuado(linhas)
+        filtradas = IndiceFiltros(df).selecionar(regioes=['Norte', 'Sul'], faixa_etaria=None,
+                                                 tipos_domicilio=None, acesso_alimentos=None)
+        t_todas, esperado = cronometrar(lambda: Cubo.construir(df), args.repeticoes)
+        t_filtro, esperado_filtro = cronometrar(lambda: Cubo.construir(df, linhas=filtradas), args.repeticoes)
+        print(f"{linhas:>12,} {'numpy':>12} {'-':>12} {t_todas:>10.3f} {t_filtro:>11.3f} {1:>6.2f}")
+        for processos in args.processos:
+            with criar_executor(processos) as executor:
+                list(executor.map(abs, range(processos)))  # sobe os processos fora da medição
+                t_preparo, particionado = cronometrar(
+                    lambda: CuboParticionado(df, executor=executor, processos=processos), 1)
+                t_p_todas, obtido = cronometrar(particionado.construir, args.repeticoes)
+                t_p_filtro, obtido_filtro = cronometrar(lambda: particionado.construir(linhas=filtradas),
+                                                        args.repeticoes)
+                particionado.fechar()
+            conferir(esperado, obtido)
+            conferir(esperado_filtro, obtido_filtro)
+            print(f"{linhas:>12,} {f'{processos} processos':>12} {t_preparo:>12.3f} {t_p_todas:>10.3f} "
+                  f"{t_p_filtro:>11.3f} {t_todas / t_p_todas:>6.2f}")
+        del df
+
+
+if __name__ == '__main__':
+    main()
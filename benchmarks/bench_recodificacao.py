@@ -0,0 +1,76 @@
+"""Recodificação vetorizada x ``Series.apply`` por linha.
+
+    python -m benchmarks.bench_recodificacao --linhas 1e6 1e7 5e7
+
+O caminho ``.apply`` roda sobre colunas ``object`` (como o CSV era lido antes
+do esquema tipado); o vetorizado roda sobre as colunas categóricas. Os
+resultados são comparados elemento a elemento.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks._comum import cronometrar, frame_categorico, parse_linhas
+from painel.recodificacao import RECODIFICACOES
+
+
+# Funções por linha que o app usava antes da tabela declarativa (referência)
+def recode_alimentos(valor):
+    if isinstance(valor, str):
+        if "Sim, sempre" in valor:
+            return 1.0
+        elif "Sim, quase sempre" in valor:
+            return 0.5
+    return 0.0
+
+
+def recode_tosse(valor):
+    if isinstance(valor, str):
+        val = valor.strip().lower()
+        if val == "não":
+            return 1.0
+        elif val == "sim":
+            return 0.0
+    return 0.0
+
+
+def recode_cozinha(valor):
+    if isinstance(valor, str):
+        val = valor.strip().lower()
+        if val == "sim":
+            return 1.0
+        elif val == "não":
+            return 0.0
+    return 0.0
+
+
+LEGADO = {
+    'alimentos_score': recode_alimentos,
+    'tosse_score': recode_tosse,
+    'cozinha_score': recode_cozinha,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', nargs='+', default=['1e6', '1e7', '5e7'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    colunas = [RECODIFICACOES[nome].coluna for nome in LEGADO]
+    print(f"{'linhas':>12} {'score':>16} {'apply (s)':>10} {'vetorizado (s)':>15} {'ganho':>8}")
+    for linhas in parse_linhas(args.linhas):
+        df = frame_categorico(linhas, colunas)
+        for nome, funcao in LEGADO.items():
+            regra = RECODIFICACOES[nome]
+            como_objeto = df[regra.coluna].astype(object)
+            t_apply, esperado = cronometrar(lambda: como_objeto.apply(funcao).to_numpy(), 1)
+            t_vetor, obtido = cronometrar(lambda: regra.aplicar(df[regra.coluna]), args.repeticoes)
+            if not np.array_equal(esperado, obtido):
+                raise AssertionError(f"{nome}: resultado vetorizado difere do .apply")
+            print(f"{linhas:>12,} {nome:>16} {t_apply:>10.3f} {t_vetor:>15.4f} {t_apply / t_vetor:>7.0f}x")
+        del df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Vazão do gerador sintético da pesquisa e gravação em blocos.
+
+    python -m benchmarks.bench_sintetico --linhas 1e6 1e7
+    python -m benchmarks.bench_sintetico --linhas 2e7 --saida pesquisa.parquet
+
+Mede ``gerar_pesquisa`` (todas as colunas) para cada tamanho e confere que a
+mesma semente gera o mesmo frame. Com ``--saida`` grava o maior tamanho em
+Parquet (um row group por bloco) ou CSV, conforme a extensão, sem montar o
+frame inteiro na memória.
+"""
+import argparse
+import os
+import time
+
+from benchmarks._comum import cronometrar, parse_linhas
+from painel.sintetico import TAMANHO_BLOCO, gerar_pesquisa, gravar_csv, gravar_parquet
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', nargs='+', default=['1e6', '1e7'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--nulos', type=float, default=0.0)
+    parser.add_argument('--bloco', default=str(TAMANHO_BLOCO))
+    parser.add_argument('--saida', help="arquivo .parquet ou .csv gerado com o maior tamanho")
+    args = parser.parse_args(argv)
+
+    linhas_testadas = parse_linhas(args.linhas)
+    print(f"{'linhas':>12} {'tempo (s)':>10} {'linhas/s':>12} {'memória (MB)':>13}")
+    for linhas in linhas_testadas:
+        tempo, df = cronometrar(lambda: gerar_pesquisa(linhas, seed=args.seed, nulos=args.nulos), 1)
+        print(f"{linhas:>12,} {tempo:>10.2f} {linhas / tempo:>12,.0f} "
+              f"{df.memory_usage(deep=True).sum() / 1e6:>13.0f}")
+        del df
+    amostra = min(linhas_testadas)
+    if not gerar_pesquisa(amostra, seed=args.seed).equals(gerar_pesquisa(amostra, seed=args.seed)):
+        raise AssertionError("a mesma semente gerou frames diferentes")
+
+    if args.saida:
+        gravar = gravar_parquet if args.saida.endswith('.parquet') else gravar_csv
+        linhas = max(linhas_testadas)
+        inicio = time.perf_counter()
+        gravar(args.saida, linhas, tamanho_bloco=parse_linhas([args.bloco])[0], seed=args.seed, nulos=args.nulos)
+        segundos = time.perf_counter() - inicio
+        print(f"{args.saida}: {linhas:,} linhas em {segundos:.1f}s, {os.path.getsize(args.saida) / 1e6:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Núcleo de dados do painel de desnutrição infantil (leitura, scores, agregações)."""
@@ -0,0 +1,59 @@
+"""Abas com cálculo preguiçoso: só a aba ativa (ou as pré-carregadas) trabalha.
+
+Cada aba separa o preparo (dados e figuras, sem chamadas ``st.*``) da
+renderização. O preparo é memorizado por aba na sessão com a assinatura do
+estado (dataset + filtros): trocar de aba sem mexer nos filtros não recalcula
+nada, e as abas que não estão à vista não custam nada.
+
+Com uma ``Instrumentacao``, o preparo e a renderização de cada aba viram etapas medidas.
+"""
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Aba:
+    id: str
+    titulo: str
+    preparar: object  # () -> dados
+    renderizar: object  # (dados) -> None
+
+
+class PainelAbas:
+    def __init__(self, abas, sessao, chave_memo='_memo_abas', instrumentacao=None):
+        self.abas = {aba.id: aba for aba in abas}
+        self.sessao = sessao  # st.session_state ou qualquer MutableMapping
+        self.chave_memo = chave_memo
+        self.instrumentacao = instrumentacao
+
+    def _etapa(self, nome):
+        return nullcontext() if self.instrumentacao is None else self.instrumentacao.etapa(nome)
+
+    @property
+    def titulos(self):
+        return {aba.id: aba.titulo for aba in self.abas.values()}
+
+    def _memo(self):
+        if self.chave_memo not in self.sessao:
+            self.sessao[self.chave_memo] = {}
+        return self.sessao[self.chave_memo]
+
+    def dados(self, id_aba, assinatura):
+        """Resultado do preparo da aba, recalculado só quando a assinatura muda."""
+        memo = self._memo()
+        anterior = memo.get(id_aba)
+        if anterior is not None and anterior[0] == assinatura:
+            return anterior[1]
+        with self._etapa(f"aba/{id_aba}/preparar"):
+            dados = self.abas[id_aba].preparar()
+        memo[id_aba] = (assinatura, dados)
+        return dados
+
+    def executar(self, ativa, assinatura, prefetch=()):
+        """Renderiza a aba ativa e só prepara (sem desenhar) as abas em ``prefetch``."""
+        dados = self.dados(ativa, assinatura)
+        with self._etapa(f"aba/{ativa}/renderizar"):
+            self.abas[ativa].renderizar(dados)
+        for id_aba in prefetch:
+            if id_aba != ativa:
+                self.dados(id_aba, assinatura)
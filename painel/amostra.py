@@ -0,0 +1,116 @@
+"""Amostra estratificada e cubo estimado para a prévia dos gráficos.
+
+A amostra é sorteada uma vez por dataset, por estrato ``Região`` x ``Faixa de
+Renda`` (nulos formam um estrato próprio), com alocação proporcional e um
+mínimo por estrato para que grupos pequenos apareçam na prévia. Cada linha
+sorteada pesa ``N_h / n_h`` do seu estrato.
+
+``cubo_amostral`` devolve um ``CuboAmostral`` com as mesmas tabelas do cubo
+exato: ``n`` é a contagem estimada (soma dos pesos, arredondada) e as somas são
+ajustadas para que ``soma / n`` seja a média ponderada, então todos os
+consumidores do cubo funcionam sem mudança. Cada tabela traz também
+``n_amostra`` e ``erro_<medida>``, a meia largura do intervalo de 95% da média
+(variância ponderada com correção de população finita).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from painel.cubo import CONJUNTOS, MEDIDAS, Cubo, codificar
+
+ESTRATOS = ('Região', 'Faixa de Renda')
+TAMANHO_AMOSTRA = 50_000
+MIN_POR_ESTRATO = 30
+Z_95 = 1.959964
+
+
+@dataclass
+class Amostra:
+    posicoes: np.ndarray  # posições sorteadas, em ordem crescente
+    pesos: np.ndarray  # N_h / n_h de cada posição
+    linhas: int  # tamanho da população
+    estratos: int  # estratos não vazios
+
+
+def amostra_estratificada(df, tamanho=TAMANHO_AMOSTRA, estratos=ESTRATOS, minimo=MIN_POR_ESTRATO, seed=0):
+    """Sorteia ~``tamanho`` linhas de ``df`` sem reposição, proporcional a cada estrato (mínimo ``minimo``)."""
+    linhas = len(df)
+    estrato = np.zeros(linhas, dtype='int64')
+    for coluna in estratos:
+        codigos, categorias = codificar(df[coluna])
+        estrato = estrato * (len(categorias) + 1) + np.where(codigos < 0, len(categorias), codigos)
+    rotulos, estrato = np.unique(estrato, return_inverse=True)
+    tamanhos = np.bincount(estrato, minlength=len(rotulos))
+    alocacao = np.clip(np.rint(tamanho * tamanhos / max(linhas, 1)).astype('int64'), minimo, tamanhos)
+
+    rng = np.random.default_rng(seed)
+    ordem = np.argsort(estrato, kind='stable')
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    posicoes, pesos = [], []
+    for inicio, total, sorteio in zip(inicios, tamanhos, alocacao):
+        escolhidas = ordem[inicio + rng.choice(total, sorteio, replace=False)]
+        posicoes.append(escolhidas)
+        pesos.append(np.full(sorteio, total / sorteio))
+    posicoes = np.concatenate(posicoes) if posicoes else np.zeros(0, dtype='int64')
+    pesos = np.concatenate(pesos) if pesos else np.zeros(0)
+    ordem = np.argsort(posicoes)
+    return Amostra(posicoes[ordem], pesos[ordem], linhas, len(rotulos))
+
+
+class CuboAmostral(Cubo):
+    def __init__(self, tabelas, conjuntos, medidas, amostra):
+        super().__init__(tabelas, conjuntos, medidas)
+        self.linhas_amostra = amostra  # linhas da amostra que passaram nos filtros
+
+    def erro(self, nome, medida='indice_desenvolvimento'):
+        """Meia largura do IC de 95% da média de ``medida``, na ordem das linhas de ``media(nome)``."""
+        return self.tabelas[nome]['erro_' + medida].to_numpy()
+
+
+def margem_erro(cubo, nome, medida='indice_desenvolvimento'):
+    """``cubo.erro(...)`` para um ``CuboAmostral``; ``None`` para o cubo exato (sem barras de erro)."""
+    return cubo.erro(nome, medida) if isinstance(cubo, CuboAmostral) else None
+
+
+def cubo_amostral(df, amostra, linhas=None, conjuntos=None, medidas=MEDIDAS):
+    """``CuboAmostral`` estimado a partir da ``amostra`` (só as posições também em ``linhas``, se dadas)."""
+    conjuntos = CONJUNTOS if conjuntos is None else conjuntos
+    posicoes, pesos = amostra.posicoes, amostra.pesos
+    if linhas is not None:
+        selecionadas = np.zeros(amostra.linhas, dtype=bool)
+        selecionadas[linhas] = True
+        manter = selecionadas[posicoes]
+        posicoes, pesos = posicoes[manter], pesos[manter]
+
+    dims = sorted({d for conjunto in conjuntos.values() for d in conjunto})
+    parte = {d: df[d].take(posicoes).reset_index(drop=True) for d in dims}
+    parte['peso'] = pesos
+    for m in medidas:
+        valores = df[m].to_numpy(dtype='float64')[posicoes]
+        parte['ponderada_' + m] = valores * pesos
+        parte['quadrado_' + m] = valores * valores * pesos
+    colunas = ['peso'] + [p + m for p in ('ponderada_', 'quadrado_') for m in medidas]
+    base = Cubo.construir(pd.DataFrame(parte), conjuntos, medidas=colunas)
+
+    tabelas = {}
+    for nome, tabela in base.tabelas.items():
+        n_amostra = tabela['n'].to_numpy()
+        peso = tabela['soma_peso'].to_numpy()
+        n = np.maximum(np.rint(peso), 1).astype('int64')
+        saida = tabela[list(conjuntos[nome])].copy()
+        saida['n'] = n
+        erros = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fracao = np.clip(1 - n_amostra / peso, 0, 1)
+            for m in medidas:
+                media = tabela['soma_ponderada_' + m].to_numpy() / peso
+                saida['soma_' + m] = media * n
+                variancia = np.maximum(tabela['soma_quadrado_' + m].to_numpy() / peso - media * media, 0)
+                erro = Z_95 * np.sqrt(variancia * fracao / n_amostra)
+                erros['erro_' + m] = np.where(n_amostra > 1, erro, np.nan)
+        saida['n_amostra'] = n_amostra
+        for coluna, erro in erros.items():
+            saida[coluna] = erro
+        tabelas[nome] = saida
+    return CuboAmostral(tabelas, dict(conjuntos), medidas, len(posicoes))
@@ -0,0 +1,215 @@
+"""Armazenamento em disco dos CSVs já normalizados, compartilhado entre processos.
+
+Cada upload é identificado pelo hash do conteúdo. Na primeira vez o frame
+tipado (saída de ``read_survey``) é gravado em Feather/Parquet; sessões e
+réplicas seguintes mapeiam o arquivo em memória em vez de reprocessar o CSV.
+O diretório tem tamanho máximo e descarta primeiro os arquivos usados há mais
+tempo (LRU pelo ``mtime``, atualizado a cada leitura).
+
+O mesmo diretório guarda os agregados somáveis (``AgregadoFluxo``) de cada
+dataset ou cadeia de ondas, sob o mesmo limite de tamanho. Como outras
+réplicas escrevem ali, os agregados não usam pickle: cada um é um zip com os
+metadados em JSON e uma tabela Parquet por conjunto, formatos que só carregam
+dados.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass
+
+import pandas as pd
+
+from painel.fluxo import AgregadoFluxo
+
+# Muda sempre que a normalização (esquema de leitura) mudar, invalidando o cache antigo
+VERSAO_FORMATO = 1
+FORMATOS = {'feather': '.feather', 'parquet': '.parquet'}
+# Muda sempre que os scores ou os conjuntos do cubo mudarem, invalidando os agregados gravados
+VERSAO_AGREGADO = 3
+SUFIXO_AGREGADO = f'.agregado-v{VERSAO_AGREGADO}.zip'
+TAMANHO_BLOCO = 1 << 20
+
+
+@dataclass
+class RelatorioArmazenamento:
+    """Frame servido pelo ``DatasetStore``: nenhum CSV foi lido (compare ``RelatorioIngestao``)."""
+    formato: str  # 'feather' ou 'parquet'
+    linhas: int
+    bytes_disco: int
+    bytes_memoria: int
+    segundos: float  # tempo para abrir o arquivo do store
+    origem: str = 'cache'
+
+
+def content_hash(file):
+    """Hash do conteúdo de um caminho ou objeto arquivo (volta o cursor ao início)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{VERSAO_FORMATO}".encode())
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b''):
+                h.update(bloco)
+        return h.hexdigest()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    for bloco in iter(lambda: file.read(TAMANHO_BLOCO), b''):
+        h.update(bloco)
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return h.hexdigest()
+
+
+class DatasetStore:
+    def __init__(self, raiz, max_bytes, formato='feather'):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconhecido: {formato!r} (opções: {', '.join(FORMATOS)})")
+        self.raiz = os.fspath(raiz)
+        self.max_bytes = int(max_bytes)
+        self.formato = formato
+        os.makedirs(self.raiz, exist_ok=True)
+
+    def caminho(self, chave):
+        return os.path.join(self.raiz, chave + FORMATOS[self.formato])
+
+    def __contains__(self, chave):
+        return os.path.exists(self.caminho(chave))
+
+    def get(self, chave):
+        """Frame armazenado para ``chave`` ou ``None``; marca a entrada como usada."""
+        caminho = self.caminho(chave)
+        try:
+            if self.formato == 'feather':
+                from pyarrow import feather
+                tabela = feather.read_table(caminho, memory_map=True)
+            else:
+                import pyarrow.parquet as pq
+                tabela = pq.read_table(caminho, memory_map=True)
+            os.utime(caminho)
+        except FileNotFoundError:  # removido por outra réplica entre o teste e a leitura
+            return None
+        return tabela.to_pandas(split_blocks=True, self_destruct=True)
+
+    def put(self, chave, df):
+        """Grava ``df`` de forma atômica e aplica o limite de tamanho."""
+        destino = self.caminho(chave)
+        fd, temporario = tempfile.mkstemp(dir=self.raiz, suffix='.tmp')
+        os.close(fd)
+        try:
+            df = df.reset_index(drop=True)
+            if self.formato == 'feather':
+                # sem compressão para que a leitura possa usar o arquivo mapeado sem descompactar
+                df.to_feather(temporario, compression='uncompressed')
+            else:
+                df.to_parquet(temporario, compression='zstd', index=False)
+            os.chmod(temporario, 0o644)  # mkstemp cria 0600; outras réplicas precisam ler
+            os.replace(temporario, destino)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        self.evict(manter=chave)
+        return destino
+
+    def caminho_agregado(self, chave):
+        return os.path.join(self.raiz, chave + SUFIXO_AGREGADO)
+
+    def get_agregado(self, chave):
+        """Agregado gravado para ``chave`` ou ``None``; marca a entrada como usada."""
+        caminho = self.caminho_agregado(chave)
+        try:
+            with zipfile.ZipFile(caminho) as arquivo:
+                metadados = json.loads(arquivo.read('agregado.json'))
+                tabelas = {
+                    nome: pd.read_parquet(io.BytesIO(arquivo.read(f'tabelas/{i}.parquet')))
+                    for i, nome in enumerate(metadados['tabelas'])
+                }
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        return AgregadoFluxo.de_estado(metadados, tabelas)
+
+    def put_agregado(self, chave, agregado):
+        destino = self.caminho_agregado(chave)
+        metadados, tabelas = agregado.estado()
+        metadados['tabelas'] = list(tabelas)
+        fd, temporario = tempfile.mkstemp(dir=self.raiz, suffix='.tmp')
+        try:
+            # as tabelas Parquet já vêm comprimidas; o zip só as agrupa
+            with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as arquivo:
+                arquivo.writestr('agregado.json', json.dumps(metadados, ensure_ascii=False))
+                for i, tabela in enumerate(tabelas.values()):
+                    buffer = io.BytesIO()
+                    tabela.to_parquet(buffer, compression='zstd', index=False)
+                    arquivo.writestr(f'tabelas/{i}.parquet', buffer.getvalue())
+            os.chmod(temporario, 0o644)
+            os.replace(temporario, destino)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        self.evict(manter=chave)
+        return destino
+
+    def entradas(self):
+        """Lista ``(mtime, bytes, caminho)`` das entradas (datasets e agregados), da menos para a mais recente."""
+        sufixos = (FORMATOS[self.formato], SUFIXO_AGREGADO)
+        itens = []
+        for nome in os.listdir(self.raiz):
+            if not nome.endswith(sufixos):
+                continue
+            caminho = os.path.join(self.raiz, nome)
+            try:
+                info = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            itens.append((info.st_mtime, info.st_size, caminho))
+        return sorted(itens)
+
+    def tamanho_total(self):
+        return sum(tamanho for _, tamanho, _ in self.entradas())
+
+    def evict(self, manter=None):
+        """Remove as entradas menos usadas até caber em ``max_bytes``."""
+        entradas = self.entradas()
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        protegidos = {self.caminho(manter), self.caminho_agregado(manter)} if manter else set()
+        removidos = []
+        for _, tamanho, caminho in entradas:
+            if total <= self.max_bytes:
+                break
+            if caminho in protegidos:
+                continue
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+            removidos.append(caminho)
+        return removidos
+
+
+def load_or_ingest(store, file, ler):
+    """Devolve ``(df, relatorio, chave)`` lendo do store ou chamando ``ler(file)`` e gravando o resultado.
+
+    ``relatorio`` é um ``RelatorioArmazenamento`` quando o frame veio do store
+    e o ``RelatorioIngestao`` de ``ler`` quando o CSV foi lido; ``origem``
+    ('cache' ou 'csv') distingue os dois.
+    """
+    chave = content_hash(file)
+    inicio = time.perf_counter()
+    df = store.get(chave)
+    if df is not None:
+        bytes_disco = os.path.getsize(store.caminho(chave)) if chave in store else 0
+        relatorio = RelatorioArmazenamento(
+            formato=store.formato,
+            linhas=len(df),
+            bytes_disco=bytes_disco,
+            bytes_memoria=int(df.memory_usage(deep=True, index=False).sum()),
+            segundos=time.perf_counter() - inicio,
+        )
+        return df, relatorio, chave
+    df, relatorio = ler(file)
+    store.put(chave, df)
+    return df, relatorio, chave
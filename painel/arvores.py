@@ -0,0 +1,133 @@
+"""Inferência compilada para florestas de árvores do scikit-learn.
+
+As árvores de um ``RandomForestClassifier`` treinado são achatadas em arrays
+NumPy globais (filho esquerdo/direito, atributo, limiar e probabilidades por
+nó). A predição percorre todas as árvores de um lote ao mesmo tempo, um nível
+por iteração, sem o custo fixo por chamada do ``predict_proba`` do
+scikit-learn (validação, joblib, uma chamada por árvore). Compensa em lotes
+pequenos — em especial na linha única do formulário; em lotes grandes o
+caminho em Cython do scikit-learn continua mais rápido.
+
+As comparações e a soma das árvores seguem a mesma ordem e precisão do
+scikit-learn (entrada convertida para float32, limiar float64, soma árvore a
+árvore e divisão pelo número de árvores), então as probabilidades são
+idênticas bit a bit. As probabilidades de cada folha também saem como no
+``predict_proba`` da árvore da versão instalada: até o scikit-learn 1.3
+``tree_.value`` guarda contagens e toda linha é dividida pela sua soma; a
+partir do 1.4 guarda as frações, usadas sem nova divisão.
+"""
+import re
+
+import numpy as np
+
+# linhas × árvores por bloco de travessia (limita a memória dos índices de nó)
+ELEMENTOS_POR_BLOCO = 1 << 22
+# No modo automático, lotes até este tamanho usam a floresta compilada
+LIMITE_LOTE_COMPILADO = 256
+
+
+def arvore_normaliza():
+    """O ``predict_proba`` da árvore instalada divide cada linha pela soma (scikit-learn < 1.4)."""
+    import sklearn
+
+    versao = tuple(int(parte) for parte in re.findall(r'\d+', sklearn.__version__)[:2])
+    return versao < (1, 4)
+
+
+def escolher_motor(modelo, compilada, linhas):
+    """Modelo a usar no modo automático para um lote de ``linhas`` (``compilada`` pode ser ``None``)."""
+    return compilada if compilada is not None and linhas <= LIMITE_LOTE_COMPILADO else modelo
+
+
+class FlorestaCompilada:
+    def __init__(self, esquerda, direita, atributo, limiar, faltante_esquerda, probabilidades, raizes, classes):
+        self.esquerda = esquerda
+        self.direita = direita
+        self.atributo = atributo
+        self.limiar = limiar
+        self.faltante_esquerda = faltante_esquerda  # NaN vai para a esquerda neste nó
+        self.probabilidades = probabilidades
+        self.raizes = raizes
+        self.classes_ = classes
+        self.folha = esquerda == np.arange(len(esquerda))
+
+    @classmethod
+    def de_sklearn(cls, modelo):
+        """Achata um classificador de floresta (ou uma árvore) treinado, com uma única saída."""
+        estimadores = getattr(modelo, 'estimators_', None)
+        if estimadores is None:
+            estimadores = [modelo]
+        if getattr(modelo, 'n_outputs_', 1) != 1:
+            raise ValueError("Só florestas com uma única saída podem ser compiladas")
+        n_classes = len(modelo.classes_)
+        normalizar = arvore_normaliza()
+        partes = {nome: [] for nome in ('esquerda', 'direita', 'atributo', 'limiar', 'faltante', 'prob')}
+        raizes, inicio = [], 0
+        for estimador in estimadores:
+            arvore = estimador.tree_
+            n = arvore.node_count
+            folha = arvore.children_left == -1
+            proprio = np.arange(inicio, inicio + n)
+            # folhas apontam para si mesmas (é assim que são reconhecidas no array global)
+            partes['esquerda'].append(np.where(folha, proprio, arvore.children_left + inicio))
+            partes['direita'].append(np.where(folha, proprio, arvore.children_right + inicio))
+            partes['atributo'].append(np.where(folha, 0, arvore.feature))
+            partes['limiar'].append(arvore.threshold)
+            faltante = getattr(arvore, 'missing_go_to_left', None)
+            partes['faltante'].append(np.zeros(n, dtype=bool) if faltante is None else faltante.astype(bool))
+            valores = arvore.value[:, 0, :n_classes]
+            if normalizar:
+                # a mesma conta do predict_proba da árvore: divide pela soma da linha, soma zero vira 1
+                soma = valores.sum(axis=1, keepdims=True)
+                soma[soma == 0.0] = 1.0
+                valores = valores / soma
+            partes['prob'].append(valores)
+            raizes.append(inicio)
+            inicio += n
+        return cls(
+            np.concatenate(partes['esquerda']).astype(np.int32),
+            np.concatenate(partes['direita']).astype(np.int32),
+            np.concatenate(partes['atributo']).astype(np.int32),
+            np.concatenate(partes['limiar']).astype(np.float64),
+            np.concatenate(partes['faltante']),
+            np.ascontiguousarray(np.concatenate(partes['prob']), dtype=np.float64),
+            np.array(raizes, dtype=np.int32),
+            np.asarray(modelo.classes_),
+        )
+
+    @property
+    def n_arvores(self):
+        return len(self.raizes)
+
+    def folhas(self, X):
+        """Índice global da folha de cada linha em cada árvore: ``(linhas, árvores)``."""
+        X = np.asarray(X, dtype=np.float32)
+        nos = np.broadcast_to(self.raizes, (len(X), self.n_arvores)).ravel().copy()
+        # só os pares (linha, árvore) que ainda não chegaram a uma folha descem mais um nível
+        ativos = np.flatnonzero(~self.folha[nos])
+        tem_faltantes = self.faltante_esquerda.any() and np.isnan(X).any()
+        while len(ativos):
+            atuais = nos[ativos]
+            valores = X[ativos // self.n_arvores, self.atributo[atuais]]
+            vai_esquerda = valores <= self.limiar[atuais]
+            if tem_faltantes:
+                vai_esquerda |= np.isnan(valores) & self.faltante_esquerda[atuais]
+            proximos = np.where(vai_esquerda, self.esquerda[atuais], self.direita[atuais])
+            nos[ativos] = proximos
+            ativos = ativos[~self.folha[proximos]]
+        return nos.reshape(len(X), self.n_arvores)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        saida = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        bloco = max(1, ELEMENTOS_POR_BLOCO // max(self.n_arvores, 1))
+        for inicio in range(0, len(X), bloco):
+            nos = self.folhas(X[inicio:inicio + bloco])
+            parcial = saida[inicio:inicio + bloco]
+            for t in range(self.n_arvores):  # mesma ordem de soma do scikit-learn
+                parcial += self.probabilidades[nos[:, t]]
+        saida /= self.n_arvores
+        return saida
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,72 @@
+"""Benefícios recebidos: codificação multi-hot da coluna "Beneficios".
+
+A resposta guarda letras separadas por vírgula ("A", "A,F" ou vazio). Cada
+resposta distinta é lida uma única vez e vira uma máscara de bits (bit ``i`` =
+benefício ``LETRAS[i]``); a coluna inteira sai de uma consulta pelos códigos
+de categoria, com 1 byte por linha. A matriz 0/1 e as agregações por
+benefício são derivadas dessa máscara.
+"""
+import numpy as np
+import pandas as pd
+
+BENEFICIOS = {
+    "Programa Bolsa Família (PBF)": "A",
+    "Benefício de Prestação Continuada (BPC/LOAS)": "B",
+    "Bolsa ou benefício da Prefeitura Municipal": "C",
+    "Bolsa ou benefício do Governo do Estado": "D",
+    "Pensão": "E",
+    "Aposentadoria": "F",
+    "Outro benefício": "G"
+}
+LETRAS = tuple(BENEFICIOS.values())
+NOMES = {letra: nome for nome, letra in BENEFICIOS.items()}
+COLUNA_BENEFICIOS = 'Beneficios'
+COLUNA_MASCARA = 'beneficios_mascara'
+
+_BITS = {letra: 1 << i for i, letra in enumerate(LETRAS)}
+_POPCOUNT = np.array([bin(m).count('1') for m in range(256)], dtype=np.uint8)
+
+
+def mascara_resposta(resposta):
+    """Máscara de uma única resposta ("A,F" -> bits de A e F); nula, vazia ou letras desconhecidas = 0."""
+    if resposta is None or (isinstance(resposta, float) and np.isnan(resposta)):
+        return 0
+    mascara = 0
+    for parte in str(resposta).split(','):
+        mascara |= _BITS.get(parte.strip(), 0)
+    return mascara
+
+
+def mascara_beneficios(serie):
+    """Máscara uint8 por linha para a coluna inteira, lendo cada resposta distinta uma vez."""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+    # a última posição atende o código -1 (nulo)
+    por_categoria = np.array([mascara_resposta(c) for c in serie.cat.categories] + [0], dtype=np.uint8)
+    return por_categoria[serie.cat.codes.to_numpy()]
+
+
+def matriz_beneficios(mascaras):
+    """Matriz uint8 linhas × ``LETRAS`` com 1 onde o benefício foi marcado."""
+    mascaras = np.asarray(mascaras, dtype=np.uint8)
+    return (mascaras[:, None] >> np.arange(len(LETRAS), dtype=np.uint8)) & 1
+
+
+def total_beneficios(mascaras):
+    return _POPCOUNT[np.asarray(mascaras, dtype=np.uint8)]
+
+
+def resumo_por_beneficio(mascaras, n, somas):
+    """Rola contagens e somas por combinação de benefícios (ex. uma tabela do cubo) para cada benefício.
+
+    ``mascaras`` e ``n`` têm uma posição por combinação; ``somas`` é ``{medida: array}``.
+    Uma criança com vários benefícios conta em cada um deles.
+    """
+    bits = matriz_beneficios(mascaras).T
+    resumo = pd.DataFrame({
+        'Benefício': [NOMES[letra] for letra in LETRAS],
+        'n': bits.astype('int64') @ np.asarray(n, dtype='int64'),
+    })
+    for medida, soma in somas.items():
+        resumo['soma_' + medida] = bits.astype('float64') @ np.asarray(soma, dtype='float64')
+    return resumo
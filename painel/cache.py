@@ -0,0 +1,79 @@
+"""Cache LRU em memória, limitado por itens e/ou bytes, com contadores de uso.
+
+Seguro para uso entre sessões do Streamlit (instância compartilhada via
+``st.cache_resource``): todas as operações passam por um lock.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class EstatisticasCache:
+    acertos: int
+    falhas: int
+    remocoes: int
+    itens: int
+    bytes: int
+
+    @property
+    def taxa_acerto(self):
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+
+class CacheLRU:
+    def __init__(self, max_itens=None, max_bytes=None, tamanho=len):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.tamanho = tamanho  # valor -> bytes ocupados
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, chave):
+        return chave in self._itens
+
+    def get(self, chave, padrao=None):
+        """Valor de ``chave`` (marcado como recente) ou ``padrao``; conta acerto/falha."""
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave][0]
+            self.falhas += 1
+            return padrao
+
+    def put(self, chave, valor):
+        tamanho = self.tamanho(valor)
+        with self._lock:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            self._aplicar_limites()
+
+    def _aplicar_limites(self):
+        # o item recém-inserido (último) nunca é removido, mesmo que sozinho passe do limite
+        while len(self._itens) > 1 and (
+            (self.max_itens is not None and len(self._itens) > self.max_itens)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, tamanho) = self._itens.popitem(last=False)
+            self._bytes -= tamanho
+            self.remocoes += 1
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            return EstatisticasCache(self.acertos, self.falhas, self.remocoes, len(self._itens), self._bytes)
@@ -0,0 +1,116 @@
+"""Aba de comparação entre regiões e dimensões: dados do cubo e renderizadores.
+
+Os quatro painéis (região; escolaridade, renda e cor cruzadas com região)
+usam as médias já agregadas no cubo; com o cubo estimado da prévia, as médias
+trazem a coluna ``erro`` e os pontos ganham barras de erro. A versão interativa é Plotly; a
+exportação PNG estática desenha o mesmo conteúdo com matplotlib/seaborn, que
+só são importados quando ela é pedida, numa ``Figure`` sem pyplot (nada fica
+registrado no estado global nem vaza entre reruns).
+"""
+import io
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from painel.amostra import margem_erro
+
+# (conjunto do cubo, coluna no eixo das categorias, título)
+PAINEIS = (
+    ('regiao', 'Região', "Índice de Desenvolvimento por Região"),
+    ('regiao_escolaridade', 'Nivel Escolaridade', "Escolaridade x Região"),
+    ('regiao_renda', 'Faixa de Renda', "Faixa de Renda x Região"),
+    ('regiao_cor', 'Cor Pessoa', "Cor da Pessoa x Região"),
+)
+COLUNA_REGIAO = 'Região'
+
+
+def _medias(cubo, conjunto):
+    medias = cubo.media(conjunto)
+    erro = margem_erro(cubo, conjunto)
+    if erro is not None:
+        medias['erro'] = erro
+    return medias
+
+
+def dados_comparacao(cubo):
+    """``{'media_geral': float, 'paineis': [(título, coluna, médias)]}`` a partir do cubo filtrado."""
+    return {
+        'media_geral': cubo.media_geral(),
+        'paineis': [(titulo, coluna, _medias(cubo, conjunto)) for conjunto, coluna, titulo in PAINEIS],
+    }
+
+
+def _barras_erro(medias):
+    return dict(type='data', array=medias['erro'], thickness=1) if 'erro' in medias else None
+
+
+def _regioes(dados):
+    for _, coluna, medias in dados['paineis']:
+        if coluna == COLUNA_REGIAO:
+            return [str(r) for r in medias[COLUNA_REGIAO]]
+    return []
+
+
+def figura_comparacao(dados, paleta):
+    """Figura Plotly com os quatro painéis lado a lado e a média geral tracejada."""
+    titulos = [titulo for titulo, _, _ in dados['paineis']]
+    fig = make_subplots(rows=1, cols=len(titulos), subplot_titles=titulos, horizontal_spacing=0.12)
+    cores = {regiao: paleta[i % len(paleta)] for i, regiao in enumerate(_regioes(dados))}
+    legenda = set()
+    for i, (_, coluna, medias) in enumerate(dados['paineis'], start=1):
+        if coluna == COLUNA_REGIAO:
+            fig.add_trace(go.Scatter(
+                x=medias['indice_medio'], y=medias[coluna].astype(str), mode='markers',
+                error_x=_barras_erro(medias), marker=dict(color=paleta[0], size=10), name="Região", showlegend=False,
+                hovertemplate="%{y}: %{x:.3f}<extra></extra>"
+            ), row=1, col=i)
+            continue
+        for regiao, grupo in medias.groupby(COLUNA_REGIAO, observed=True):
+            regiao = str(regiao)
+            fig.add_trace(go.Scatter(
+                x=grupo['indice_medio'], y=grupo[coluna].astype(str), mode='markers',
+                error_x=_barras_erro(grupo), marker=dict(color=cores.get(regiao), size=9, opacity=0.85), name=regiao,
+                legendgroup=regiao, showlegend=regiao not in legenda,
+                hovertemplate=f"{regiao}<br>%{{y}}: %{{x:.3f}}<extra></extra>"
+            ), row=1, col=i)
+            legenda.add(regiao)
+    media_geral = dados['media_geral']
+    if media_geral == media_geral:  # sem linhas filtradas a média é NaN
+        for i in range(1, len(titulos) + 1):
+            fig.add_vline(x=media_geral, line_dash='dash', line_color='red', row=1, col=i)
+        fig.add_annotation(text=f"Média Geral = {media_geral:.2f}", xref='paper', yref='paper', x=0, y=-0.18,
+                           showarrow=False, font=dict(color='red'))
+    fig.update_xaxes(title_text="Índice de Desenvolvimento")
+    fig.update_layout(
+        height=480,
+        font=dict(family="Inter", size=12),
+        plot_bgcolor="white",
+        legend=dict(orientation="h", yanchor="top", y=-0.22, xanchor="center", x=0.5, title="Região")
+    )
+    return fig
+
+
+def png_comparacao(dados, dpi=100):
+    """PNG dos quatro painéis com ``sns.stripplot`` (matplotlib/seaborn importados só aqui)."""
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(22, 5))
+    axes = fig.subplots(nrows=1, ncols=len(dados['paineis']))
+    media_geral = dados['media_geral']
+    for ax, (titulo, coluna, medias) in zip(axes, dados['paineis']):
+        if coluna == COLUNA_REGIAO:
+            sns.stripplot(data=medias, x='indice_medio', y=coluna, ax=ax, color='blue')
+            ax.axvline(media_geral, linestyle='--', color='red', label=f'Média Geral = {media_geral:.2f}')
+        else:
+            sns.stripplot(data=medias, x='indice_medio', y=coluna, hue=COLUNA_REGIAO, ax=ax)
+            ax.axvline(media_geral, linestyle='--', color='red')
+            ax.set_ylabel("")
+        ax.set_title(titulo)
+        ax.set_xlabel("Índice de Desenvolvimento")
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), fancybox=True)
+    fig.tight_layout()
+    saida = io.BytesIO()
+    fig.savefig(saida, format='png', dpi=dpi)
+    return saida.getvalue()
@@ -0,0 +1,170 @@
+"""Cubo de agregação: soma e contagem por conjunto de dimensões numa única varredura.
+
+As dimensões são convertidas uma vez em códigos inteiros; cada conjunto de
+agrupamento (estilo ``GROUPING SETS``) vira uma chave combinada desses
+códigos e é agregado com ``np.bincount``, sem novos ``groupby`` sobre o frame.
+Todos os gráficos leem médias e contagens do cubo.
+"""
+import numpy as np
+import pandas as pd
+
+MEDIDAS = ('indice_desenvolvimento', 'alimentos_score', 'tosse_score', 'cozinha_score')
+
+# nome -> dimensões; () é o total geral
+CONJUNTOS = {
+    'total': (),
+    'regiao': ('Região',),
+    'escolaridade': ('Nivel Escolaridade',),
+    'renda': ('Faixa de Renda',),
+    'cor': ('Cor Pessoa',),
+    'domicilio': ('Tipo de Domicílio',),
+    'regiao_escolaridade': ('Região', 'Nivel Escolaridade'),
+    'regiao_renda': ('Região', 'Faixa de Renda'),
+    'regiao_cor': ('Região', 'Cor Pessoa'),
+    'regiao_faixa_domicilio': ('Região', 'FaixaEtaria', 'Tipo de Domicílio'),
+    'renda_alimentos': ('Faixa de Renda', 'Alimentos Básicos'),
+    'domicilio_cozinha': ('Tipo de Domicílio', 'Possui Cozinha'),
+    # uma linha por combinação de benefícios; painel.beneficios.resumo_por_beneficio rola por benefício
+    'beneficios': ('beneficios_mascara',),
+    # contagem por valor distinto do score: boxplot e correlação sem as linhas (painel.distribuicao)
+    'ocupacao_indice': ('Ocupação', 'indice_desenvolvimento'),
+    'scores': ('alimentos_score', 'cozinha_score', 'tosse_score'),
+}
+
+# Acima disso a chave combinada é compactada com factorize em vez de indexar direto no bincount
+LIMITE_CHAVES_DENSAS = 1 << 22
+
+
+def codificar(serie):
+    """``(códigos int64, categorias)`` de uma coluna; nulos viram -1."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy().astype('int64'), serie.cat.categories
+    codigos, categorias = pd.factorize(serie, sort=True, use_na_sentinel=True)
+    return codigos.astype('int64'), pd.Index(categorias)
+
+
+def agregar_chaves(chaves, n_chaves, valores):
+    """Contagem e somas por chave (0..n_chaves-1): ``(n, {medida: soma})``."""
+    n = np.bincount(chaves, minlength=n_chaves)
+    somas = {m: np.bincount(chaves, weights=v, minlength=n_chaves) for m, v in valores.items()}
+    return n, somas
+
+
+def chaves_conjunto(dims, codigos, tamanhos, valores, linhas):
+    """Chave combinada das linhas sem nulos nas ``dims`` e as medidas dessas linhas."""
+    if not dims:
+        return np.zeros(linhas, dtype='int64'), valores
+    validos = np.logical_and.reduce([codigos[d] >= 0 for d in dims])  # como groupby(dropna=True)
+    chaves = np.ravel_multi_index([codigos[d][validos] for d in dims], tamanhos)
+    return chaves, {m: v[validos] for m, v in valores.items()}
+
+
+def ordinais(df, dims):
+    """Dimensões categóricas ordenadas (ex. ``FaixaEtaria``), que o cubo devolve ainda ordenadas."""
+    return {d for d in dims if isinstance(df[d].dtype, pd.CategoricalDtype) and df[d].cat.ordered}
+
+
+def tabela_conjunto(dims, categorias, tamanhos, originais, n, somas, ordinais=()):
+    """Tabela do conjunto a partir das chaves presentes (``originais``) e seus agregados."""
+    tabela = {}
+    if dims:
+        for d, cod in zip(dims, np.unravel_index(originais, tamanhos)):
+            tabela[d] = pd.Categorical.from_codes(cod, categories=categorias[d], ordered=d in ordinais)
+    tabela['n'] = n
+    for m, soma in somas.items():
+        tabela['soma_' + m] = soma
+    return pd.DataFrame(tabela)
+
+
+def _agregar_conjunto(dims, codigos, categorias, valores, ordinais=()):
+    tamanhos = [len(categorias[d]) for d in dims]
+    linhas = len(next(iter(valores.values()))) if valores else 0
+    chaves, valores = chaves_conjunto(dims, codigos, tamanhos, valores, linhas)
+    n_chaves = int(np.prod(tamanhos, dtype='int64'))
+    compactas = None
+    if n_chaves > LIMITE_CHAVES_DENSAS:
+        chaves, compactas = pd.factorize(chaves, sort=True)
+        n_chaves = len(compactas)
+    n, somas = agregar_chaves(chaves, n_chaves, valores)
+    presentes = np.flatnonzero(n)
+    originais = presentes if compactas is None else compactas[presentes]
+    return tabela_conjunto(dims, categorias, tamanhos, originais, n[presentes],
+                           {m: soma[presentes] for m, soma in somas.items()}, ordinais)
+
+
+class Cubo:
+    def __init__(self, tabelas, conjuntos, medidas):
+        self.tabelas = tabelas
+        self.conjuntos = conjuntos
+        self.medidas = tuple(medidas)
+
+    @classmethod
+    def construir(cls, df, conjuntos=None, medidas=MEDIDAS, linhas=None):
+        """Agrega ``df`` (ou só as posições ``linhas``) em todos os conjuntos."""
+        conjuntos = CONJUNTOS if conjuntos is None else conjuntos
+        dims = sorted({d for conjunto in conjuntos.values() for d in conjunto})
+        codigos, categorias = {}, {}
+        for d in dims:
+            cod, categorias[d] = codificar(df[d])
+            codigos[d] = cod if linhas is None else cod[linhas]
+        valores = {}
+        for m in medidas:
+            v = df[m].to_numpy(dtype='float64')
+            valores[m] = v if linhas is None else v[linhas]
+            if np.isnan(valores[m]).any():
+                raise ValueError(f"A medida {m!r} tem valores nulos; o cubo só soma medidas completas")
+        ordenadas = ordinais(df, dims)
+        tabelas = {
+            nome: _agregar_conjunto(conjunto, codigos, categorias, valores, ordenadas)
+            for nome, conjunto in conjuntos.items()
+        }
+        return cls(tabelas, dict(conjuntos), medidas)
+
+    def tabela(self, nome):
+        return self.tabelas[nome]
+
+    def contagem(self, nome, coluna='n'):
+        """Dimensões do conjunto + contagem de linhas."""
+        tabela = self.tabelas[nome]
+        return tabela[list(self.conjuntos[nome]) + ['n']].rename(columns={'n': coluna})
+
+    def media(self, nome, medida='indice_desenvolvimento', coluna='indice_medio'):
+        """Dimensões do conjunto + média da medida (equivalente a ``groupby(...)[medida].mean()``)."""
+        tabela = self.tabelas[nome]
+        saida = tabela[list(self.conjuntos[nome])].copy()
+        saida[coluna] = tabela['soma_' + medida] / tabela['n']
+        return saida
+
+    def matriz(self, nome, medidas):
+        """Matriz de indicadores: uma linha por grupo do conjunto, uma coluna por média de medida.
+
+        ``medidas`` é uma lista ou um dict ``{medida: rótulo da coluna}``.
+        """
+        rotulos = medidas if isinstance(medidas, dict) else {m: m for m in medidas}
+        tabela = self.tabelas[nome]
+        dims = list(self.conjuntos[nome])
+        if len(dims) > 1:
+            indice = pd.MultiIndex.from_frame(tabela[dims])
+        else:
+            indice = pd.Index(tabela[dims[0]], name=dims[0])
+        return pd.DataFrame(
+            {rotulo: (tabela['soma_' + m] / tabela['n']).to_numpy() for m, rotulo in rotulos.items()},
+            index=indice,
+        )
+
+    def media_geral(self, medida='indice_desenvolvimento'):
+        tabela = self.tabelas['total']
+        if tabela.empty:
+            return float('nan')
+        return float(tabela['soma_' + medida].iloc[0] / tabela['n'].iloc[0])
+
+
+def matriz_indicadores(df, por, medidas, linhas=None):
+    """Médias de várias colunas de score por ``por`` numa única passagem agrupada.
+
+    ``por`` é uma coluna ou tupla de colunas; ``medidas`` como em ``Cubo.matriz``.
+    """
+    dims = (por,) if isinstance(por, str) else tuple(por)
+    colunas = list(medidas)
+    cubo = Cubo.construir(df, {'matriz': dims}, medidas=colunas, linhas=linhas)
+    return cubo.matriz('matriz', medidas)
@@ -0,0 +1,67 @@
+"""Resumo de distribuições por grupo calculado no servidor (boxplots).
+
+Em vez de mandar todas as linhas para o Plotly calcular quartis no navegador,
+calcula por grupo os quartis, as cercas de Tukey (1,5 × IQR) e os valores
+distintos fora delas. O tamanho do resultado depende do número de grupos, não
+do número de linhas.
+
+As funções partem de uma tabela de contagens por valor distinto (ex. um
+conjunto do cubo com a medida como dimensão) e dão o mesmo resultado que as
+linhas originais: os scores são discretos, então a tabela é pequena e pode ser
+somada entre blocos de um CSV lido em fluxo.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _quantil_contagens(valores, acumulado, p):
+    # interpolação linear (quartilemethod='linear' padrão do Plotly), com as posições ordenadas
+    # localizadas pelas contagens acumuladas
+    posicao = p * (acumulado[-1] - 1)
+    abaixo = int(np.floor(posicao))
+    acima = min(abaixo + 1, int(acumulado[-1]) - 1)
+    v_abaixo = valores[np.searchsorted(acumulado, abaixo, side='right')]
+    v_acima = valores[np.searchsorted(acumulado, acima, side='right')]
+    return v_abaixo + (v_acima - v_abaixo) * (posicao - abaixo)
+
+
+def resumo_caixas_contagens(tabela, grupo, medida, contagem='n'):
+    """Uma linha por categoria de ``grupo`` presente: ``n``, ``q1``, ``mediana``, ``q3``,
+    ``cerca_inferior``, ``cerca_superior`` e ``outliers`` (valores distintos fora das cercas).
+
+    ``tabela`` tem uma linha por (``grupo``, valor de ``medida``) com a contagem em ``contagem``.
+    """
+    tabela = tabela[tabela[contagem] > 0]
+    registros = []
+    for categoria, parte in tabela.groupby(grupo, observed=True, sort=True):
+        parte = parte.groupby(medida, sort=True)[contagem].sum()
+        valores = parte.index.to_numpy(dtype='float64')
+        acumulado = np.cumsum(parte.to_numpy(dtype='int64'))
+        q1, mediana, q3 = (_quantil_contagens(valores, acumulado, p) for p in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        dentro = (valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)
+        registros.append({
+            grupo: categoria,
+            'n': int(acumulado[-1]),
+            'q1': q1,
+            'mediana': mediana,
+            'q3': q3,
+            'cerca_inferior': valores[dentro][0],
+            'cerca_superior': valores[dentro][-1],
+            'outliers': valores[~dentro],
+        })
+    colunas = [grupo, 'n', 'q1', 'mediana', 'q3', 'cerca_inferior', 'cerca_superior', 'outliers']
+    return pd.DataFrame(registros, columns=colunas)
+
+
+def correlacao_contagens(valores, pesos):
+    """Correlação de Pearson entre as colunas de ``valores`` com cada linha repetida ``pesos`` vezes."""
+    pesos = np.asarray(pesos, dtype='float64')
+    x = valores.to_numpy(dtype='float64')
+    total = pesos.sum()
+    centrado = x - (pesos @ x) / total
+    covariancia = (centrado * pesos[:, None]).T @ centrado
+    desvio = np.sqrt(np.diag(covariancia))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlacao = covariancia / np.outer(desvio, desvio)
+    return pd.DataFrame(correlacao, index=valores.columns, columns=valores.columns)
@@ -0,0 +1,32 @@
+"""Cache de figuras Plotly serializadas, compartilhado entre sessões.
+
+A chave é ``(id do gráfico, chave do dataset, estado dos filtros)``; o valor
+é o JSON da figura já com o ``update_layout`` aplicado. Um rerun causado por
+um widget que não muda os filtros reaproveita a figura em vez de refazer o
+``px.*`` e o estilo.
+"""
+from painel.cache import CacheLRU
+
+MAX_BYTES_PADRAO = 64 * 1024 * 1024
+
+
+class CacheFiguras:
+    def __init__(self, max_bytes=MAX_BYTES_PADRAO):
+        self._lru = CacheLRU(max_bytes=max_bytes)
+
+    def obter(self, id_grafico, chave_dataset, estado, construir):
+        """Figura em cache para a chave ou ``construir()`` (que é serializada e guardada)."""
+        chave = (id_grafico, chave_dataset, estado)
+        serializada = self._lru.get(chave)
+        if serializada is not None:
+            import plotly.io as pio  # só quando há figura em cache: criar o cache não carrega o plotly
+            return pio.from_json(serializada, skip_invalid=True)
+        figura = construir()
+        self._lru.put(chave, figura.to_json())
+        return figura
+
+    def estatisticas(self):
+        return self._lru.estatisticas()
+
+    def clear(self):
+        self._lru.clear()
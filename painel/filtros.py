@@ -0,0 +1,86 @@
+"""Motor de filtros da barra lateral baseado em bitmaps.
+
+Construído uma vez por dataset: para cada categoria das colunas filtráveis
+guarda um bitmap compactado (``np.packbits``, 1 bit por linha) e, para a
+idade, a ordem das linhas por idade. Uma combinação de filtros vira OR dos
+bitmaps das categorias escolhidas e AND entre colunas, e o resultado é um
+vetor de posições de linha, sem copiar o frame a cada filtro. Um filtro cuja
+coluna não existe no arquivo não restringe as linhas (``ausentes``).
+"""
+import numpy as np
+import pandas as pd
+
+from painel.ingestao import COLUNA_IDADE_MESES
+
+COLUNA_REGIAO = 'Região'
+COLUNA_DOMICILIO = 'Tipo de Domicílio'
+COLUNA_ALIMENTOS = 'Alimentos Básicos'
+COLUNAS_FILTRO = (COLUNA_REGIAO, COLUNA_DOMICILIO, COLUNA_ALIMENTOS)
+
+
+class IndiceFiltros:
+    def __init__(self, df, colunas=COLUNAS_FILTRO, coluna_idade=COLUNA_IDADE_MESES):
+        self.linhas = len(df)
+        self.bitmaps = {}
+        self.ausentes = set()  # colunas de filtro que o frame não tem
+        for col in colunas:
+            if col not in df.columns:
+                self.ausentes.add(col)
+                continue
+            serie = df[col]
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype('category')
+            codigos = serie.cat.codes.to_numpy()
+            self.bitmaps[col] = {
+                categoria: np.packbits(codigos == k)
+                for k, categoria in enumerate(serie.cat.categories)
+            }
+        self.ordem_idade = None
+        if coluna_idade in df.columns:
+            idade = df[coluna_idade].to_numpy(dtype='float64', na_value=np.nan)
+            self.ordem_idade = np.argsort(idade, kind='stable')  # NaN ficam no fim
+            self.idade_ordenada = idade[self.ordem_idade]
+        else:
+            self.ausentes.add(coluna_idade)
+        self.coluna_idade = coluna_idade
+
+    def _vazio(self):
+        return np.zeros((self.linhas + 7) // 8, dtype=np.uint8)
+
+    def bitmap(self, coluna, valores):
+        """OR dos bitmaps das categorias em ``valores`` (categorias ausentes não marcam linhas)."""
+        por_categoria = self.bitmaps[coluna]
+        saida = self._vazio()
+        for valor in valores:
+            if valor in por_categoria:
+                np.bitwise_or(saida, por_categoria[valor], out=saida)
+        return saida
+
+    def bitmap_idade(self, minimo, maximo):
+        """Linhas com ``minimo <= idade <= maximo`` via busca binária no índice ordenado."""
+        inicio = np.searchsorted(self.idade_ordenada, minimo, side='left')
+        fim = np.searchsorted(self.idade_ordenada, maximo, side='right')
+        marcadas = np.zeros(self.linhas, dtype=bool)
+        marcadas[self.ordem_idade[inicio:fim]] = True
+        return np.packbits(marcadas)
+
+    def selecionar(self, regioes=None, faixa_etaria=None, tipos_domicilio=None, acesso_alimentos=None):
+        """Posições das linhas que passam em todos os filtros informados (``None`` = sem filtro).
+
+        Filtros sobre colunas em ``ausentes`` são ignorados.
+        """
+        bitmaps = []
+        if regioes is not None and COLUNA_REGIAO not in self.ausentes:
+            bitmaps.append(self.bitmap(COLUNA_REGIAO, regioes))
+        if tipos_domicilio is not None and COLUNA_DOMICILIO not in self.ausentes:
+            bitmaps.append(self.bitmap(COLUNA_DOMICILIO, tipos_domicilio))
+        if acesso_alimentos is not None and COLUNA_ALIMENTOS not in self.ausentes:
+            bitmaps.append(self.bitmap(COLUNA_ALIMENTOS, [acesso_alimentos]))
+        if faixa_etaria is not None and self.coluna_idade not in self.ausentes:
+            bitmaps.append(self.bitmap_idade(*faixa_etaria))
+        if not bitmaps:
+            return np.arange(self.linhas)
+        resultado = bitmaps[0].copy()
+        for outro in bitmaps[1:]:
+            np.bitwise_and(resultado, outro, out=resultado)
+        return np.flatnonzero(np.unpackbits(resultado, count=self.linhas))
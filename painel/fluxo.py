@@ -0,0 +1,224 @@
+"""Agregação em fluxo: CSVs maiores que a memória viram agregados parciais somáveis.
+
+O arquivo é lido em blocos (``ler_blocos``); cada bloco passa pelo mesmo
+``preparar_dataset`` (scores, índice, faixa etária) e é reduzido a um cubo em
+que cada conjunto carrega também as dimensões dos filtros da barra lateral
+(região, tipo de domicílio, acesso a alimentos e uma classe de idade). Os
+cubos dos blocos são somados (contagens e somas) num ``AgregadoFluxo``; o
+bloco é descartado em seguida, então a memória de pico depende do tamanho do
+bloco e do número de combinações, não do número de linhas.
+
+Os filtros são aplicados depois, sobre as tabelas agregadas, e ``cubo``
+devolve um ``Cubo`` igual ao que ``Cubo.construir`` daria com as linhas
+filtradas. A idade entra como classe relativa aos limites do slider
+(``FAIXAS_ETARIAS``): abaixo, igual ou entre cada par de limites, o que basta
+para reproduzir ``minimo <= idade <= maximo`` exatamente.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from painel.cubo import CONJUNTOS, MEDIDAS, Cubo
+from painel.filtros import COLUNA_ALIMENTOS, COLUNA_DOMICILIO, COLUNA_REGIAO
+from painel.ingestao import COLUNA_IDADE_MESES, TAMANHO_CHUNK, ler_blocos
+from painel.pipeline import FAIXAS_ETARIAS, preparar_dataset
+
+COLUNA_CLASSE_IDADE = 'classe_idade'
+DIMENSOES_FILTRO = (COLUNA_REGIAO, COLUNA_DOMICILIO, COLUNA_ALIMENTOS, COLUNA_CLASSE_IDADE)
+# nulos das dimensões de filtro viram esta categoria (o cubo descarta nulos; os filtros não)
+NULO = '\x00nulo'
+
+
+@dataclass
+class RelatorioFluxo:
+    linhas: int
+    blocos: int
+    segundos: float
+    celulas: int  # linhas somadas de todas as tabelas agregadas
+
+
+def classe_idade(idade, limites=FAIXAS_ETARIAS):
+    """Classe da idade em relação aos ``limites``: 2i+1 se igual a ``limites[i]``, 2i se logo abaixo; NaN = -1."""
+    idade = np.asarray(idade, dtype='float64')
+    limites = np.asarray(limites, dtype='float64')
+    esquerda = np.searchsorted(limites, idade, side='left')
+    igual = np.searchsorted(limites, idade, side='right') > esquerda
+    classe = 2 * esquerda + igual
+    classe[np.isnan(idade)] = -1
+    return classe.astype('int8')
+
+
+def classes_no_intervalo(minimo, maximo, limites=FAIXAS_ETARIAS):
+    """Classes de idade com ``minimo <= idade <= maximo`` (os dois precisam estar em ``limites``)."""
+    limites = list(limites)
+    return list(range(2 * limites.index(minimo) + 1, 2 * limites.index(maximo) + 2))
+
+
+def _com_nulo(serie):
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+    if serie.isna().any():
+        serie = serie.cat.add_categories([NULO]).fillna(NULO)
+    return serie
+
+
+def _conjuntos_com_filtros(conjuntos):
+    return {
+        nome: DIMENSOES_FILTRO + tuple(d for d in dims if d not in DIMENSOES_FILTRO)
+        for nome, dims in conjuntos.items()
+    }
+
+
+class AgregadoFluxo:
+    def __init__(self, conjuntos=None, medidas=MEDIDAS):
+        self.conjuntos = dict(CONJUNTOS if conjuntos is None else conjuntos)
+        self.medidas = tuple(medidas)
+        self.tabelas = {}
+        self.categorias = {}  # dimensão -> categorias na ordem em que apareceram (ordenadas no fim se não ordinais)
+        self.ordinais = set()
+        self.presentes = set()  # dimensões de filtro que algum bloco trouxe (as outras não restringem)
+        self.linhas = 0
+        self.blocos = 0
+
+    def adicionar(self, df):
+        """Soma um bloco já preparado (saída de ``preparar_dataset``)."""
+        df = df.copy(deep=False)
+        for col in DIMENSOES_FILTRO[:-1]:
+            if col in df.columns:
+                self.presentes.add(col)
+            else:
+                df[col] = pd.Series(pd.Categorical([NULO] * len(df)), index=df.index)
+            df[col] = _com_nulo(df[col])
+        df[COLUNA_CLASSE_IDADE] = classe_idade(df[COLUNA_IDADE_MESES].to_numpy(dtype='float64', na_value=np.nan))
+        parcial = Cubo.construir(df, _conjuntos_com_filtros(self.conjuntos), medidas=self.medidas)
+        for nome, tabela in parcial.tabelas.items():
+            tabela = tabela.copy()
+            for d in parcial.conjuntos[nome]:
+                tipo = tabela[d].dtype
+                self._registrar_categorias(d, tipo.categories, tipo.ordered)
+                tabela[d] = tabela[d].astype(tipo.categories.dtype)
+            self.tabelas[nome] = self._somar(nome, self.tabelas.get(nome), tabela)
+        self.linhas += len(df)
+        self.blocos += 1
+        return self
+
+    def _registrar_categorias(self, dimensao, categorias, ordenada):
+        conhecidas = self.categorias.setdefault(dimensao, [])
+        vistas = set(conhecidas)
+        conhecidas.extend(c for c in categorias if c not in vistas)
+        if ordenada:
+            self.ordinais.add(dimensao)
+
+    def _somar(self, nome, acumulada, tabela):
+        if acumulada is None:
+            return tabela
+        dims = list(DIMENSOES_FILTRO) + [d for d in self.conjuntos[nome] if d not in DIMENSOES_FILTRO]
+        juntas = pd.concat([acumulada, tabela], ignore_index=True)
+        return juntas.groupby(dims, sort=False, dropna=False).sum().reset_index()
+
+    def juntar(self, outro):
+        """Soma outro agregado (ex. de outro arquivo ou processo) neste."""
+        for dimensao, categorias in outro.categorias.items():
+            self._registrar_categorias(dimensao, categorias, dimensao in outro.ordinais)
+        self.presentes |= outro.presentes
+        for nome, tabela in outro.tabelas.items():
+            self.tabelas[nome] = self._somar(nome, self.tabelas.get(nome), tabela)
+        self.linhas += outro.linhas
+        self.blocos += outro.blocos
+        return self
+
+    def copia(self):
+        """Cópia independente (``adicionar``/``juntar`` alteram o agregado no lugar)."""
+        novo = AgregadoFluxo(self.conjuntos, self.medidas)
+        novo.tabelas = {nome: tabela.copy() for nome, tabela in self.tabelas.items()}
+        novo.categorias = {d: list(c) for d, c in self.categorias.items()}
+        novo.ordinais = set(self.ordinais)
+        novo.presentes = set(self.presentes)
+        novo.linhas, novo.blocos = self.linhas, self.blocos
+        return novo
+
+    def estado(self):
+        """``(metadados, tabelas)``: dicionário só com tipos JSON e os frames agregados, para gravar sem pickle."""
+        metadados = {
+            'conjuntos': {nome: list(dims) for nome, dims in self.conjuntos.items()},
+            'medidas': list(self.medidas),
+            'categorias': {d: [c.item() if isinstance(c, np.generic) else c for c in categorias]
+                           for d, categorias in self.categorias.items()},
+            'ordinais': sorted(self.ordinais),
+            'presentes': sorted(self.presentes),
+            'linhas': int(self.linhas),
+            'blocos': int(self.blocos),
+        }
+        return metadados, dict(self.tabelas)
+
+    @classmethod
+    def de_estado(cls, metadados, tabelas):
+        """Reconstrói o agregado a partir de ``estado()``."""
+        novo = cls({nome: tuple(dims) for nome, dims in metadados['conjuntos'].items()}, metadados['medidas'])
+        novo.tabelas = dict(tabelas)
+        novo.categorias = {d: list(c) for d, c in metadados['categorias'].items()}
+        novo.ordinais = set(metadados['ordinais'])
+        novo.presentes = set(metadados.get('presentes', DIMENSOES_FILTRO[:-1]))
+        novo.linhas, novo.blocos = metadados['linhas'], metadados['blocos']
+        return novo
+
+    @property
+    def celulas(self):
+        return sum(len(t) for t in self.tabelas.values())
+
+    def _mascara(self, tabela, regioes, faixa_etaria, tipos_domicilio, acesso_alimentos):
+        # como em IndiceFiltros: filtro sobre coluna que nenhum bloco trouxe não restringe
+        mascara = np.ones(len(tabela), dtype=bool)
+        if regioes is not None and COLUNA_REGIAO in self.presentes:
+            mascara &= tabela[COLUNA_REGIAO].isin(list(regioes)).to_numpy()
+        if tipos_domicilio is not None and COLUNA_DOMICILIO in self.presentes:
+            mascara &= tabela[COLUNA_DOMICILIO].isin(list(tipos_domicilio)).to_numpy()
+        if acesso_alimentos is not None and COLUNA_ALIMENTOS in self.presentes:
+            mascara &= (tabela[COLUNA_ALIMENTOS] == acesso_alimentos).to_numpy()
+        if faixa_etaria is not None:
+            mascara &= tabela[COLUNA_CLASSE_IDADE].isin(classes_no_intervalo(*faixa_etaria)).to_numpy()
+        return mascara
+
+    def _categorias(self, dimensao):
+        categorias = [c for c in self.categorias.get(dimensao, []) if not (isinstance(c, str) and c == NULO)]
+        return categorias if dimensao in self.ordinais else sorted(categorias)
+
+    def cubo(self, regioes=None, faixa_etaria=None, tipos_domicilio=None, acesso_alimentos=None):
+        """``Cubo`` das linhas que passam nos filtros (mesma semântica de ``IndiceFiltros.selecionar``)."""
+        colunas = ['n'] + ['soma_' + m for m in self.medidas]
+        tabelas = {}
+        for nome, dims in self.conjuntos.items():
+            tabela = self.tabelas.get(nome)
+            if tabela is None:
+                tabelas[nome] = pd.DataFrame(columns=list(dims) + colunas)
+                continue
+            mascara = self._mascara(tabela, regioes, faixa_etaria, tipos_domicilio, acesso_alimentos)
+            for d in dims:
+                if d in DIMENSOES_FILTRO[:-1]:
+                    mascara &= (tabela[d] != NULO).to_numpy()  # o cubo descarta nulos nas suas dimensões
+            tabela = tabela[mascara]
+            if dims:
+                saida = tabela.groupby(list(dims), sort=True)[colunas].sum().reset_index()
+                saida = saida[saida['n'] > 0].reset_index(drop=True)
+                for d in dims:
+                    saida[d] = pd.Categorical(saida[d], categories=self._categorias(d),
+                                              ordered=d in self.ordinais)
+                saida = saida.sort_values(list(dims), ignore_index=True)
+            else:
+                somas = tabela[colunas].sum()
+                saida = pd.DataFrame([somas]) if somas['n'] > 0 else pd.DataFrame(columns=colunas)
+            saida['n'] = saida['n'].astype('int64')
+            tabelas[nome] = saida
+        return Cubo(tabelas, self.conjuntos, self.medidas)
+
+
+def agregar_csv(file, tamanho_chunk=TAMANHO_CHUNK, conjuntos=None, medidas=MEDIDAS):
+    """Lê ``file`` em blocos e devolve ``(AgregadoFluxo, RelatorioFluxo)``."""
+    inicio = time.perf_counter()
+    agregado = AgregadoFluxo(conjuntos, medidas)
+    for bloco in ler_blocos(file, tamanho_chunk):
+        agregado.adicionar(preparar_dataset(bloco))
+    relatorio = RelatorioFluxo(agregado.linhas, agregado.blocos, time.perf_counter() - inicio, agregado.celulas)
+    return agregado, relatorio
@@ -0,0 +1,192 @@
+"""Leitura tipada do CSV da pesquisa.
+
+O esquema é declarado antes da leitura: colunas de baixa cardinalidade entram
+direto como ``category`` e "Idade em Meses" ("12 meses") vira número durante a
+leitura, sem passar por colunas ``object``.
+"""
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------------------
+# Esquema da pesquisa
+# ----------------------------------------------------------
+COLUNAS_CATEGORICAS = [
+    'Região',
+    'Sexo',
+    'Moradores que Alimentaram Acabamento (Sim)',
+    'Moradores que Alimentaram Acabamento (Não)',
+    'Tipo de Domicílio',
+    'Possui Cozinha',
+    'Ocupação',
+    'Situação do Registro',
+    'Presença de Tosse',
+    'Tipo de Respiração',
+    'Alimentos Básicos',
+    'Nivel Escolaridade',
+    'Beneficios',
+    'Faixa de Renda',
+    'Cor Pessoa',
+]
+COLUNA_IDADE_MESES = 'Idade em Meses'
+COLUNAS_NUMERICAS = {'Idade': 'float32'}
+
+ESQUEMA = {col: 'category' for col in COLUNAS_CATEGORICAS}
+ESQUEMA[COLUNA_IDADE_MESES] = 'category'  # poucos valores distintos: convertido pelas categorias
+ESQUEMA.update(COLUNAS_NUMERICAS)
+
+MOTORES = ('pyarrow', 'c', 'chunked')
+TAMANHO_CHUNK = 500_000
+
+
+@dataclass
+class RelatorioIngestao:
+    motor: str
+    linhas: int
+    bytes_antes: int  # pegada estimada da mesma leitura sem esquema (texto sem categorias)
+    bytes_depois: int
+    segundos: float
+    origem: str = 'csv'  # leituras do store devolvem painel.armazenamento.RelatorioArmazenamento (origem 'cache')
+
+    @property
+    def reducao(self):
+        if not self.bytes_antes:
+            return 0.0
+        return 1 - self.bytes_depois / self.bytes_antes
+
+
+def _pyarrow_disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _strings_arrow():
+    try:
+        return bool(pd.get_option('future.infer_string'))
+    except KeyError:  # OptionError em pandas antigos
+        return False
+
+
+def parse_idade_meses(serie):
+    """Converte "12 meses" / "12" / 12 em float32 operando só sobre os valores distintos."""
+    if pd.api.types.is_numeric_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype('float32')
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+    categorias = serie.cat.categories.astype(str).str.replace(' meses', '', regex=False).str.strip()
+    valores = pd.to_numeric(categorias, errors='coerce').to_numpy(dtype='float32')
+    codigos = serie.cat.codes.to_numpy()
+    saida = np.full(len(codigos), np.nan, dtype='float32')
+    validos = codigos >= 0
+    saida[validos] = valores[codigos[validos]]
+    return pd.Series(saida, index=serie.index, name=serie.name)
+
+
+def _bytes_como_objeto(serie):
+    """Quanto a coluna ocuparia numa leitura sem esquema (mesma conta de ``memory_usage(deep=True)``)."""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return len(serie) * 8  # int64/float64 na leitura padrão
+    contagens = serie.value_counts(dropna=True)
+    nulos = int(serie.isna().sum())
+    if _strings_arrow():
+        # pandas >= 3: texto vira ``str`` (arrow) com offsets int64 + bytes utf-8 + bitmap de nulos
+        tamanhos = np.array([len(str(v).encode('utf-8')) for v in contagens.index], dtype='int64')
+        bitmap = (len(serie) + 7) // 8 if nulos else 0
+        return int(len(serie) * 8 + (contagens.to_numpy() * tamanhos).sum() + bitmap)
+    tamanhos = np.array([sys.getsizeof(v) for v in contagens.index], dtype='int64')
+    return int(len(serie) * 8 + (contagens.to_numpy() * tamanhos).sum() + nulos * sys.getsizeof(np.nan))
+
+
+def _finalizar(df):
+    """Mede a pegada "sem esquema" e converte a idade; devolve ``(df, bytes_antes)``."""
+    bytes_antes = sum(_bytes_como_objeto(df[col]) for col in df.columns)
+    if COLUNA_IDADE_MESES in df.columns:
+        df[COLUNA_IDADE_MESES] = parse_idade_meses(df[COLUNA_IDADE_MESES])
+    return df, bytes_antes
+
+
+def _colunas_do_arquivo(file):
+    cabecalho = pd.read_csv(file, nrows=0)
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return list(cabecalho.columns)
+
+
+def _esquema_do_arquivo(file):
+    presentes = _colunas_do_arquivo(file)
+    return {col: tipo for col, tipo in ESQUEMA.items() if col in presentes}
+
+
+def ler_blocos(file, tamanho_chunk=TAMANHO_CHUNK):
+    """Gera os blocos tipados do CSV (mesmo esquema do ``read_survey``), um de cada vez."""
+    for parte in pd.read_csv(file, dtype=_esquema_do_arquivo(file), chunksize=tamanho_chunk):
+        yield _finalizar(parte)[0]
+
+
+def _ler_em_chunks(file, dtype, tamanho_chunk):
+    partes = []
+    bytes_antes = 0
+    for parte in pd.read_csv(file, dtype=dtype, chunksize=tamanho_chunk):
+        parte, antes = _finalizar(parte)
+        partes.append(parte)
+        bytes_antes += antes
+    if not partes:
+        return pd.DataFrame(columns=list(dtype)), 0
+    return concatenar(partes), bytes_antes
+
+
+def concatenar(partes):
+    """Empilha frames com as mesmas colunas unindo as categorias (sem voltar a texto).
+
+    As categorias não ordinais da união saem ordenadas, como as do ``read_csv``
+    do arquivo inteiro: o resultado não depende de em que parte cada valor
+    apareceu primeiro.
+    """
+    if len(partes) == 1:
+        return partes[0]
+    colunas = {}
+    for col in partes[0].columns:
+        series = [p[col] for p in partes]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            # parte só com nulos: categorias vazias de outro tipo, que o union_categoricals recusa
+            referencia = next((serie.cat.categories[:0] for serie in series if len(serie.cat.categories)), None)
+            if referencia is not None:
+                series = [serie.cat.set_categories(referencia) if not len(serie.cat.categories) else serie
+                          for serie in series]
+            ordinal = any(serie.cat.ordered for serie in series)
+            colunas[col] = pd.Series(pd.api.types.union_categoricals(series, sort_categories=not ordinal), name=col)
+        else:
+            colunas[col] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(colunas)
+
+
+def read_survey(file, motor='pyarrow', tamanho_chunk=TAMANHO_CHUNK):
+    """Lê o CSV com o esquema declarado e devolve ``(df, RelatorioIngestao)``."""
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de leitura desconhecido: {motor!r} (opções: {', '.join(MOTORES)})")
+    if motor == 'pyarrow' and not _pyarrow_disponivel():
+        motor = 'c'
+
+    inicio = time.perf_counter()
+    dtype = _esquema_do_arquivo(file)
+
+    if motor == 'chunked':
+        df, bytes_antes = _ler_em_chunks(file, dtype, tamanho_chunk)
+    else:
+        df, bytes_antes = _finalizar(pd.read_csv(file, dtype=dtype, engine=motor))
+    bytes_depois = int(df.memory_usage(deep=True, index=False).sum())
+
+    relatorio = RelatorioIngestao(
+        motor=motor,
+        linhas=len(df),
+        bytes_antes=bytes_antes,
+        bytes_depois=bytes_depois,
+        segundos=time.perf_counter() - inicio,
+    )
+    return df, relatorio
@@ -0,0 +1,102 @@
+"""Instrumentação por rerun: tempo, linhas e memória de cada etapa do script.
+
+Um ``Instrumentacao`` vive uma execução do script. Cada etapa é medida com
+``with instrumentacao.etapa(nome, linhas=...)`` ou com o decorador
+``medir``; etapas podem ser aninhadas (o nível fica registrado). A memória é
+a variação do RSS do processo (``/proc/self/statm``), então é compartilhada
+com as outras sessões e threads do servidor: serve para apontar etapas que
+alocam muito, não como contabilidade exata. Fora do Linux ela fica ``None``.
+
+``gravar`` acrescenta as medições como linhas JSON num arquivo local, uma por
+etapa, com o id do rerun, para análise offline.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import wraps
+
+_PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_LOCK_ARQUIVO = threading.Lock()
+
+
+def memoria_residente():
+    """RSS atual do processo em bytes, ou ``None`` se não houver ``/proc``."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGINA
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+@dataclass
+class Medicao:
+    etapa: str
+    nivel: int
+    inicio: float  # segundos desde o início do rerun
+    segundos: float = 0.0
+    linhas: int = None
+    memoria: int = None  # variação do RSS em bytes
+
+
+class Instrumentacao:
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo
+        self.id = uuid.uuid4().hex[:12]
+        self.medicoes = []
+        self._inicio = time.perf_counter()
+        self._nivel = 0
+
+    @contextmanager
+    def etapa(self, nome, linhas=None):
+        """Mede o bloco; a ``Medicao`` devolvida aceita ``linhas`` definidas dentro dele."""
+        medicao = Medicao(nome, self._nivel, time.perf_counter() - self._inicio, linhas=linhas)
+        self.medicoes.append(medicao)
+        memoria_antes = memoria_residente()
+        self._nivel += 1
+        inicio = time.perf_counter()
+        try:
+            yield medicao
+        finally:
+            medicao.segundos = time.perf_counter() - inicio
+            self._nivel -= 1
+            memoria_depois = memoria_residente()
+            if memoria_antes is not None and memoria_depois is not None:
+                medicao.memoria = memoria_depois - memoria_antes
+
+    def medir(self, nome, linhas=None):
+        """Decorador de ``etapa``; ``linhas`` pode ser uma função aplicada ao resultado."""
+        def decorador(funcao):
+            @wraps(funcao)
+            def medida(*args, **kwargs):
+                with self.etapa(nome, linhas=None if callable(linhas) else linhas) as medicao:
+                    resultado = funcao(*args, **kwargs)
+                    if callable(linhas):
+                        medicao.linhas = linhas(resultado)
+                return resultado
+            return medida
+        return decorador
+
+    @property
+    def total(self):
+        return time.perf_counter() - self._inicio
+
+    def registros(self):
+        return [asdict(m) for m in self.medicoes]
+
+    def gravar(self, arquivo=None):
+        """Acrescenta uma linha JSON por etapa em ``arquivo`` (ou no do construtor); sem arquivo, não faz nada."""
+        arquivo = arquivo or self.arquivo
+        if not arquivo or not self.medicoes:
+            return
+        momento = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        linhas = "".join(
+            json.dumps(dict(registro, rerun=self.id, momento=momento), ensure_ascii=False) + "\n"
+            for registro in self.registros()
+        )
+        with _LOCK_ARQUIVO, open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(linhas)
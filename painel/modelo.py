@@ -0,0 +1,149 @@
+"""Carga do modelo preditivo: em segundo plano, verificada por hash e recarregada se o arquivo mudar.
+
+O pickle é lido uma única vez para a memória; o hash SHA-256 é calculado sobre
+esses mesmos bytes antes do ``pickle.loads``, então o hash informado é sempre o
+do modelo servido. Se houver um hash esperado (arquivo ``<modelo>.sha256`` ao
+lado do pickle ou, para o pickle base, a variável de ambiente) e ele não
+bater, a carga falha em vez de servir um modelo desatualizado. O carregador guarda ``(tamanho, mtime)`` do
+arquivo e o app recarrega quando o pickle é substituído ou uma versão nova aparece.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+
+
+class HashModeloInvalido(ValueError):
+    pass
+
+
+@dataclass
+class RelatorioModelo:
+    hash: str
+    segundos: float
+    bytes_arquivo: int
+    bytes_residentes: int
+
+
+def hash_esperado(caminho):
+    """Hash de ``<caminho>.sha256`` (primeira palavra, formato do ``sha256sum``) ou ``None``."""
+    try:
+        with open(caminho + '.sha256', encoding='utf-8') as f:
+            conteudo = f.read().split()
+    except FileNotFoundError:
+        return None
+    return conteudo[0].lower() if conteudo else None
+
+
+def bytes_residentes(modelo):
+    """Memória ocupada pelas árvores (nós + valores); para outros modelos, o tamanho do pickle."""
+    estimadores = getattr(modelo, 'estimators_', None)
+    if estimadores is None and hasattr(modelo, 'tree_'):
+        estimadores = [modelo]
+    if estimadores is None:
+        return len(pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL))
+    total = 0
+    for estimador in estimadores:
+        estado = estimador.tree_.__getstate__()
+        total += estado['nodes'].nbytes + estado['values'].nbytes
+    return total
+
+
+def carregar_modelo(caminho, esperado=None):
+    """``(modelo, RelatorioModelo)``; ``esperado`` (ou o arquivo ``.sha256``) trava o hash aceito."""
+    inicio = time.perf_counter()
+    esperado = esperado or hash_esperado(caminho)
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    hash_atual = hashlib.sha256(dados).hexdigest()
+    if esperado is not None and hash_atual != esperado.lower():
+        raise HashModeloInvalido(
+            f"{caminho}: hash {hash_atual[:12]}… não confere com o esperado {esperado[:12]}…"
+        )
+    modelo = pickle.loads(dados)
+    relatorio = RelatorioModelo(hash_atual, time.perf_counter() - inicio, len(dados), bytes_residentes(modelo))
+    return modelo, relatorio
+
+
+def _assinatura_arquivo(caminho):
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return caminho, None
+    return caminho, info.st_size, info.st_mtime_ns
+
+
+class _Carga:
+    def __init__(self, caminho, esperado):
+        self.assinatura = _assinatura_arquivo(caminho)
+        self.pronto = threading.Event()
+        self.resultado = None
+        self.erro = None
+        self.thread = threading.Thread(target=self._executar, args=(caminho, esperado),
+                                       name='carregar-modelo', daemon=True)
+
+    def _executar(self, caminho, esperado):
+        try:
+            self.resultado = carregar_modelo(caminho, esperado)
+        except Exception as erro:  # repassado a quem chamar obter()
+            self.erro = erro
+        finally:
+            self.pronto.set()
+
+
+class CarregadorModelo:
+    """Carrega o modelo numa thread assim que ``iniciar`` é chamado; ``obter`` espera o fim.
+
+    ``caminho`` pode ser uma função sem argumentos (ex. a versão retreinada mais
+    nova): quando ela passa a apontar para outro arquivo, o modelo é recarregado.
+    """
+
+    def __init__(self, caminho, esperado=None):
+        self._caminho = caminho
+        self.esperado = esperado
+        self._lock = threading.Lock()
+        self._carga = None
+
+    @property
+    def caminho(self):
+        return self._caminho() if callable(self._caminho) else self._caminho
+
+    def esperado_para(self, caminho):
+        """Hash travado para ``caminho``: ``esperado`` pode ser um hash só ou ``{caminho: hash}``.
+
+        Caminhos fora do dicionário (ex. versões retreinadas) são conferidos só
+        pelo próprio ``.sha256``.
+        """
+        if isinstance(self.esperado, dict):
+            return self.esperado.get(caminho)
+        return self.esperado
+
+    def iniciar(self, recarregar=False):
+        """Dispara a carga em segundo plano (uma nova se ``recarregar``); devolve o próprio carregador."""
+        with self._lock:
+            if self._carga is None or recarregar:
+                caminho = self.caminho
+                self._carga = _Carga(caminho, self.esperado_para(caminho))
+                self._carga.thread.start()
+        return self
+
+    @property
+    def pronto(self):
+        return self._carga is not None and self._carga.pronto.is_set()
+
+    @property
+    def desatualizado(self):
+        """O pickle em disco (ou o caminho servido) mudou desde o início da carga atual."""
+        return self._carga is not None and _assinatura_arquivo(self.caminho) != self._carga.assinatura
+
+    def obter(self, timeout=None):
+        """``(modelo, RelatorioModelo)``; recarrega se o arquivo mudou e relança o erro da carga, se houve."""
+        self.iniciar(recarregar=self.desatualizado)
+        carga = self._carga
+        if not carga.pronto.wait(timeout):
+            raise TimeoutError("O modelo ainda está carregando")
+        if carga.erro is not None:
+            raise carga.erro
+        return carga.resultado
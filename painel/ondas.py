@@ -0,0 +1,160 @@
+"""Acréscimo de novas ondas da pesquisa sem reprocessar o histórico.
+
+Um dataset com ondas é uma cadeia de segmentos: o CSV base e cada onda
+enviada depois. Cada segmento é lido, tipado e gravado no ``DatasetStore``
+pela própria chave (hash do conteúdo); o agregado somável (``AgregadoFluxo``)
+de cada prefixo da cadeia é gravado sob a chave do prefixo. Ao acrescentar uma
+onda, o agregado do maior prefixo já gravado é reaproveitado e só os segmentos
+novos são pontuados e agregados: o trabalho acompanha o tamanho da onda, não o
+do histórico, e uma réplica nova que encontra a cadeia inteira no disco não
+pontua nada. Os segmentos ficam separados; o frame completo (para predição em
+lote e retreino) só é empilhado quando alguém pede ``DatasetOndas.bruto``.
+
+``verificar_consistencia`` refaz tudo a partir das linhas brutas (preparo e
+cubo sobre o frame inteiro) e compara com o que a cadeia incremental produziu.
+"""
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from painel.cubo import Cubo
+from painel.filtros import IndiceFiltros
+from painel.fluxo import AgregadoFluxo
+from painel.ingestao import concatenar
+from painel.pipeline import preparar_dataset
+
+
+@dataclass
+class RelatorioOndas:
+    segmentos: int
+    linhas: int
+    linhas_agregadas: int  # linhas que precisaram ser agregadas nesta chamada
+    reaproveitados: int  # segmentos cujo agregado veio do armazenamento
+    segundos: float
+
+
+@dataclass
+class DatasetOndas:
+    chave: str
+    brutos: list  # DataFrame tipado (saída de read_survey) de cada segmento, base primeiro
+    agregado: AgregadoFluxo
+    relatorio: RelatorioOndas
+    _bruto: object = field(default=None, repr=False)
+
+    @property
+    def bruto(self):
+        """Todos os segmentos empilhados; montado na primeira vez que é pedido."""
+        if self._bruto is None:
+            self._bruto = concatenar(list(self.brutos))
+        return self._bruto
+
+
+def chave_cadeia(chaves):
+    """Chave de base + ondas; a de um único segmento é a do próprio segmento."""
+    chaves = list(chaves)
+    if len(chaves) == 1:
+        return chaves[0]
+    return hashlib.blake2b("+".join(chaves).encode(), digest_size=16).hexdigest()
+
+
+def _validar_colunas(brutos):
+    colunas = list(brutos[0].columns)
+    for i, bruto in enumerate(brutos[1:], start=1):
+        if list(bruto.columns) != colunas:
+            faltando = sorted(set(colunas) - set(bruto.columns))
+            sobrando = sorted(set(bruto.columns) - set(colunas))
+            raise ValueError(
+                f"A onda {i} não tem as mesmas colunas da base (faltando: {faltando or '-'}; "
+                f"a mais: {sobrando or '-'})"
+            )
+
+
+def combinar_ondas(store, chaves, brutos, preparar):
+    """``DatasetOndas`` da cadeia ``chaves`` (base primeiro); ``preparar(i)`` devolve ``preparar_dataset(brutos[i])``.
+
+    ``preparar`` só é chamado para os segmentos depois do maior prefixo com
+    agregado no ``store``; o agregado de cada prefixo calculado é gravado.
+    """
+    inicio = time.perf_counter()
+    _validar_colunas(brutos)
+    agregado, prontos = None, 0
+    for i in range(len(chaves), 0, -1):
+        agregado = store.get_agregado(chave_cadeia(chaves[:i]))
+        if agregado is not None:
+            prontos = i
+            break
+    agregado = AgregadoFluxo() if agregado is None else agregado
+    linhas_agregadas = 0
+    for i in range(prontos, len(chaves)):
+        preparado = preparar(i)
+        agregado.adicionar(preparado)
+        linhas_agregadas += len(preparado)
+        store.put_agregado(chave_cadeia(chaves[:i + 1]), agregado)
+    linhas = sum(len(bruto) for bruto in brutos)
+    relatorio = RelatorioOndas(len(chaves), linhas, linhas_agregadas, prontos, time.perf_counter() - inicio)
+    return DatasetOndas(chave_cadeia(chaves), list(brutos), agregado, relatorio)
+
+
+def _por_grupo(tabela, dims):
+    # indexada pelos valores das dimensões: a comparação não depende da ordem
+    # das linhas nem da ordem das categorias de cada lado
+    if not dims:
+        return tabela.reset_index(drop=True)
+    saida = tabela.drop(columns=list(dims))
+    saida.index = pd.MultiIndex.from_frame(tabela[list(dims)].astype(object))
+    return saida.sort_index()
+
+
+def _comparar_tabela(esperado, obtido, dims, tolerancia):
+    a, b = _por_grupo(esperado, dims), _por_grupo(obtido, dims)
+    if len(a.index.unique()) != len(a) or len(b.index.unique()) != len(b):
+        return ["grupos repetidos"]
+    divergencias = []
+    so_esperado, so_obtido = a.index.difference(b.index), b.index.difference(a.index)
+    if len(so_esperado) or len(so_obtido):
+        divergencias.append(f"grupos só no recálculo: {list(so_esperado)[:5]}; só no incremental: {list(so_obtido)[:5]}")
+    comuns = a.index.intersection(b.index)
+    for coluna in a.columns:
+        if coluna not in b.columns:
+            divergencias.append(f"coluna {coluna!r} ausente no incremental")
+            continue
+        iguais = np.allclose(a.loc[comuns, coluna].to_numpy(dtype='float64'),
+                             b.loc[comuns, coluna].to_numpy(dtype='float64'), rtol=tolerancia, atol=tolerancia)
+        if not iguais:
+            divergencias.append(f"coluna {coluna!r} difere")
+    return divergencias
+
+
+def verificar_consistencia(dataset, filtros=None, tolerancia=1e-9):
+    """Compara a cadeia incremental com o recálculo completo a partir de ``dataset.bruto``.
+
+    Devolve a lista de divergências (vazia quando tudo confere): scores dos
+    segmentos preparados um a um e contagens/somas de cada conjunto do cubo,
+    sem filtros e com ``filtros``. Os grupos são casados pelos valores das
+    dimensões, não pela posição: uma onda que traz uma categoria nova não
+    desalinha as tabelas.
+    """
+    divergencias = []
+    completo = preparar_dataset(dataset.bruto)
+    por_segmento = concatenar([preparar_dataset(bruto) for bruto in dataset.brutos])
+    for coluna in dataset.agregado.medidas:
+        esperado = completo[coluna].to_numpy(dtype='float64')
+        obtido = por_segmento[coluna].to_numpy(dtype='float64')
+        if len(esperado) != len(obtido) or not np.allclose(esperado, obtido, rtol=0, atol=tolerancia):
+            divergencias.append(f"segmentos preparados: coluna {coluna!r} difere")
+    if dataset.agregado.linhas != len(completo):
+        divergencias.append(f"agregado: {dataset.agregado.linhas} linhas, recálculo: {len(completo)}")
+
+    casos = [{}] + ([filtros] if filtros else [])
+    for caso in casos:
+        linhas = IndiceFiltros(completo).selecionar(**caso) if caso else None
+        esperado = Cubo.construir(completo, dataset.agregado.conjuntos, dataset.agregado.medidas, linhas=linhas)
+        obtido = dataset.agregado.cubo(**caso)
+        rotulo = "com filtros" if caso else "sem filtros"
+        for nome, dims in esperado.conjuntos.items():
+            for divergencia in _comparar_tabela(esperado.tabela(nome), obtido.tabela(nome), dims, tolerancia):
+                divergencias.append(f"{nome} ({rotulo}): {divergencia}")
+    return divergencias
@@ -0,0 +1,205 @@
+"""Agregação do cubo em vários núcleos: partições por faixa de linhas num pool de processos.
+
+``CuboParticionado`` codifica as dimensões e copia códigos e medidas uma vez
+por dataset para blocos de ``multiprocessing.shared_memory``; os processos do
+pool anexam esses blocos pelo nome (o frame nunca é serializado) e cada um
+agrega uma faixa de linhas com o mesmo ``np.bincount`` de ``painel.cubo``.
+Os parciais (contagens e somas por chave, do tamanho do número de grupos, não
+de linhas) voltam ao processo do app e são somados. O resultado é o mesmo
+``Cubo`` que ``Cubo.construir`` daria, inclusive com ``linhas`` filtradas:
+as posições selecionadas também vão para a memória compartilhada e são
+repartidas entre os processos.
+
+O pool usa ``spawn`` (o servidor do Streamlit tem threads; ``fork`` copiaria
+locks em estado inconsistente). Abaixo de ``MIN_LINHAS_PARTICAO`` linhas por
+partição o custo de despachar supera o ganho e a agregação roda no próprio
+processo.
+"""
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from painel.cubo import (
+    CONJUNTOS, LIMITE_CHAVES_DENSAS, MEDIDAS, Cubo, agregar_chaves, chaves_conjunto, codificar, ordinais,
+    tabela_conjunto
+)
+
+MIN_LINHAS_PARTICAO = 250_000
+
+
+def criar_executor(processos):
+    """Pool de ``processos`` processos (``spawn``) para ``CuboParticionado.construir``."""
+    return ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _tipo_codigo(maior):
+    for tipo in (np.int8, np.int16, np.int32):
+        if maior < np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def _compartilhar(matriz):
+    """Copia ``matriz`` para um bloco novo de memória compartilhada; devolve ``(bloco, descrição)``."""
+    bloco = shared_memory.SharedMemory(create=True, size=max(matriz.nbytes, 1))
+    np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=bloco.buf)[...] = matriz
+    return bloco, (bloco.name, matriz.shape, matriz.dtype.str)
+
+
+def _liberar(blocos):
+    for bloco in blocos:
+        bloco.close()
+        bloco.unlink()
+
+
+def _anexar(descricao):
+    nome, forma, tipo = descricao
+    bloco = shared_memory.SharedMemory(name=nome)
+    return bloco, np.ndarray(forma, dtype=tipo, buffer=bloco.buf)
+
+
+def _agregar_particao(tarefa, inicio, fim):
+    """Executado no processo do pool: parciais de cada conjunto para a faixa ``[inicio, fim)``."""
+    anexados = []
+    try:
+        bloco, codigos = _anexar(tarefa['codigos'])
+        anexados.append(bloco)
+        bloco, valores = _anexar(tarefa['valores'])
+        anexados.append(bloco)
+        if tarefa['linhas'] is not None:
+            bloco, linhas = _anexar(tarefa['linhas'])
+            anexados.append(bloco)
+            posicoes = linhas[inicio:fim]
+            codigos, valores = codigos[:, posicoes], valores[:, posicoes]
+        else:
+            codigos, valores = codigos[:, inicio:fim], valores[:, inicio:fim]
+        return _agregar_faixa(tarefa, codigos, valores, fim - inicio)
+    finally:
+        # as views precisam sair de escopo antes de fechar o mmap
+        codigos = valores = posicoes = linhas = None
+        for bloco in anexados:
+            bloco.close()
+
+
+def _agregar_faixa(tarefa, codigos, valores, linhas):
+    codigos = dict(zip(tarefa['dims'], codigos))
+    valores = dict(zip(tarefa['medidas'], valores))
+    parciais = {}
+    for nome, dims in tarefa['conjuntos'].items():
+        tamanhos = [tarefa['tamanhos'][d] for d in dims]
+        chaves, medidas = chaves_conjunto(dims, codigos, tamanhos, valores, linhas)
+        n_chaves = int(np.prod(tamanhos, dtype='int64'))
+        if n_chaves > LIMITE_CHAVES_DENSAS:
+            chaves, unicas = pd.factorize(chaves)
+            parciais[nome] = (unicas,) + agregar_chaves(chaves, len(unicas), medidas)
+        else:
+            parciais[nome] = (None,) + agregar_chaves(chaves, n_chaves, medidas)
+    return parciais
+
+
+def _somar_parciais(parciais, medidas):
+    """Junta os parciais de um conjunto: ``(chaves presentes, n, {medida: soma})``."""
+    if parciais[0][0] is None:  # densos: mesmo tamanho, soma direta
+        n = sum(p[1] for p in parciais)
+        somas = {m: sum(p[2][m] for p in parciais) for m in medidas}
+        presentes = np.flatnonzero(n)
+        return presentes, n[presentes], {m: s[presentes] for m, s in somas.items()}
+    chaves, unicas = pd.factorize(np.concatenate([p[0] for p in parciais]), sort=True)
+    n = np.bincount(chaves, weights=np.concatenate([p[1] for p in parciais]), minlength=len(unicas))
+    somas = {m: np.bincount(chaves, weights=np.concatenate([p[2][m] for p in parciais]), minlength=len(unicas))
+             for m in medidas}
+    presentes = np.flatnonzero(n)
+    return unicas[presentes], n[presentes].astype('int64'), {m: s[presentes] for m, s in somas.items()}
+
+
+class CuboParticionado:
+    def __init__(self, df, conjuntos=None, medidas=MEDIDAS, executor=None, processos=1,
+                 min_linhas=MIN_LINHAS_PARTICAO):
+        self.conjuntos = dict(CONJUNTOS if conjuntos is None else conjuntos)
+        self.medidas = tuple(medidas)
+        self.executor = executor
+        self.processos = processos
+        self.min_linhas = min_linhas
+        self.dims = sorted({d for conjunto in self.conjuntos.values() for d in conjunto})
+        self.linhas = len(df)
+        self.ordinais = ordinais(df, self.dims)
+
+        codigos, self.categorias = [], {}
+        for d in self.dims:
+            cod, self.categorias[d] = codificar(df[d])
+            codigos.append(cod)
+        tipo = _tipo_codigo(max([len(c) for c in self.categorias.values()], default=0))
+        matriz_codigos = np.empty((len(self.dims), self.linhas), dtype=tipo)
+        for i, cod in enumerate(codigos):
+            matriz_codigos[i] = cod
+        matriz_valores = np.empty((len(self.medidas), self.linhas), dtype='float64')
+        for i, m in enumerate(self.medidas):
+            matriz_valores[i] = df[m].to_numpy(dtype='float64')
+            if np.isnan(matriz_valores[i]).any():
+                raise ValueError(f"A medida {m!r} tem valores nulos; o cubo só soma medidas completas")
+
+        bloco_codigos, self._codigos = _compartilhar(matriz_codigos)
+        bloco_valores, self._valores = _compartilhar(matriz_valores)
+        self._blocos = [bloco_codigos, bloco_valores]
+        # views locais para o caminho sem pool
+        self._matriz_codigos = np.ndarray(matriz_codigos.shape, dtype=tipo, buffer=bloco_codigos.buf)
+        self._matriz_valores = np.ndarray(matriz_valores.shape, dtype='float64', buffer=bloco_valores.buf)
+        # os blocos são removidos quando o objeto sai do cache (ou no fim do processo)
+        self._finalizador = weakref.finalize(self, _liberar, list(self._blocos))
+
+    @property
+    def bytes(self):
+        return sum(bloco.size for bloco in self._blocos)
+
+    def fechar(self):
+        self._matriz_codigos = self._matriz_valores = None
+        self._finalizador()
+
+    def _tarefa(self, linhas):
+        return {
+            'codigos': self._codigos,
+            'valores': self._valores,
+            'linhas': linhas,
+            'dims': self.dims,
+            'medidas': self.medidas,
+            'conjuntos': self.conjuntos,
+            'tamanhos': {d: len(c) for d, c in self.categorias.items()},
+        }
+
+    def _faixas(self, total):
+        particoes = min(self.processos, total // self.min_linhas)
+        limites = np.linspace(0, total, particoes + 1).astype('int64') if particoes > 1 else [0, total]
+        return list(zip(limites[:-1], limites[1:]))
+
+    def construir(self, linhas=None):
+        """``Cubo`` de todas as linhas (ou das posições ``linhas``), agregado em partições no pool."""
+        total = self.linhas if linhas is None else len(linhas)
+        faixas = self._faixas(total) if self.executor is not None else [(0, total)]
+        blocos_linhas = []
+        try:
+            if len(faixas) == 1:
+                codigos, valores = self._matriz_codigos, self._matriz_valores
+                if linhas is not None:
+                    codigos, valores = codigos[:, linhas], valores[:, linhas]
+                parciais = [_agregar_faixa(self._tarefa(None), codigos, valores, total)]
+            else:
+                descricao_linhas = None
+                if linhas is not None:
+                    bloco, descricao_linhas = _compartilhar(np.asarray(linhas, dtype='int64'))
+                    blocos_linhas.append(bloco)
+                tarefa = self._tarefa(descricao_linhas)
+                futuros = [self.executor.submit(_agregar_particao, tarefa, inicio, fim) for inicio, fim in faixas]
+                parciais = [f.result() for f in futuros]
+        finally:
+            _liberar(blocos_linhas)
+
+        tabelas = {}
+        for nome, dims in self.conjuntos.items():
+            tamanhos = [len(self.categorias[d]) for d in dims]
+            originais, n, somas = _somar_parciais([p[nome] for p in parciais], self.medidas)
+            tabelas[nome] = tabela_conjunto(dims, self.categorias, tamanhos, originais, n, somas, self.ordinais)
+        return Cubo(tabelas, dict(self.conjuntos), self.medidas)
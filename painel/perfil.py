@@ -0,0 +1,143 @@
+"""Perfil de inicialização: custo de cada import e tempo de execução do script.
+
+Com ``PERFIL.ativar()`` o ``__import__`` embutido passa a cronometrar cada
+módulo importado pela primeira vez no processo. Só o import de nível mais alto
+de cada thread é registrado: o tempo dos módulos que ele puxa fica somado
+nele, como no ``python -X importtime`` (coluna cumulativa). Imports adiados
+aparecem quando a aba que os usa roda pela primeira vez; os feitos pela carga
+do modelo em segundo plano ficam marcados com o nome da thread.
+
+``iniciar_execucao``/``fim_execucao`` envolvem cada execução do script pelo
+Streamlit; a primeira é a de boot (imports incluídos), as seguintes são os reruns.
+Só as últimas ``max_execucoes`` ficam guardadas; o boot e a contagem ficam à parte.
+
+``streamlit run`` importa streamlit, pandas, numpy e pyarrow antes de executar o
+script, então o perfil ativado pelo app não os vê. Para medi-los, suba o
+servidor por este módulo, que ativa o perfil antes de importar o Streamlit:
+
+    python -m painel.perfil run streamlit_app.py
+"""
+import builtins
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+MAX_EXECUCOES = 100
+
+
+@dataclass
+class RegistroImport:
+    modulo: str
+    segundos: float
+    thread: str
+    execucao: int  # execução do script em que ocorreu (0 = antes da primeira, no servidor)
+
+
+class PerfilInicializacao:
+    def __init__(self, max_execucoes=MAX_EXECUCOES):
+        self.imports = []  # um por módulo novo: limitado pelos módulos do processo
+        self.execucoes = deque(maxlen=max_execucoes)  # segundos das últimas execuções do script, na ordem
+        self.boot = None  # segundos da primeira execução
+        self.total_execucoes = 0
+        self.thread_script = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._original = None
+
+    @property
+    def ativo(self):
+        return self._original is not None
+
+    def ativar(self):
+        """Passa a cronometrar imports novos (idempotente); devolve o próprio perfil."""
+        with self._lock:
+            if self._original is None:
+                self._original = builtins.__import__
+                builtins.__import__ = self._importar
+        return self
+
+    def desativar(self):
+        with self._lock:
+            if self._original is not None:
+                builtins.__import__ = self._original
+                self._original = None
+
+    def _importar(self, nome, globais=None, locais=None, lista=(), nivel=0):
+        original = self._original or builtins.__import__
+        # relativo, já carregado ou aninhado em outro import cronometrado: só repassa
+        if nivel or nome in sys.modules or getattr(self._local, 'profundidade', 0):
+            return original(nome, globais, locais, lista, nivel)
+        self._local.profundidade = 1
+        inicio = time.perf_counter()
+        try:
+            return original(nome, globais, locais, lista, nivel)
+        finally:
+            self._local.profundidade = 0
+            em_execucao = getattr(self._local, 'inicio', None) is not None
+            registro = RegistroImport(nome, time.perf_counter() - inicio, threading.current_thread().name,
+                                      self.total_execucoes + em_execucao)
+            with self._lock:
+                self.imports.append(registro)
+
+    def iniciar_execucao(self):
+        # por thread: sessões diferentes rodam o script em threads próprias
+        self._local.inicio = time.perf_counter()
+        self.thread_script = threading.current_thread().name
+
+    def fim_execucao(self):
+        """Fecha a execução atual; devolve seus segundos (``None`` se não foi iniciada)."""
+        inicio = getattr(self._local, 'inicio', None)
+        if inicio is None:
+            return None
+        segundos = time.perf_counter() - inicio
+        self._local.inicio = None
+        with self._lock:
+            if self.boot is None:
+                self.boot = segundos
+            self.total_execucoes += 1
+            self.execucoes.append(segundos)
+        return segundos
+
+    def mais_caros(self, n=15):
+        with self._lock:
+            return sorted(self.imports, key=lambda r: r.segundos, reverse=True)[:n]
+
+    def resumo(self, n=15):
+        """Texto com o tempo de boot, o último rerun e os ``n`` imports mais caros."""
+        linhas = []
+        if self.boot is not None:
+            linhas.append(f"boot: {self.boot:.3f}s")
+            if self.total_execucoes > 1:
+                linhas.append(f"último rerun: {self.execucoes[-1]:.3f}s ({self.total_execucoes - 1} reruns)")
+        for r in self.mais_caros(n):
+            quando = "servidor" if r.execucao == 0 else "boot" if r.execucao == 1 else f"execução {r.execucao}"
+            thread = "" if r.thread in (self.thread_script, 'MainThread') else f" [{r.thread}]"
+            linhas.append(f"{r.segundos:8.3f}s  {r.modulo} ({quando}){thread}")
+        return "\n".join(linhas)
+
+
+PERFIL = PerfilInicializacao()
+
+
+def main(argv=None):
+    """Ativa o perfil e repassa ``argv`` (ex. ``run streamlit_app.py``) para a linha de comando do Streamlit."""
+    # como ``python -m`` este arquivo é ``__main__``; o app usa o PERFIL de ``painel.perfil``
+    from painel.perfil import PERFIL as perfil
+
+    perfil.ativar()
+    os.environ['PAINEL_PERFIL'] = '1'
+    # separados do streamlit no resumo (senão entram somados no import dele)
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import pyarrow  # noqa: F401
+    from streamlit.web import cli
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    return cli.main(args=argv, prog_name='streamlit')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Etapa de preparação: colunas derivadas calculadas uma vez por dataset.
+
+O app guarda o resultado em cache pela chave do dataset (hash do conteúdo);
+os filtros da barra lateral só recortam as colunas já prontas.
+"""
+import numpy as np
+import pandas as pd
+
+from painel.beneficios import COLUNA_BENEFICIOS, COLUNA_MASCARA, mascara_beneficios
+from painel.ingestao import COLUNA_IDADE_MESES, parse_idade_meses
+from painel.recodificacao import recode_scores
+
+COLUNAS_INDICE = ('alimentos_score', 'tosse_score', 'cozinha_score')
+FAIXAS_ETARIAS = [0, 12, 24, 36, 48, 60]
+ROTULOS_FAIXAS = ["0-12m", "12-24m", "24-36m", "36-48m", "48-60m"]
+
+
+def preparar_dataset(df):
+    """Devolve um novo frame com idade numérica, scores, índice, faixa etária e máscara de benefícios
+    (``df`` não é alterado)."""
+    df = df.copy(deep=False)
+    df[COLUNA_IDADE_MESES] = parse_idade_meses(df[COLUNA_IDADE_MESES])
+    for nome, valores in recode_scores(df).items():
+        df[nome] = valores
+    df['indice_desenvolvimento'] = sum(df[col].to_numpy() for col in COLUNAS_INDICE) / len(COLUNAS_INDICE)
+    df['FaixaEtaria'] = pd.cut(df[COLUNA_IDADE_MESES], bins=FAIXAS_ETARIAS, labels=ROTULOS_FAIXAS)
+    if COLUNA_BENEFICIOS in df.columns:
+        df[COLUNA_MASCARA] = mascara_beneficios(df[COLUNA_BENEFICIOS])
+    else:
+        df[COLUNA_MASCARA] = np.zeros(len(df), dtype=np.uint8)
+    return df
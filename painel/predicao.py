@@ -0,0 +1,306 @@
+"""Codificação das respostas para o modelo de alimentação e predição em lote.
+
+As tabelas de mapeamento são as mesmas do formulário da aba "Análise
+Preditiva"; o lote aplica-as por categoria (e não por linha), monta a matriz
+de atributos inteira de uma vez e pontua em blocos com ``predict_proba``,
+opcionalmente em paralelo com joblib.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from painel.beneficios import COLUNA_BENEFICIOS, LETRAS, mascara_resposta, total_beneficios
+from painel.ingestao import COLUNA_IDADE_MESES, parse_idade_meses
+
+MAPEAMENTO = {
+    "Região": {"Norte": 1, "Nordeste": 2, "Sudeste": 3, "Sul": 4, "Centro-Oeste": 5},
+    "Sexo": {"Masculino": 1, "Feminino": 2},
+    "Domicílio": {"Casa": 1, "Apartamento": 2, "Outros": 3},
+    "Cozinha": {"Sim": 1, "Não": 0},
+    "Ocupação": {
+        "Próprio de algum morador - já pago": 1,
+        "Próprio de algum morador - ainda pagando": 2,
+        "Alugado": 3,
+        "Cedido por empregador": 4,
+        "Cedido de outra forma": 5,
+        "Outra condição": 6
+    },
+    "Registro": {"Urbano": 1, "Rural": 2},
+    "Tosse": {"Sim": 1, "Não": 2, "Não sabe/ não quis responder": 9},
+    "Respiração": {"Sim": 1, "Não": 2, "Não sabe/ não quis responder": 9},
+    "Escolaridade": {
+        "Sem estudo": 0,
+        "1° ano do ensino fundamental": 1,
+        "1ª série/ 2°ano do ensino fundamental": 2,
+        "2ª série/ 3°ano do ensino fundamental": 3,
+        "3ª série/ 4°ano do ensino fundamental": 4,
+        "4ª série/ 5°ano do ensino fundamental": 5,
+        "5ª série/ 6°ano do ensino fundamental": 6,
+        "6ª série/ 7°ano do ensino fundamental": 7,
+        "7ª série/ 8°ano do ensino fundamental": 8,
+        "8ª série/ 9°ano do ensino fundamental": 9,
+        "1°ano do ensino médio": 10,
+        "2°ano do ensino médio": 11,
+        "3°ano do ensino médio": 12,
+        "Ensino superior incompleto": 13,
+        "Ensino superior completo": 14
+    },
+    "Renda": {
+        "Sem renda": 1,
+        "Até R$ 1.000,00": 2,
+        "De R$ 1.001,00 até R$ 2.000,00": 3,
+        "De R$ 2.001,00 até R$ 3.000,00": 4,
+        "De R$ 3.001,00 até R$ 5.000,00": 5,
+        "De R$ 5.001,00 até R$ 10.000,00": 6,
+        "R$ 10.001,00 ou mais": 7
+    }
+}
+MAPEAMENTO_COR_PESSOA = {
+    "Branca": 1,
+    "Preta": 2,
+    "Amarela (origem japonesa, chinesa, coreana etc.)": 3,
+    "Parda (mulata, cabocla, cafuza, mameluca ou mestiça)": 4,
+    "Indígena": 5,
+    "Não sabe/não quis responder": 9
+}
+MAPEAMENTO_SIM_NAO = {"Sim": 1, "Não": 2}
+MAPEAMENTO_ALIMENTOS_REVERSO = {
+    1: "Não",
+    2: "Sim, raramente",
+    3: "Sim, às vezes",
+    4: "Sim, quase sempre",
+    5: "Sim, sempre",
+    6: "Não se cozinha em casa"
+}
+
+@dataclass(frozen=True)
+class Atributo:
+    """Uma coluna da matriz do modelo.
+
+    ``tabela`` ``None`` = coluna numérica (aceita "12 meses"); dict = mapeamento da
+    resposta (fora dele vale ``padrao``, nula vale ``NaN``); função = valor calculado
+    a partir da resposta (``None`` quando nula).
+    """
+    nome: str
+    coluna: str
+    tabela: object = None
+    padrao: float = np.nan
+
+    def valor(self, resposta):
+        if isinstance(self.tabela, dict):
+            return np.nan if resposta is None else self.tabela.get(resposta, self.padrao)
+        return float(self.tabela(resposta))
+
+
+# Ordem fixa dos atributos com que o modelo foi treinado
+ATRIBUTOS = (
+    Atributo('idade', 'Idade'),
+    Atributo('idade_meses', COLUNA_IDADE_MESES),
+    Atributo('regiao', 'Região', MAPEAMENTO["Região"]),
+    Atributo('sexo', 'Sexo', MAPEAMENTO["Sexo"]),
+    # no formulário "Outros" cobre qualquer tipo de domicílio fora de casa/apartamento
+    Atributo('domicilio', 'Tipo de Domicílio', MAPEAMENTO["Domicílio"], MAPEAMENTO["Domicílio"]["Outros"]),
+    Atributo('cozinha', 'Possui Cozinha', MAPEAMENTO["Cozinha"]),
+    Atributo('ocupacao', 'Ocupação', MAPEAMENTO["Ocupação"]),
+    Atributo('registro', 'Situação do Registro', MAPEAMENTO["Registro"]),
+    Atributo('tosse', 'Presença de Tosse', MAPEAMENTO["Tosse"]),
+    Atributo('respiracao', 'Tipo de Respiração', MAPEAMENTO["Respiração"]),
+    Atributo('escolaridade', 'Nivel Escolaridade', MAPEAMENTO["Escolaridade"]),
+    Atributo('renda', 'Faixa de Renda', MAPEAMENTO["Renda"]),
+    *(
+        Atributo(f'beneficio_{letra}', COLUNA_BENEFICIOS, lambda r, i=i: mascara_resposta(r) >> i & 1)
+        for i, letra in enumerate(LETRAS)
+    ),
+    Atributo('total_beneficios', COLUNA_BENEFICIOS, lambda r: total_beneficios(mascara_resposta(r))),
+    Atributo('cor_pessoa', 'Cor Pessoa', MAPEAMENTO_COR_PESSOA),
+    Atributo('moradores_sim', 'Moradores que Alimentaram Acabamento (Sim)', MAPEAMENTO_SIM_NAO),
+    Atributo('moradores_nao', 'Moradores que Alimentaram Acabamento (Não)', MAPEAMENTO_SIM_NAO),
+)
+
+TAMANHO_BLOCO = 50_000
+
+
+@dataclass
+class RelatorioPredicao:
+    linhas: int
+    validas: int
+    segundos: float
+    unicas: int  # vetores de atributos distintos entre as linhas válidas
+
+    @property
+    def linhas_por_segundo(self):
+        return self.linhas / self.segundos if self.segundos else float('inf')
+
+
+def _numero(resposta):
+    if isinstance(resposta, str):
+        resposta = resposta.replace(' meses', '').strip()
+    try:
+        return float(resposta)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class CodificadorAtributos:
+    """Converte respostas do questionário na matriz de atributos do modelo.
+
+    ``codificar`` trabalha sobre um DataFrame inteiro: cada coluna categórica é
+    resolvida uma vez por categoria e espalhada pelos códigos, direto numa matriz
+    float32 contígua (o dtype que as árvores do scikit-learn usam internamente,
+    evitando uma cópia no ``predict_proba``). ``codificar_linha`` é o caminho
+    rápido do formulário, sem pandas. Respostas fora das tabelas viram ``NaN``.
+    """
+
+    def __init__(self, atributos=ATRIBUTOS, dtype='float32'):
+        self.atributos = tuple(atributos)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def nomes(self):
+        return [atr.nome for atr in self.atributos]
+
+    @property
+    def colunas(self):
+        return list(dict.fromkeys(atr.coluna for atr in self.atributos))
+
+    def codificar(self, df):
+        """``(matriz n × atributos, máscara das linhas sem NaN)``."""
+        faltando = [col for col in self.colunas if col not in df.columns]
+        if faltando:
+            raise KeyError(f"Colunas ausentes para a predição em lote: {', '.join(faltando)}")
+        # preenchido por atributo (linhas contíguas) e transposto uma vez: bem mais barato que
+        # escrever colunas com passo numa matriz C
+        saida = np.empty((len(self.atributos), len(df)), dtype=self.dtype)
+        categoricas = {}
+        for j, atr in enumerate(self.atributos):
+            if atr.tabela is None:
+                saida[j] = parse_idade_meses(df[atr.coluna]).to_numpy(dtype='float32')
+                continue
+            if atr.coluna not in categoricas:
+                serie = df[atr.coluna]
+                if not isinstance(serie.dtype, pd.CategoricalDtype):
+                    serie = serie.astype('category')
+                categoricas[atr.coluna] = (serie.cat.codes.to_numpy(), serie.cat.categories)
+            codigos, categorias = categoricas[atr.coluna]
+            # a última posição atende o código -1 (nulo)
+            por_categoria = np.array([atr.valor(c) for c in categorias] + [atr.valor(None)], dtype=self.dtype)
+            saida[j] = por_categoria[codigos]
+        saida = np.ascontiguousarray(saida.T)
+        return saida, ~np.isnan(saida).any(axis=1)
+
+    def codificar_linha(self, respostas):
+        """Matriz 1 × atributos para um único dict ``{coluna: resposta}``."""
+        valores = [
+            _numero(respostas.get(atr.coluna)) if atr.tabela is None else atr.valor(respostas.get(atr.coluna))
+            for atr in self.atributos
+        ]
+        return np.array([valores], dtype=self.dtype)
+
+
+CODIFICADOR = CodificadorAtributos()
+
+
+def linhas_unicas(atributos):
+    """``(linhas distintas, inverso)`` com ``unicas[inverso]`` igual a ``atributos`` (comparação byte a byte)."""
+    atributos = np.ascontiguousarray(atributos)
+    if len(atributos) == 0:
+        return atributos, np.empty(0, dtype=np.intp)
+    como_bytes = atributos.view(np.dtype((np.void, atributos.dtype.itemsize * atributos.shape[1]))).ravel()
+    _, indices, inverso = np.unique(como_bytes, return_index=True, return_inverse=True)
+    return atributos[indices], inverso.ravel()
+
+
+def probabilidades_em_lote(modelo, atributos, tamanho_bloco=TAMANHO_BLOCO, n_jobs=1):
+    """``predict_proba`` em blocos.
+
+    Os blocos rodam em threads: a travessia das árvores do scikit-learn libera o
+    GIL e o modelo não precisa ser copiado para cada worker.
+    """
+    if len(atributos) == 0:
+        return np.empty((0, len(modelo.classes_)))
+    from joblib import Parallel, delayed  # adiado: só a predição em lote usa
+
+    blocos = [atributos[i:i + tamanho_bloco] for i in range(0, len(atributos), tamanho_bloco)]
+    return np.concatenate(Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(modelo.predict_proba)(bloco) for bloco in blocos
+    ))
+
+
+class PreditorMemorizado:
+    """``predict_proba`` com memo por vetor de atributos, num ``CacheLRU`` compartilhado.
+
+    O cache deve ser exclusivo de uma versão do modelo (a chave é só o vetor).
+    Cada chamada pontua apenas os vetores distintos que não estão no cache;
+    ``pontuar`` permite trocar o ``modelo.predict_proba`` por outra função
+    (ex. ``probabilidades_em_lote``) para esses vetores. Quem já tem as linhas
+    distintas (``prever_dataset``) chama ``predict_proba_unicas`` direto.
+    """
+
+    def __init__(self, modelo, cache, pontuar=None):
+        self.modelo = modelo
+        self.cache = cache
+        self.pontuar = pontuar or modelo.predict_proba
+        self.classes_ = modelo.classes_
+
+    def predict_proba(self, X):
+        unicas, inverso = linhas_unicas(np.asarray(X, dtype=np.float32))
+        return self.predict_proba_unicas(unicas)[inverso]
+
+    def predict_proba_unicas(self, unicas):
+        """Como ``predict_proba`` para linhas já distintas (saída de ``linhas_unicas``), sem deduplicar de novo."""
+        unicas = np.asarray(unicas, dtype=np.float32)
+        chaves = [linha.tobytes() for linha in unicas]
+        saida = np.empty((len(unicas), len(self.classes_)))
+        faltando = []
+        for i, chave in enumerate(chaves):
+            probabilidades = self.cache.get(chave)
+            if probabilidades is None:
+                faltando.append(i)
+            else:
+                saida[i] = probabilidades
+        if faltando:
+            novas = self.pontuar(unicas[faltando])
+            saida[faltando] = novas
+            for i, probabilidades in zip(faltando, novas):
+                self.cache.put(chaves[i], probabilidades.copy())
+        return saida
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def prever_dataset(modelo, df, tamanho_bloco=TAMANHO_BLOCO, n_jobs=1, cache=None):
+    """Codifica e pontua ``df`` inteiro; devolve ``(resultados, RelatorioPredicao)``.
+
+    Linhas com o mesmo vetor de atributos são pontuadas uma única vez e o
+    resultado é espalhado de volta; com ``cache`` (um ``CacheLRU`` da versão do
+    modelo), vetores já vistos em lotes ou no formulário nem chegam ao modelo.
+    ``resultados`` tem as colunas originais mais "Alimentação Prevista" e
+    "Confiança" (vazias nas linhas que não puderam ser codificadas).
+    """
+    inicio = time.perf_counter()
+    atributos, validas = CODIFICADOR.codificar(df)
+    unicas, inverso = linhas_unicas(atributos[validas])
+
+    def pontuar(X):
+        return probabilidades_em_lote(modelo, X, tamanho_bloco, n_jobs)
+
+    if cache is not None:
+        probabilidades = PreditorMemorizado(modelo, cache, pontuar).predict_proba_unicas(unicas)
+    else:
+        probabilidades = pontuar(unicas)
+    melhores = probabilidades.argmax(axis=1)
+    classes = modelo.classes_[melhores][inverso]
+    confianca = probabilidades[np.arange(len(melhores)), melhores][inverso]
+    segundos = time.perf_counter() - inicio
+
+    confianca_completa = np.full(len(df), np.nan)
+    confianca_completa[validas] = confianca
+    previsto = np.empty(len(df), dtype=object)
+    previsto[validas] = pd.Series(classes).map(MAPEAMENTO_ALIMENTOS_REVERSO).to_numpy()
+    resultados = df.copy(deep=False)
+    resultados['Alimentação Prevista'] = previsto
+    resultados['Confiança'] = confianca_completa
+    return resultados, RelatorioPredicao(len(df), int(validas.sum()), segundos, len(unicas))
@@ -0,0 +1,56 @@
+"""Cálculos exatos em segundo plano para a renderização progressiva.
+
+O script agenda o cálculo exato (o cubo das linhas filtradas) e espera por ele
+no máximo o orçamento de tempo configurado; se não ficar pronto, desenha a
+prévia a partir da amostra e volta a consultar o mesmo futuro nos reruns
+seguintes. Os futuros ficam guardados por chave (dataset + filtros), então
+reruns e sessões com o mesmo estado não disparam o cálculo de novo. Se o
+cálculo falhar, a prévia continua servida e o próximo ``iniciar`` da mesma
+chave agenda outra tentativa.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class CalculosEmSegundoPlano:
+    def __init__(self, threads=1, max_itens=16):
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='calculo-exato')
+        self._futuros = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_itens = max_itens
+
+    def iniciar(self, chave, funcao):
+        """Futuro do cálculo de ``chave``; só agenda ``funcao`` se não houver um (ou se o anterior falhou)."""
+        with self._lock:
+            futuro = self._futuros.get(chave)
+            if futuro is None or (futuro.done() and futuro.exception() is not None):
+                futuro = self._executor.submit(funcao)
+                self._futuros[chave] = futuro
+            self._futuros.move_to_end(chave)
+            # descarta os mais antigos já terminados; os em andamento ficam até acabar
+            for antiga in list(self._futuros)[:-self.max_itens]:
+                if self._futuros[antiga].done():
+                    del self._futuros[antiga]
+            return futuro
+
+    @staticmethod
+    def aguardar(futuro, orcamento):
+        """Resultado se ficar pronto em até ``orcamento`` segundos, senão ``None``.
+
+        Um cálculo que falhou também devolve ``None`` (o app segue com a prévia);
+        a exceção fica disponível em ``falha(futuro)``.
+        """
+        try:
+            return futuro.result(timeout=orcamento)
+        except TimeoutError:
+            return None
+        except Exception:
+            return None
+
+    @staticmethod
+    def falha(futuro):
+        """Exceção levantada pelo cálculo, ou ``None`` se ele ainda roda ou terminou bem."""
+        if not futuro.done() or futuro.cancelled():
+            return None
+        return futuro.exception()
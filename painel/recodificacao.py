@@ -0,0 +1,70 @@
+"""Tabela declarativa de recodificação das respostas em scores.
+
+Cada score é uma linha da tabela ``RECODIFICACOES``: a coluna de origem, as
+regras (texto -> valor, a primeira que casar vence) e o valor padrão. As
+regras são avaliadas uma única vez sobre os valores distintos da coluna e o
+resultado é espalhado para as linhas por busca nos códigos categóricos, sem
+chamadas Python por linha.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+MODOS = ('igual', 'contem')
+
+
+@dataclass(frozen=True)
+class Recodificacao:
+    coluna: str
+    regras: tuple  # ((texto, score), ...)
+    modo: str = 'igual'  # 'igual': compara após strip().lower(); 'contem': substring, sensível a caixa
+    padrao: float = 0.0  # valores sem regra, vazios ou não textuais
+
+    def __post_init__(self):
+        if self.modo not in MODOS:
+            raise ValueError(f"Modo desconhecido: {self.modo!r} (opções: {', '.join(MODOS)})")
+
+    def scores_categorias(self, categorias):
+        """Score de cada valor distinto (vetorizado com ``np.select``)."""
+        categorias = pd.Index(categorias)
+        e_texto = np.fromiter((isinstance(c, str) for c in categorias), dtype=bool, count=len(categorias))
+        texto = pd.Series(categorias.astype(str), dtype=object)
+        if self.modo == 'igual':
+            normalizado = texto.str.strip().str.lower()
+            condicoes = [e_texto & (normalizado == alvo.lower()).to_numpy() for alvo, _ in self.regras]
+        else:
+            condicoes = [e_texto & texto.str.contains(alvo, regex=False).to_numpy() for alvo, _ in self.regras]
+        valores = [float(score) for _, score in self.regras]
+        return np.select(condicoes, valores, default=self.padrao).astype('float64')
+
+    def aplicar(self, serie):
+        """Scores da série inteira como ``ndarray`` float64."""
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            categorias = serie.cat.categories
+        else:
+            codigos, categorias = pd.factorize(serie, use_na_sentinel=True)
+        # o último elemento da tabela é o padrão: código -1 (nulo) cai nele
+        tabela = np.append(self.scores_categorias(categorias), self.padrao)
+        return tabela[codigos]
+
+
+RECODIFICACOES = {
+    'alimentos_score': Recodificacao(
+        'Alimentos Básicos', (("Sim, sempre", 1.0), ("Sim, quase sempre", 0.5)), modo='contem'
+    ),
+    'tosse_score': Recodificacao('Presença de Tosse', (("não", 1.0), ("sim", 0.0))),
+    'cozinha_score': Recodificacao('Possui Cozinha', (("sim", 1.0), ("não", 0.0))),
+    'respiracao_score': Recodificacao('Tipo de Respiração', (("não", 1.0), ("sim", 0.0))),
+}
+
+
+def recode_scores(df, recodificacoes=None):
+    """Calcula os scores da tabela cujas colunas de origem existem em ``df``; devolve ``{nome: ndarray}``."""
+    recodificacoes = RECODIFICACOES if recodificacoes is None else recodificacoes
+    return {
+        nome: regra.aplicar(df[regra.coluna])
+        for nome, regra in recodificacoes.items()
+        if regra.coluna in df.columns
+    }
@@ -0,0 +1,296 @@
+"""Gerador sintético da pesquisa: semente fixa, vetorizado e com dependências entre colunas.
+
+Usado no modo de demonstração (sem upload) e nos benchmarks. ``gerar_pesquisa``
+devolve o mesmo esquema de ``read_survey`` (categorias só com os valores
+presentes, em ordem alfabética, "Idade em Meses" e "Idade" em float32), então
+o frame passa por ``preparar_dataset``, filtros, cubo e predição como um CSV
+real; ``gerar_respostas`` devolve as respostas como no arquivo ("12 meses"). As respostas seguem uma cadeia simples: a região define a distribuição
+da faixa de renda, da cor e da situação urbana/rural; a renda puxa
+escolaridade, domicílio, cozinha, ocupação, benefícios e acesso a alimentos;
+cozinha e alimentos influenciam tosse, respiração e as perguntas sobre os
+moradores. As proporções são plausíveis, não estimativas oficiais.
+
+Cada coluna é sorteada por inversão da CDF (``searchsorted``) em grupos do
+pai, sem laços por linha; só as colunas pedidas (e as que elas dependem) são
+geradas. ``blocos_pesquisa`` parte um tamanho grande em blocos com sementes
+derivadas, e ``gravar_parquet`` (frame tipado) e ``gravar_csv`` (respostas em
+texto, o formato do upload) escrevem bloco a bloco.
+"""
+import numpy as np
+import pandas as pd
+
+from painel.beneficios import COLUNA_BENEFICIOS, LETRAS
+from painel.ingestao import COLUNA_IDADE_MESES, COLUNAS_CATEGORICAS, parse_idade_meses
+from painel.predicao import MAPEAMENTO, MAPEAMENTO_ALIMENTOS_REVERSO, MAPEAMENTO_COR_PESSOA, MAPEAMENTO_SIM_NAO
+
+TAMANHO_BLOCO = 1_000_000
+MESES = 60
+
+REGIOES = list(MAPEAMENTO['Região'])  # Norte, Nordeste, Sudeste, Sul, Centro-Oeste
+PESOS_REGIAO = [0.09, 0.27, 0.42, 0.14, 0.08]
+RENDAS = list(MAPEAMENTO['Renda'])
+RENDA_POR_REGIAO = [
+    [0.10, 0.34, 0.27, 0.13, 0.09, 0.05, 0.02],
+    [0.12, 0.38, 0.25, 0.11, 0.08, 0.04, 0.02],
+    [0.05, 0.20, 0.25, 0.18, 0.15, 0.11, 0.06],
+    [0.04, 0.18, 0.25, 0.19, 0.16, 0.12, 0.06],
+    [0.05, 0.22, 0.26, 0.17, 0.14, 0.10, 0.06],
+]
+CORES = list(MAPEAMENTO_COR_PESSOA)  # Branca, Preta, Amarela, Parda, Indígena, Não sabe
+COR_POR_REGIAO = [
+    [0.19, 0.08, 0.01, 0.67, 0.04, 0.01],
+    [0.25, 0.11, 0.01, 0.61, 0.01, 0.01],
+    [0.50, 0.10, 0.01, 0.37, 0.005, 0.015],
+    [0.73, 0.05, 0.01, 0.19, 0.005, 0.015],
+    [0.36, 0.09, 0.01, 0.52, 0.01, 0.01],
+]
+RURAL_POR_REGIAO = [0.25, 0.27, 0.07, 0.14, 0.10]
+ESCOLARIDADES = list(MAPEAMENTO['Escolaridade'])
+DOMICILIOS = ['Casa', 'Apartamento', 'Habitação em casa de cômodos']
+OCUPACOES = list(MAPEAMENTO['Ocupação'])
+# interpolada entre a menor e a maior faixa de renda
+OCUPACAO_RENDA = ([0.45, 0.05, 0.25, 0.03, 0.15, 0.07], [0.55, 0.20, 0.17, 0.02, 0.04, 0.02])
+ALIMENTOS = [MAPEAMENTO_ALIMENTOS_REVERSO[c] for c in (5, 4, 3, 2, 1, 6)]  # "Sim, sempre" ... "Não se cozinha"
+ALIMENTOS_RENDA = ([0.30, 0.25, 0.22, 0.10, 0.13, 0.0], [0.75, 0.15, 0.06, 0.02, 0.02, 0.0])
+ALIMENTOS_SEM_COZINHA = [0.05, 0.05, 0.10, 0.05, 0.15, 0.60]
+# P("Sim") de moradores que passaram fome, por resposta de alimentos básicos
+MORADORES_POR_ALIMENTOS = [0.05, 0.12, 0.30, 0.45, 0.60, 0.20]
+SIM_NAO = list(MAPEAMENTO_SIM_NAO)
+TOSSE = list(MAPEAMENTO['Tosse'])  # Sim, Não, Não sabe
+SEXOS = list(MAPEAMENTO['Sexo'])
+REGISTROS = list(MAPEAMENTO['Registro'])
+# P(benefício) por faixa de renda, na ordem de LETRAS
+BENEFICIO_POR_RENDA = {
+    'A': [0.55, 0.45, 0.25, 0.10, 0.04, 0.01, 0.005],
+    'B': [0.06, 0.05, 0.04, 0.03, 0.02, 0.01, 0.01],
+    'C': [0.05, 0.04, 0.03, 0.02, 0.01, 0.01, 0.005],
+    'D': [0.04, 0.03, 0.02, 0.02, 0.01, 0.005, 0.005],
+    'E': [0.03, 0.04, 0.05, 0.06, 0.06, 0.05, 0.04],
+    'F': [0.02, 0.03, 0.05, 0.07, 0.09, 0.10, 0.10],
+    'G': [0.02, 0.02, 0.02, 0.02, 0.01, 0.01, 0.01],
+}
+# respostas de benefícios: máscara m (1..127) -> "A,F"; m = 0 (nenhum) fica nulo, como a célula vazia do CSV
+RESPOSTAS_BENEFICIOS = [",".join(l for i, l in enumerate(LETRAS) if m >> i & 1) for m in range(1, 1 << len(LETRAS))]
+
+COLUNAS = COLUNAS_CATEGORICAS + [COLUNA_IDADE_MESES, 'Idade']
+
+
+def _sortear(rng, probabilidades, grupos=None, linhas=None):
+    """Códigos sorteados de ``probabilidades`` (K,) ou, por linha, de ``probabilidades[grupos]`` (G, K)."""
+    acumuladas = np.cumsum(np.atleast_2d(np.asarray(probabilidades, dtype='float64')), axis=-1)
+    acumuladas /= acumuladas[:, -1:]
+    n_grupos, k = acumuladas.shape
+    if grupos is None:
+        grupos = np.zeros(linhas, dtype='int64')
+    grupos = np.asarray(grupos, dtype='int64')
+    # as CDFs dos grupos lado a lado em [g, g + 1]: uma busca só para todas as linhas
+    deslocadas = (acumuladas + np.arange(n_grupos)[:, None]).ravel()
+    posicoes = np.searchsorted(deslocadas, grupos + rng.random(len(grupos)), side='right')
+    return np.minimum(posicoes - grupos * k, k - 1).astype('int8')
+
+
+def _interpolar(extremos, passos):
+    baixo, alto = (np.asarray(e, dtype='float64') for e in extremos)
+    pesos = np.linspace(0, 1, passos)[:, None]
+    return (1 - pesos) * baixo + pesos * alto
+
+
+class _Gerador:
+    """Códigos de cada coluna, gerados sob demanda (com as dependências) e memorizados."""
+
+    def __init__(self, linhas, rng):
+        self.linhas = linhas
+        self.rng = rng
+        self._codigos = {}
+
+    def __getitem__(self, nome):
+        if nome not in self._codigos:
+            self._codigos[nome] = getattr(self, '_' + nome)()
+        return self._codigos[nome]
+
+    def _sortear(self, probabilidades, grupos=None):
+        return _sortear(self.rng, probabilidades, grupos, self.linhas)
+
+    def _bernoulli(self, probabilidade):
+        return self.rng.random(self.linhas) < probabilidade
+
+    def _regiao(self):
+        return self._sortear(PESOS_REGIAO)
+
+    def _renda(self):
+        return self._sortear(RENDA_POR_REGIAO, self['regiao'])
+
+    def _cor(self):
+        return self._sortear(COR_POR_REGIAO, self['regiao'])
+
+    def _registro(self):
+        return self._bernoulli(np.asarray(RURAL_POR_REGIAO)[self['regiao']]).astype('int8')
+
+    def _escolaridade(self):
+        media = 4 + 1.5 * self['renda']
+        nivel = np.rint(media + 3 * self.rng.standard_normal(self.linhas))
+        return np.clip(nivel, 0, len(ESCOLARIDADES) - 1).astype('int8')
+
+    def _domicilio(self):
+        renda = np.arange(len(RENDAS))
+        apartamento = np.stack([0.04 + 0.04 * renda, np.full(len(RENDAS), 0.01)])  # urbano, rural
+        comodos = np.clip(0.06 - 0.007 * renda, 0.01, None)[None, :].repeat(2, axis=0)
+        tabela = np.stack([1 - apartamento - comodos, apartamento, comodos], axis=-1).reshape(-1, 3)
+        return self._sortear(tabela, self['registro'].astype('int64') * len(RENDAS) + self['renda'])
+
+    def _cozinha(self):
+        # código 0 = "Sim", 1 = "Não" (ordem de SIM_NAO)
+        return (~self._bernoulli(0.88 + 0.017 * self['renda'])).astype('int8')
+
+    def _ocupacao(self):
+        return self._sortear(_interpolar(OCUPACAO_RENDA, len(RENDAS)), self['renda'])
+
+    def _alimentos(self):
+        tabela = np.vstack([_interpolar(ALIMENTOS_RENDA, len(RENDAS)), [ALIMENTOS_SEM_COZINHA]])
+        grupos = np.where(self['cozinha'] == 1, len(RENDAS), self['renda'])
+        return self._sortear(tabela, grupos)
+
+    def _moradores_sim(self):
+        return (~self._bernoulli(np.asarray(MORADORES_POR_ALIMENTOS)[self['alimentos']])).astype('int8')
+
+    def _moradores_nao(self):
+        # quase sempre a resposta oposta à da pergunta "(Sim)"
+        inverte = self._bernoulli(0.9)
+        return np.where(inverte, 1 - self['moradores_sim'], self['moradores_sim']).astype('int8')
+
+    def _tosse(self):
+        # grupos: sem cozinha (+0.08) x rural (+0.04)
+        sim = 0.22 + np.array([0.0, 0.04, 0.08, 0.12])
+        tabela = np.stack([sim, 0.98 - sim, np.full(4, 0.02)], axis=-1)
+        return self._sortear(tabela, 2 * self['cozinha'] + self['registro'])
+
+    def _respiracao(self):
+        return self._sortear([[0.35, 0.63, 0.02], [0.07, 0.91, 0.02], [0.10, 0.40, 0.50]], self['tosse'])
+
+    def _sexo(self):
+        return self._sortear([0.51, 0.49])
+
+    def _meses(self):
+        return self.rng.integers(0, MESES, self.linhas, dtype='int8')
+
+    def _beneficios(self):
+        mascara = np.zeros(self.linhas, dtype='int16')
+        for i, letra in enumerate(LETRAS):
+            mascara |= self._bernoulli(np.asarray(BENEFICIO_POR_RENDA[letra])[self['renda']]).astype('int16') << i
+        return mascara - 1  # código da resposta; -1 = nenhum benefício (nulo)
+
+
+# coluna -> (códigos no gerador, categorias)
+_COLUNAS = {
+    'Região': ('regiao', REGIOES),
+    'Sexo': ('sexo', SEXOS),
+    'Moradores que Alimentaram Acabamento (Sim)': ('moradores_sim', SIM_NAO),
+    'Moradores que Alimentaram Acabamento (Não)': ('moradores_nao', SIM_NAO),
+    'Tipo de Domicílio': ('domicilio', DOMICILIOS),
+    'Possui Cozinha': ('cozinha', SIM_NAO),
+    'Ocupação': ('ocupacao', OCUPACOES),
+    'Situação do Registro': ('registro', REGISTROS),
+    'Presença de Tosse': ('tosse', TOSSE),
+    'Tipo de Respiração': ('respiracao', TOSSE),
+    'Alimentos Básicos': ('alimentos', ALIMENTOS),
+    'Nivel Escolaridade': ('escolaridade', ESCOLARIDADES),
+    COLUNA_BENEFICIOS: ('beneficios', RESPOSTAS_BENEFICIOS),
+    'Faixa de Renda': ('renda', RENDAS),
+    'Cor Pessoa': ('cor', CORES),
+    COLUNA_IDADE_MESES: ('meses', [f"{m} meses" for m in range(MESES)]),
+}
+
+
+def _sortear_colunas(linhas, seed, colunas, nulos):
+    """``{coluna: códigos}`` (posições em ``_COLUNAS[coluna][1]``, -1 = nulo); "Idade" já em float32."""
+    rng = np.random.default_rng(seed)
+    gerador = _Gerador(int(linhas), rng)
+    dados = {}
+    for coluna in colunas or COLUNAS:
+        if coluna == 'Idade':
+            meses = gerador['meses']
+            dados[coluna] = (meses // 12).astype('float32')
+            continue
+        if coluna not in _COLUNAS:
+            raise KeyError(f"Coluna desconhecida no gerador: {coluna!r}")
+        nome, categorias = _COLUNAS[coluna]
+        dados[coluna] = gerador[nome]
+    for coluna, valores in dados.items():
+        if nulos:
+            valores = np.where(rng.random(len(valores)) < nulos, -1 if coluna != 'Idade' else np.nan, valores)
+        dados[coluna] = valores.astype('float32') if coluna == 'Idade' else valores
+    return dados
+
+
+def _como_lida(codigos, categorias):
+    """Categórica como ``read_csv`` monta: só as categorias presentes, em ordem alfabética."""
+    presentes = np.flatnonzero(np.bincount(codigos[codigos >= 0], minlength=len(categorias)))
+    ordem = sorted(presentes, key=lambda k: categorias[k])
+    recodificar = np.full(len(categorias) + 1, -1, dtype='int16')  # a última posição recebe os nulos (-1)
+    recodificar[ordem] = np.arange(len(ordem))
+    return pd.Categorical.from_codes(recodificar[codigos], categories=[categorias[k] for k in ordem])
+
+
+def gerar_respostas(linhas, seed=0, colunas=None, nulos=0.0):
+    """Frame sintético com ``linhas`` respostas como aparecem no arquivo da pesquisa.
+
+    ``colunas`` restringe a saída (só o necessário é sorteado); ``nulos`` é a
+    fração de respostas em branco em cada coluna, sorteada de forma independente.
+    """
+    dados = _sortear_colunas(linhas, seed, colunas, nulos)
+    return pd.DataFrame({
+        coluna: valores if coluna == 'Idade' else pd.Categorical.from_codes(valores, categories=_COLUNAS[coluna][1])
+        for coluna, valores in dados.items()
+    })
+
+
+def gerar_pesquisa(linhas, seed=0, colunas=None, nulos=0.0):
+    """Como ``gerar_respostas``, com o esquema que ``read_survey`` devolveria para o mesmo arquivo."""
+    dados = _sortear_colunas(linhas, seed, colunas, nulos)
+    saida = {}
+    for coluna, valores in dados.items():
+        if coluna == 'Idade':
+            saida[coluna] = valores
+        elif coluna == COLUNA_IDADE_MESES:
+            texto = pd.Series(pd.Categorical.from_codes(valores, categories=_COLUNAS[coluna][1]))
+            saida[coluna] = parse_idade_meses(texto).to_numpy()
+        else:
+            saida[coluna] = _como_lida(valores, _COLUNAS[coluna][1])
+    return pd.DataFrame(saida)
+
+
+def blocos_pesquisa(linhas, tamanho_bloco=TAMANHO_BLOCO, seed=0, gerar=gerar_pesquisa, **kwargs):
+    """Gera ``linhas`` respostas em frames de até ``tamanho_bloco``, com sementes independentes por bloco.
+
+    ``gerar`` é ``gerar_pesquisa`` (frames tipados) ou ``gerar_respostas`` (texto do arquivo).
+    """
+    linhas = int(linhas)
+    n_blocos = max(1, -(-linhas // tamanho_bloco))
+    for i, semente in enumerate(np.random.SeedSequence(seed).spawn(n_blocos)):
+        inicio = i * tamanho_bloco
+        yield gerar(min(tamanho_bloco, linhas - inicio), seed=semente, **kwargs)
+
+
+def gravar_parquet(caminho, linhas, tamanho_bloco=TAMANHO_BLOCO, seed=0, **kwargs):
+    """Grava ``linhas`` respostas em Parquet com o esquema de ``read_survey`` (um row group por bloco,
+    categorias como dicionário)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloco in blocos_pesquisa(linhas, tamanho_bloco, seed, **kwargs):
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema, compression='zstd')
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def gravar_csv(caminho, linhas, tamanho_bloco=TAMANHO_BLOCO, seed=0, **kwargs):
+    """Grava ``linhas`` respostas em CSV, bloco a bloco (o formato que o upload aceita)."""
+    with open(caminho, 'w', encoding='utf-8', newline='') as f:
+        for i, bloco in enumerate(blocos_pesquisa(linhas, tamanho_bloco, seed, gerar_respostas, **kwargs)):
+            bloco.to_csv(f, index=False, header=i == 0)
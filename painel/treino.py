@@ -0,0 +1,204 @@
+"""Retreino do modelo de alimentação a partir do dataset carregado.
+
+Etapas (cada uma cronometrada): atributos com o mesmo ``CODIFICADOR`` da
+predição, validação cruzada estratificada com os folds em processos
+separados (joblib/loky), treino final da floresta com ``n_jobs`` em todos os
+núcleos e gravação de um artefato versionado. O rebalanceamento opcional
+(imbalanced-learn) é aplicado só nos dados de treino de cada fold, dentro de
+um pipeline, para não vazar amostras sintéticas na validação.
+
+Os artefatos ficam em ``<diretório>/<nome>-vNNNN.pkl`` com o ``.sha256`` e um
+``.json`` de métricas ao lado; ``modelo_atual`` aponta para a versão mais nova,
+que o ``CarregadorModelo`` passa a servir.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from painel.predicao import CODIFICADOR, MAPEAMENTO_ALIMENTOS_REVERSO
+
+COLUNA_ALVO = 'Alimentos Básicos'
+ALVO = {rotulo: codigo for codigo, rotulo in MAPEAMENTO_ALIMENTOS_REVERSO.items()}
+BALANCEAMENTOS = ('nenhum', 'oversampling', 'smote')
+METRICAS = ('accuracy', 'f1_macro')
+DIRETORIO_MODELOS = 'modelos'
+NOME_MODELO = 'modelo_alimentos_basicos'
+
+
+@dataclass
+class RelatorioTreino:
+    linhas: int
+    versao: int
+    caminho: str
+    hash: str
+    etapas: dict = field(default_factory=dict)  # etapa -> segundos
+    validacao: dict = field(default_factory=dict)  # métrica -> notas por fold
+
+
+def _imblearn_disponivel():
+    try:
+        import imblearn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def amostrador(balanceamento, seed=0):
+    """Amostrador do imbalanced-learn para ``balanceamento`` (``None`` para 'nenhum')."""
+    if balanceamento not in BALANCEAMENTOS:
+        raise ValueError(f"Balanceamento desconhecido: {balanceamento!r} (opções: {', '.join(BALANCEAMENTOS)})")
+    if balanceamento == 'nenhum':
+        return None
+    if not _imblearn_disponivel():
+        raise ImportError("O rebalanceamento requer o pacote imbalanced-learn")
+    if balanceamento == 'oversampling':
+        from imblearn.over_sampling import RandomOverSampler
+        return RandomOverSampler(random_state=seed)
+    from imblearn.over_sampling import SMOTE
+    return SMOTE(random_state=seed)
+
+
+def montar_treino(df):
+    """``(X, y)`` das linhas com atributos completos e resposta de alimentos conhecida."""
+    atributos, validas = CODIFICADOR.codificar(df)
+    alvo = df[COLUNA_ALVO].astype(object).map(ALVO).to_numpy(dtype='float64', na_value=np.nan)
+    validas &= ~np.isnan(alvo)
+    return atributos[validas], alvo[validas].astype('int64')
+
+
+def versoes(diretorio=DIRETORIO_MODELOS, nome=NOME_MODELO):
+    """``{versão: caminho do pickle}`` dos artefatos existentes."""
+    padrao = re.compile(re.escape(nome) + r'-v(\d+)\.pkl$')
+    try:
+        arquivos = os.listdir(diretorio)
+    except FileNotFoundError:
+        return {}
+    return {
+        int(m.group(1)): os.path.join(diretorio, arquivo)
+        for arquivo in arquivos if (m := padrao.match(arquivo))
+    }
+
+
+def _publicada(caminho):
+    # pickle vazio = versão reservada por um retreino que ainda está gravando
+    try:
+        return os.path.getsize(caminho) > 0
+    except FileNotFoundError:
+        return False
+
+
+def modelo_atual(padrao, diretorio=DIRETORIO_MODELOS, nome=NOME_MODELO):
+    """Caminho da versão retreinada mais nova já gravada ou ``padrao`` se não houver nenhuma."""
+    existentes = versoes(diretorio, nome)
+    for versao in sorted(existentes, reverse=True):
+        if _publicada(existentes[versao]):
+            return existentes[versao]
+    return padrao
+
+
+def _gravar_atomico(caminho, dados):
+    diretorio = os.path.dirname(caminho) or '.'
+    fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dados)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def gravar_versao(modelo, metadados, diretorio=DIRETORIO_MODELOS, nome=NOME_MODELO):
+    """Grava o próximo ``<nome>-vNNNN.pkl``; devolve ``(versão, caminho, hash)``.
+
+    A versão é reservada criando o pickle vazio com ``open(..., 'x')``: dois
+    retreinos simultâneos (sessões ou réplicas) nunca ficam com o mesmo número,
+    o segundo tenta o seguinte. O pickle completo substitui a reserva de forma
+    atômica e só depois o ``.sha256`` e o ``.json`` são publicados, então um
+    sidecar sempre descreve um pickle já gravado por inteiro.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    dados = pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)
+    hash_modelo = hashlib.sha256(dados).hexdigest()
+    versao = max(versoes(diretorio, nome), default=0) + 1
+    while True:
+        caminho = os.path.join(diretorio, f"{nome}-v{versao:04d}.pkl")
+        try:
+            with open(caminho, 'x'):
+                break
+        except FileExistsError:
+            versao += 1
+    _gravar_atomico(caminho, dados)
+    _gravar_atomico(caminho + '.sha256', f"{hash_modelo}  {os.path.basename(caminho)}\n".encode())
+    metadados = dict(metadados, versao=versao, hash=hash_modelo)
+    _gravar_atomico(caminho[:-len('.pkl')] + '.json', json.dumps(metadados, ensure_ascii=False, indent=2).encode())
+    return versao, caminho, hash_modelo
+
+
+def retreinar(df, n_estimators=100, folds=5, balanceamento='nenhum', n_jobs=-1, seed=0,
+              diretorio=DIRETORIO_MODELOS, nome=NOME_MODELO):
+    """Treina, valida e grava uma nova versão do modelo; devolve o ``RelatorioTreino``."""
+    # scikit-learn só é importado aqui: o app usa este módulo desde o boot (versões do modelo)
+    from sklearn.base import clone
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import StratifiedKFold, cross_validate
+
+    etapas = {}
+    inicio = time.perf_counter()
+    X, y = montar_treino(df)
+    etapas['atributos'] = time.perf_counter() - inicio
+    if len(np.unique(y)) < 2:
+        raise ValueError("O dataset precisa de ao menos duas respostas diferentes em 'Alimentos Básicos'")
+
+    balanceador = amostrador(balanceamento, seed)
+    floresta = RandomForestClassifier(n_estimators=n_estimators, random_state=seed)
+    estimador = floresta
+    if balanceador is not None:
+        from imblearn.pipeline import Pipeline
+        estimador = Pipeline([('balanceamento', clone(balanceador)), ('floresta', floresta)])
+
+    validacao = {}
+    if folds > 1:
+        inicio = time.perf_counter()
+        # um processo por fold; a floresta de cada fold fica com uma thread para não disputar núcleos
+        notas = cross_validate(
+            estimador, X, y,
+            cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed),
+            scoring=list(METRICAS),
+            n_jobs=min(folds, os.cpu_count() or 1),
+        )
+        validacao = {m: notas['test_' + m].tolist() for m in METRICAS}
+        etapas['validacao_cruzada'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    X_final, y_final = X, y
+    if balanceador is not None:
+        X_final, y_final = balanceador.fit_resample(X, y)
+        etapas['balanceamento'] = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+    modelo = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=n_jobs)
+    modelo.fit(X_final, y_final)
+    modelo.n_jobs = None  # a predição usa seu próprio paralelismo (threads por bloco)
+    etapas['treino_final'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    metadados = {
+        'linhas': len(y),
+        'atributos': CODIFICADOR.nomes,
+        'parametros': {'n_estimators': n_estimators, 'folds': folds, 'balanceamento': balanceamento,
+                       'seed': seed},
+        'validacao': validacao,
+        'etapas': etapas,
+    }
+    versao, caminho, hash_modelo = gravar_versao(modelo, metadados, diretorio, nome)
+    etapas['gravacao'] = time.perf_counter() - inicio
+    return RelatorioTreino(len(y), versao, caminho, hash_modelo, etapas, validacao)
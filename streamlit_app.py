@@ -1,12 +1,31 @@
+import glob
+import os
+import sys
+
+# Perfil de inicialização antes dos demais imports, para medir o custo de cada um; com
+# `python -m painel.perfil run streamlit_app.py` ele já vem ativo e mede também os imports do servidor
+from painel.perfil import PERFIL
+
+if os.environ.get("PAINEL_PERFIL"):
+    PERFIL.ativar()
+PERFIL.iniciar_execucao()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-from matplotlib.colors import LinearSegmentedColormap
-import plotly.express as px
-import pickle
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.ensemble import RandomForestClassifier
+
+# Só o que toda execução usa; plotly e os módulos de uma aba ou de um modo (fluxo, ondas, processos,
+# prévia, demonstração) são importados onde são usados, na primeira vez que aquela parte roda
+from painel.abas import Aba, PainelAbas
+from painel.armazenamento import DatasetStore, content_hash, load_or_ingest
+from painel.cubo import Cubo
+from painel.figuras import CacheFiguras
+from painel.filtros import IndiceFiltros
+from painel.ingestao import MOTORES, read_survey
+from painel.instrumentacao import Instrumentacao
+from painel.modelo import CarregadorModelo
+from painel.pipeline import COLUNAS_INDICE, FAIXAS_ETARIAS, ROTULOS_FAIXAS, preparar_dataset
+from painel.treino import DIRETORIO_MODELOS, modelo_atual
 
 # ----------------------------------------------------------
 # Configuração da Página e CSS Customizado
@@ -18,6 +37,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Etapas medidas neste rerun (tempo, linhas, memória); PAINEL_INSTRUMENTACAO_ARQUIVO grava em JSON lines
+instrumentacao = Instrumentacao(arquivo=os.environ.get("PAINEL_INSTRUMENTACAO_ARQUIVO"))
+
 st.markdown("""
 <style>
     /* Variáveis de cores - Paleta suave e profissional */
@@ -176,6 +198,24 @@ st.markdown("""
         font-weight: 600;
         box-shadow: 0 2px 5px rgba(0, 0, 0, 0.05);
     }
+    /* Seletor de abas (st.radio horizontal com o visual das tabs) */
+    .st-key-seletor_abas [role="radiogroup"] {
+        gap: 2px;
+        background-color: var(--primary-light);
+        border-radius: 12px;
+        padding: 5px;
+    }
+    .st-key-seletor_abas [role="radiogroup"] label {
+        border-radius: 8px;
+        padding: 10px 16px;
+        margin: 0;
+    }
+    .st-key-seletor_abas [role="radiogroup"] label:has(input:checked) {
+        background-color: white;
+        color: var(--primary-dark);
+        font-weight: 600;
+        box-shadow: 0 2px 5px rgba(0, 0, 0, 0.05);
+    }
     /* Tabelas */
     .dataframe {
         border-collapse: collapse;
@@ -312,7 +352,6 @@ nutrition_icons = {
     "education": "📚"
 }
 nutrition_palette = ["#3a86ff", "#38b000", "#ff9e00", "#9d4edd", "#ef476f", "#073b4c"]
-nutrition_cmap = LinearSegmentedColormap.from_list("nutrition_cmap", ["#3a86ff", "#ef476f"])
 
 # ----------------------------------------------------------
 # Cabeçalho e Introdução
@@ -361,6 +400,45 @@ with st.sidebar:
     st.markdown('<div style="border-bottom: 1px solid #e9ecef; margin-bottom: 20px;"></div>', unsafe_allow_html=True)
 
     uploaded_file = st.file_uploader("Carregar arquivo de dados", type=["csv"])
+    motor_leitura = st.selectbox(
+        "Motor de leitura",
+        options=list(MOTORES),
+        index=0,
+        help="pyarrow: leitura colunar multithread; chunked: leitura em blocos com memória limitada"
+    )
+    motor_agregacao = st.selectbox(
+        "Agregação",
+        options=["numpy", "processos"],
+        index=0,
+        help="numpy: um núcleo, no próprio script; processos: partições por faixa de linhas agregadas num pool "
+             "de processos sobre memória compartilhada (mesmo resultado)"
+    )
+    progressivo = st.checkbox(
+        "Renderização progressiva",
+        help="Se o cálculo exato não terminar dentro do orçamento, as abas 1 a 4 mostram primeiro uma prévia "
+             "de uma amostra estratificada (Região x Faixa de Renda) e trocam pelos números exatos ao terminar"
+    )
+    orcamento = 1.0
+    if progressivo:
+        orcamento = st.slider("Orçamento (s)", min_value=0.0, max_value=10.0, value=1.0, step=0.5,
+                              help="Quanto esperar pelo cálculo exato antes de mostrar a prévia")
+    modo_fluxo = st.checkbox(
+        "Agregar em fluxo",
+        help="Para arquivos maiores que a memória: o CSV é lido em blocos e só os agregados ficam guardados. "
+             "Predição em lote e retreino precisam das linhas e ficam indisponíveis"
+    )
+    arquivo_servidor = None
+    if modo_fluxo and os.environ.get("PAINEL_FLUXO_DIR"):
+        arquivos_servidor = sorted(glob.glob(os.path.join(os.environ["PAINEL_FLUXO_DIR"], "*.csv")))
+        arquivo_servidor = st.selectbox("Arquivo no servidor", [None] + arquivos_servidor,
+                                        format_func=lambda c: "Upload" if c is None else os.path.basename(c))
+    ondas = []
+    if uploaded_file is not None and not modo_fluxo:
+        ondas = st.file_uploader(
+            "Acrescentar ondas", type=["csv"], accept_multiple_files=True, key="ondas",
+            help="Novas ondas com as mesmas colunas do arquivo base: só as linhas novas são pontuadas e somadas "
+                 "aos agregados guardados"
+        )
 
     st.markdown(
         '<p style="font-size: 0.9rem; color: #555b6e; font-weight: 500; margin-bottom: 0.5rem;">Filtros de Análise</p>',
@@ -378,8 +456,8 @@ with st.sidebar:
                 unsafe_allow_html=True)
     faixa_etaria = st.select_slider(
         "",
-        options=[0, 12, 24, 36, 48, 60],
-        value=(0, 60),
+        options=FAIXAS_ETARIAS,
+        value=(FAIXAS_ETARIAS[0], FAIXAS_ETARIAS[-1]),
         format_func=lambda x: f"{x} meses"
     )
 
@@ -420,10 +498,21 @@ with st.sidebar:
 # ----------------------------------------------------------
 # Função para Carregar Dados (Cache)
 # ----------------------------------------------------------
-@st.cache_data
-def load_data(file):
+@st.cache_resource
+def get_dataset_store():
+    # Diretório compartilhado entre réplicas (ex.: volume montado) e limite em MB
+    return DatasetStore(
+        os.environ.get("PAINEL_CACHE_DIR", os.path.join(".cache", "datasets")),
+        max_bytes=int(os.environ.get("PAINEL_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+        formato=os.environ.get("PAINEL_CACHE_FORMATO", "feather")
+    )
+
+
+# cache_resource: o frame é compartilhado sem cópia a cada rerun e tratado como somente leitura
+@st.cache_resource(max_entries=4)
+def load_data(file, motor="pyarrow"):
     if file is not None:
-        df = pd.read_csv(file)
+        return load_or_ingest(get_dataset_store(), file, lambda f: read_survey(f, motor=motor))
     else:
         st.markdown("""
         <div class="warning-card">
@@ -438,224 +527,432 @@ def load_data(file):
             </div>
         </div>
         """, unsafe_allow_html=True)
-        df = pd.DataFrame({
-            'Região': np.random.choice(['Norte', 'Sul', 'Sudeste', 'Centro-Oeste', 'Nordeste'], 100),
-            'Sexo': np.random.choice(['Masculino', 'Feminino'], 100),
-            'Idade': np.random.randint(0, 5, 100),
-            'Idade em Meses': np.random.randint(0, 60, 100),
-            'Moradores que Alimentaram Acabamento (Sim)': np.random.choice(['Sim', 'Não'], 100),
-            'Moradores que Alimentaram Acabamento (Não)': np.random.choice(['Sim', 'Não'], 100),
-            'Tipo de Domicílio': np.random.choice(['Casa', 'Apartamento', 'Habitação em casa de cômodos'], 100),
-            'Possui Cozinha': np.random.choice(['Sim', 'Não'], 100),
-            'Ocupação': np.random.choice(['Próprio de algum morador - já pago', 'Alugado', 'Cedido de outra forma'],
-                                         100),
-            'Situação do Registro': np.random.choice(['Urbano'], 100),
-            'Presença de Tosse': np.random.choice(['Sim', 'Não'], 100),
-            'Tipo de Respiração': np.random.choice(['Sim', 'Não'], 100),
-            'Alimentos Básicos': np.random.choice(['Sim, sempre', 'Sim, quase sempre', 'Sim, às vezes'], 100),
-            'Nivel Escolaridade': np.random.choice(
-                ['1°ano do ensino médio', '3°ano do ensino médio', 'Ensino superior completo'], 100),
-            'Beneficios': np.random.choice(['A', 'F', ''], 100),
-            'Faixa de Renda': np.random.choice(
-                ['Até R$ 1.000,00', 'De R$ 1.001,00 até R$ 2.000,00', 'De R$ 2.001,00 até R$ 3.000,00'], 100),
-            'Cor Pessoa': np.random.choice(['Branca', 'Parda (mulata, cabocla, cafuza, mameluca ou mestiça)'], 100)
-        })
-    return df
+        # Dados sintéticos reprodutíveis (mesma semente, mesmo frame) com o esquema de read_survey
+        from painel.sintetico import gerar_pesquisa
+        linhas = int(float(os.environ.get("PAINEL_DEMO_LINHAS", "5000")))
+        semente = int(os.environ.get("PAINEL_DEMO_SEED", "0"))
+        df = gerar_pesquisa(linhas, seed=semente)
+    return df, None, f"demo-{linhas}-{semente}"
+
+
+@st.cache_resource(max_entries=4)
+def get_dataset_preparado(chave, _df):
+    # Scores, índice e faixa etária calculados uma vez por dataset (chave = hash do conteúdo)
+    return preparar_dataset(_df)
+
+
+@st.cache_resource(max_entries=4)
+def get_indice_filtros(chave, _df):
+    # Bitmaps por categoria e índice ordenado da idade, montados uma vez por dataset
+    return IndiceFiltros(_df)
+
+
+diretorio_modelos = os.environ.get("PAINEL_MODELOS_DIR", DIRETORIO_MODELOS)
+
+
+@st.cache_resource
+def get_carregador_modelo():
+    # A carga começa em segundo plano já na primeira execução do processo, antes de alguém abrir a aba 5
+    # Serve a versão retreinada mais nova (se houver) e troca de modelo quando uma nova é gravada
+    # PAINEL_MODELO_SHA256 trava só o pickle base; as versões retreinadas conferem o próprio .sha256
+    modelo_base = os.environ.get("PAINEL_MODELO", "modelo_alimentos_basicos.pkl")
+    return CarregadorModelo(
+        lambda: modelo_atual(modelo_base, diretorio_modelos),
+        esperado={modelo_base: os.environ.get("PAINEL_MODELO_SHA256")}
+    ).iniciar()
+
+
+carregador_modelo = get_carregador_modelo()
+
+
+def chave_fonte_fluxo(fonte):
+    # Arquivo no servidor: caminho + tamanho + mtime (sem reler o arquivo); upload: id do upload ou hash
+    if isinstance(fonte, str):
+        info = os.stat(fonte)
+        return f"fluxo:{fonte}:{info.st_size}:{info.st_mtime_ns}"
+    return f"fluxo:{getattr(fonte, 'file_id', None) or content_hash(fonte)}"
+
+
+@st.cache_resource(max_entries=2)
+def get_agregado_fluxo(chave, _fonte):
+    # Só os agregados parciais ficam em memória; o CSV é lido em blocos uma vez por arquivo
+    from painel.fluxo import agregar_csv
+    return agregar_csv(_fonte)
+
+
+@st.cache_resource(max_entries=2)
+def get_dataset_ondas(chaves, _brutos):
+    # Agregado do maior prefixo já guardado + só as ondas novas pontuadas; os segmentos não são empilhados aqui
+    from painel.ondas import combinar_ondas
+    return combinar_ondas(get_dataset_store(), list(chaves), list(_brutos),
+                          lambda i: get_dataset_preparado(chaves[i], _brutos[i]))
+
+
+fonte_fluxo = (arquivo_servidor or uploaded_file) if modo_fluxo else None
+# Com agregado (modo em fluxo ou ondas acrescentadas) os cubos saem das tabelas agregadas
+agregado_dataset = None
+dataset_ondas = None
+if fonte_fluxo is not None:
+    # Modo em fluxo: não há frame em memória; as abas leem o cubo montado a partir dos agregados
+    chave_dataset = chave_fonte_fluxo(fonte_fluxo)
+    with instrumentacao.etapa("agregar_fluxo") as medicao:
+        agregado_dataset, relatorio_fluxo = get_agregado_fluxo(chave_dataset, fonte_fluxo)
+        medicao.linhas = agregado_dataset.linhas
+    df_bruto = df_preparado = indice_filtros = None
+    relatorio_ingestao = None
+    st.sidebar.caption(
+        f"Agregado em fluxo: {relatorio_fluxo.linhas:,} linhas em {relatorio_fluxo.blocos} blocos, "
+        f"{relatorio_fluxo.segundos:.2f}s · {relatorio_fluxo.celulas:,} células agregadas"
+    )
+else:
+    with instrumentacao.etapa("load_data") as medicao:
+        df_bruto, relatorio_ingestao, chave_dataset = load_data(uploaded_file, motor_leitura)
+        medicao.linhas = len(df_bruto)
+        if relatorio_ingestao is not None:
+            medicao.etapa = f"load_data/{relatorio_ingestao.origem}"  # csv lido ou frame do cache em disco
+    if ondas:
+        chaves, brutos = [chave_dataset], [df_bruto]
+        with instrumentacao.etapa("ondas/ler") as medicao:
+            for onda in ondas:
+                df_onda, _, chave_onda = load_data(onda, motor_leitura)
+                chaves.append(chave_onda)
+                brutos.append(df_onda)
+            medicao.linhas = sum(len(b) for b in brutos[1:])
+        try:
+            with instrumentacao.etapa("ondas/combinar") as medicao:
+                dataset_ondas = get_dataset_ondas(tuple(chaves), brutos)
+                medicao.linhas = dataset_ondas.relatorio.linhas_agregadas
+        except ValueError as erro:
+            st.sidebar.error(str(erro))
+    if dataset_ondas is not None:
+        # Os cubos saem do agregado; predição em lote e retreino empilham os segmentos só quando usados
+        chave_dataset, agregado_dataset = dataset_ondas.chave, dataset_ondas.agregado
+        df_preparado = indice_filtros = None
+        relatorio_ondas = dataset_ondas.relatorio
+        st.sidebar.caption(
+            f"{relatorio_ondas.segmentos - 1} onda(s) acrescentada(s): {relatorio_ondas.linhas:,} linhas, "
+            f"{relatorio_ondas.linhas_agregadas:,} agregadas agora · {relatorio_ondas.reaproveitados} segmento(s) "
+            f"reaproveitado(s) · {relatorio_ondas.segundos:.2f}s"
+        )
+    else:
+        with instrumentacao.etapa("preparar_dataset", linhas=len(df_bruto)):
+            df_preparado = get_dataset_preparado(chave_dataset, df_bruto)
+        with instrumentacao.etapa("indice_filtros", linhas=len(df_preparado)):
+            indice_filtros = get_indice_filtros(chave_dataset, df_preparado)
 
 
-df = load_data(uploaded_file)
+def linhas_do_dataset():
+    # Frame com todas as linhas brutas (None no modo em fluxo); com ondas, empilhado só na primeira chamada
+    return dataset_ondas.bruto if dataset_ondas is not None else df_bruto
 
-# Aplicando filtros
-df = df[df['Região'].isin(regioes)]
-if acesso_alimentos != "Todos":
-    df = df[df['Alimentos Básicos'] == acesso_alimentos]
 
-# Pré-processamento da coluna "Idade em Meses"
-df['Idade em Meses'] = df['Idade em Meses'].astype(str).str.replace(' meses', '', regex=False).str.strip()
-df['Idade em Meses'] = pd.to_numeric(df['Idade em Meses'], errors='coerce')
+if relatorio_ingestao is not None and relatorio_ingestao.origem == "cache":
+    st.sidebar.caption(
+        f"Dados do cache em disco ({relatorio_ingestao.formato}, sem leitura do CSV): "
+        f"{relatorio_ingestao.linhas:,} linhas abertas em {relatorio_ingestao.segundos:.2f}s · "
+        f"{relatorio_ingestao.bytes_disco / 1e6:.1f} MB em disco, {relatorio_ingestao.bytes_memoria / 1e6:.1f} MB "
+        f"em memória"
+    )
+elif relatorio_ingestao is not None:
+    st.sidebar.caption(
+        f"Leitura ({relatorio_ingestao.motor}): {relatorio_ingestao.linhas:,} linhas em "
+        f"{relatorio_ingestao.segundos:.2f}s · memória {relatorio_ingestao.bytes_antes / 1e6:.1f} MB → "
+        f"{relatorio_ingestao.bytes_depois / 1e6:.1f} MB ({relatorio_ingestao.reducao:.0%} menor)"
+    )
 
+# Aplicando filtros: os bitmaps devolvem as posições das linhas e o frame é recortado uma única vez.
+# A faixa etária completa não restringe (mantém crianças sem idade informada).
+filtros = dict(
+    regioes=regioes,
+    faixa_etaria=None if faixa_etaria == (FAIXAS_ETARIAS[0], FAIXAS_ETARIAS[-1]) else faixa_etaria,
+    tipos_domicilio=tipo_domicilio,
+    acesso_alimentos=None if acesso_alimentos == "Todos" else acesso_alimentos
+)
+linhas_filtradas = None
+if indice_filtros is not None:
+    with instrumentacao.etapa("filtros") as medicao:
+        linhas_filtradas = indice_filtros.selecionar(**filtros)
+        medicao.linhas = len(linhas_filtradas)
+estado_filtros = (tuple(regioes), tuple(faixa_etaria), tuple(tipo_domicilio), acesso_alimentos)
+
+if dataset_ondas is not None and st.sidebar.button("Verificar consistência",
+                                                    help="Refaz preparo e cubo a partir de todas as linhas e "
+                                                         "compara com o resultado incremental"):
+    from painel.ondas import verificar_consistencia
+    with instrumentacao.etapa("ondas/verificar", linhas=dataset_ondas.relatorio.linhas):
+        divergencias = verificar_consistencia(dataset_ondas, filtros)
+    if divergencias:
+        st.sidebar.error("Divergências no agregado incremental:\n\n" + "\n".join(f"- {d}" for d in divergencias))
+    else:
+        st.sidebar.success("Agregado incremental igual ao recálculo completo")
 
-# ----------------------------------------------------------
-# Geração de Scores e Indicadores
-# ----------------------------------------------------------
-def recode_alimentos(valor):
-    if isinstance(valor, str):
-        if "Sim, sempre" in valor:
-            return 1.0
-        elif "Sim, quase sempre" in valor:
-            return 0.5
-    return 0.0
-
-
-def recode_tosse(valor):
-    if isinstance(valor, str):
-        val = valor.strip().lower()
-        if val == "não":
-            return 1.0
-        elif val == "sim":
-            return 0.0
-    return 0.0
-
-
-def recode_cozinha(valor):
-    if isinstance(valor, str):
-        val = valor.strip().lower()
-        if val == "sim":
-            return 1.0
-        elif val == "não":
-            return 0.0
-    return 0.0
-
-
-df['alimentos_score'] = df['Alimentos Básicos'].apply(recode_alimentos)
-df['tosse_score'] = df['Presença de Tosse'].apply(recode_tosse)
-df['cozinha_score'] = df['Possui Cozinha'].apply(recode_cozinha)
-df['indice_desenvolvimento'] = df[['alimentos_score', 'tosse_score', 'cozinha_score']].mean(axis=1)
 
-# ----------------------------------------------------------
-# Criação de df_final para a Aba 4 (Agrupamento por Dimensão)
-# ----------------------------------------------------------
-resultados = []
-# (a) Agrupamento por Região
-df_regiao_group = df.groupby('Região')['indice_desenvolvimento'].mean().reset_index()
-df_regiao_group['dimensao'] = 'Região'
-df_regiao_group.rename(columns={'Região': 'categoria', 'indice_desenvolvimento': 'indice_medio'}, inplace=True)
-resultados.append(df_regiao_group)
-# (b) Agrupamento por Nível Escolaridade
-df_escolaridade_group = df.groupby('Nivel Escolaridade')['indice_desenvolvimento'].mean().reset_index()
-df_escolaridade_group['dimensao'] = 'Nível Escolaridade'
-df_escolaridade_group.rename(columns={'Nivel Escolaridade': 'categoria', 'indice_desenvolvimento': 'indice_medio'},
-                             inplace=True)
-resultados.append(df_escolaridade_group)
-# (c) Agrupamento por Faixa de Renda
-df_renda_group = df.groupby('Faixa de Renda')['indice_desenvolvimento'].mean().reset_index()
-df_renda_group['dimensao'] = 'Faixa de Renda'
-df_renda_group.rename(columns={'Faixa de Renda': 'categoria', 'indice_desenvolvimento': 'indice_medio'}, inplace=True)
-resultados.append(df_renda_group)
-# (d) Agrupamento por Cor Pessoa
-df_cor_group = df.groupby('Cor Pessoa')['indice_desenvolvimento'].mean().reset_index()
-df_cor_group['dimensao'] = 'Cor Pessoa'
-df_cor_group.rename(columns={'Cor Pessoa': 'categoria', 'indice_desenvolvimento': 'indice_medio'}, inplace=True)
-resultados.append(df_cor_group)
-
-df_final = pd.concat(resultados, ignore_index=True)
+processos_agregacao = int(os.environ.get("PAINEL_AGREGACAO_PROCESSOS", os.cpu_count() or 1))
+
+
+@st.cache_resource
+def get_executor_agregacao():
+    # Um pool por servidor, compartilhado pelas sessões; os processos sobem uma vez
+    from painel.paralelo import criar_executor
+    return criar_executor(processos_agregacao)
+
+
+@st.cache_resource(max_entries=2)
+def get_cubo_particionado(chave, _df):
+    # Códigos e medidas copiados para memória compartilhada uma vez por dataset
+    from painel.paralelo import CuboParticionado
+    return CuboParticionado(_df, executor=get_executor_agregacao(), processos=processos_agregacao)
+
+
+def construir_cubo(df, linhas, particionado=None):
+    if particionado is not None:
+        return particionado.construir(linhas=linhas)
+    return Cubo.construir(df, linhas=linhas)
+
+
+@st.cache_data(max_entries=64)
+def get_cubo(chave, estado, _df, _linhas, _particionado=None):
+    # Todas as somas/contagens dos gráficos numa varredura; cache por dataset e estado dos filtros
+    # (os dois motores dão o mesmo cubo, então o motor não entra na chave)
+    return construir_cubo(_df, _linhas, _particionado)
+
+
+@st.cache_resource(max_entries=4)
+def get_amostra(chave, _df):
+    # Amostra estratificada sorteada uma vez por dataset
+    from painel.amostra import amostra_estratificada
+    return amostra_estratificada(_df)
+
+
+@st.cache_data(max_entries=64)
+def get_cubo_amostral(chave, estado, _df, _amostra, _linhas):
+    from painel.amostra import cubo_amostral
+    return cubo_amostral(_df, _amostra, linhas=_linhas)
+
+
+@st.cache_resource
+def get_calculos_exatos():
+    # Compartilhado entre sessões: o mesmo dataset + filtros não é calculado duas vezes
+    from painel.progressivo import CalculosEmSegundoPlano
+    return CalculosEmSegundoPlano()
+
+
+@st.cache_data(max_entries=64)
+def get_cubo_agregado(chave, estado, _agregado, _filtros):
+    # Filtros aplicados sobre as tabelas agregadas; mesmo cubo que as linhas filtradas dariam
+    return _agregado.cubo(**_filtros)
+
+
+def particionado_ativo():
+    return get_cubo_particionado(chave_dataset, df_preparado) if motor_agregacao == "processos" else None
+
+
+# Renderização progressiva: o cubo exato é calculado em segundo plano; se não ficar pronto dentro do
+# orçamento, as abas 1 a 4 são preparadas com o cubo estimado da amostra e trocadas depois
+fase_cubo = "exato"
+futuro_exato = None
+if progressivo and agregado_dataset is None:
+    particionado = particionado_ativo()
+    futuro_exato = get_calculos_exatos().iniciar(
+        (chave_dataset, estado_filtros),
+        lambda: construir_cubo(df_preparado, linhas_filtradas, particionado)
+    )
+    with instrumentacao.etapa("cubo/orcamento"):
+        if get_calculos_exatos().aguardar(futuro_exato, orcamento) is None:
+            fase_cubo = "amostra"
+
+
+def cubo_filtrado():
+    if fase_cubo == "amostra":
+        with instrumentacao.etapa("cubo/amostra") as medicao:
+            cubo = get_cubo_amostral(chave_dataset, estado_filtros, df_preparado,
+                                     get_amostra(chave_dataset, df_preparado), linhas_filtradas)
+            medicao.linhas = cubo.linhas_amostra
+        return cubo
+    if futuro_exato is not None:
+        return futuro_exato.result()
+    if agregado_dataset is not None:
+        with instrumentacao.etapa("cubo") as medicao:
+            cubo = get_cubo_agregado(chave_dataset, estado_filtros, agregado_dataset, filtros)
+            medicao.linhas = int(cubo.tabela('total')['n'].sum())
+        return cubo
+    with instrumentacao.etapa("cubo", linhas=len(linhas_filtradas)):
+        return get_cubo(chave_dataset, estado_filtros, df_preparado, linhas_filtradas, particionado_ativo())
+
 
 # ----------------------------------------------------------
 # Aba de Indicadores e Visualizações (Tabs)
 # ----------------------------------------------------------
-tabs = st.tabs([
-    f"{nutrition_icons['development']} Indicadores Regionais",
-    f"{nutrition_icons['socioeconomic']} Determinantes Socioeconômicos",
-    f"{nutrition_icons['infrastructure']} Infraestrutura e Nutrição",
-    f"{nutrition_icons['main']} Comparação Entre Regiões",
-    "🔮 Análise Preditiva"
-])
+# Cada aba separa preparo (dados + figuras) e renderização; só a aba ativa é preparada e o
+# resultado fica memorizado na sessão enquanto o dataset e os filtros não mudam.
+assinatura_abas = (chave_dataset, estado_filtros, fase_cubo)
 
-# -- Aba 1: Indicadores Regionais --
-with tabs[0]:
-    st.markdown('<div class="sub-header animate-fade-in">Análise Regional</div>', unsafe_allow_html=True)
-    st.markdown('<div class="section">', unsafe_allow_html=True)
-    st.markdown("### Índice de Desenvolvimento por Região")
 
-    grouped_df = df.groupby('Região')['indice_desenvolvimento'].mean().reset_index()
+@st.cache_resource
+def get_cache_figuras():
+    # Compartilhado entre sessões; limite em MB do JSON das figuras
+    return CacheFiguras(max_bytes=int(os.environ.get("PAINEL_CACHE_FIGURAS_MB", "64")) * 1024 * 1024)
 
-    if len(grouped_df) == 1:
-        fig = px.bar(
-            grouped_df,
-            x='Região',
-            y='indice_desenvolvimento',
-            color='Região',
-            color_discrete_sequence=nutrition_palette,
-            title="Índice Médio de Desenvolvimento por Região"
-        )
-        fig.update_traces(width=0.4)
-        fig.update_layout(
-            xaxis=dict(range=[-0.5, 0.5]),
-            height=400,
-            width=500,
-            xaxis_title="Região",
-            yaxis_title="Índice de Desenvolvimento",
-            font=dict(family="Inter", size=12),
-            plot_bgcolor="white",
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=12,
-                font_family="Inter"
-            ),
-            margin=dict(l=20, r=20, t=40, b=20)
+
+cache_figuras = get_cache_figuras()
+
+
+def marcar_previa(construir):
+    # Selo em cada figura da prévia, para não ser confundida com os números finais
+    def construir_previa():
+        fig = construir()
+        fig.add_annotation(
+            text="PRÉVIA · amostra estratificada", xref="paper", yref="paper", x=1, y=1.12,
+            xanchor="right", showarrow=False, font=dict(color="#ff9e00", size=11),
+            bgcolor="#fff4e0", bordercolor="#ff9e00", borderpad=3
         )
-    else:
-        fig = px.bar(
-            grouped_df,
-            x='Região',
-            y='indice_desenvolvimento',
-            color='Região',
-            color_discrete_sequence=nutrition_palette,
-            title="Índice Médio de Desenvolvimento por Região"
+        return fig
+    return construir_previa
+
+
+def figura(id_grafico, construir):
+    # Figura Plotly do cache (id do gráfico + dataset + filtros) ou construída e guardada; só a construção é medida
+    if fase_cubo == "amostra":
+        id_grafico, construir = f"{id_grafico}@amostra", marcar_previa(construir)
+    return cache_figuras.obter(id_grafico, chave_dataset, estado_filtros,
+                               instrumentacao.medir(f"figura/{id_grafico}")(construir))
+
+
+# -- Aba 1: Indicadores Regionais --
+def preparar_aba_regional():
+    import plotly.express as px
+    from painel.amostra import margem_erro
+
+    cubo = cubo_filtrado()
+
+    def construir_fig():
+        grouped_df = cubo.media('regiao', coluna='indice_desenvolvimento')
+        erro = margem_erro(cubo, 'regiao')  # IC de 95%, só na prévia
+
+        if len(grouped_df) == 1:
+            fig = px.bar(
+                grouped_df,
+                x='Região',
+                y='indice_desenvolvimento',
+                error_y=erro,
+                color='Região',
+                color_discrete_sequence=nutrition_palette,
+                title="Índice Médio de Desenvolvimento por Região"
+            )
+            fig.update_traces(width=0.4)
+            fig.update_layout(
+                xaxis=dict(range=[-0.5, 0.5]),
+                height=400,
+                width=500,
+                xaxis_title="Região",
+                yaxis_title="Índice de Desenvolvimento",
+                font=dict(family="Inter", size=12),
+                plot_bgcolor="white",
+                hoverlabel=dict(
+                    bgcolor="white",
+                    font_size=12,
+                    font_family="Inter"
+                ),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+        else:
+            fig = px.bar(
+                grouped_df,
+                x='Região',
+                y='indice_desenvolvimento',
+                error_y=erro,
+                color='Região',
+                color_discrete_sequence=nutrition_palette,
+                title="Índice Médio de Desenvolvimento por Região"
+            )
+            fig.update_layout(
+                xaxis_title="Região",
+                yaxis_title="Índice de Desenvolvimento",
+                font=dict(family="Inter", size=12),
+                plot_bgcolor="white",
+                hoverlabel=dict(
+                    bgcolor="white",
+                    font_size=12,
+                    font_family="Inter"
+                ),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            fig.update_traces(
+                marker_line_color='white',
+                marker_line_width=1.5,
+                opacity=0.85
+            )
+        return fig
+
+    fig = figura("regional/indice_por_regiao", construir_fig)
+
+    def construir_fig_heat():
+        heatmap_data = cubo.matriz('regiao', {
+            'indice_desenvolvimento': 'Índice de Desenvolvimento',
+            'alimentos_score': 'Acesso a Alimentos',
+            'cozinha_score': 'Infraestrutura'
+        })
+        fig_heat = px.imshow(
+            heatmap_data,
+            text_auto='.2f',
+            aspect="auto",
+            color_continuous_scale=px.colors.sequential.Blues
         )
-        fig.update_layout(
-            xaxis_title="Região",
-            yaxis_title="Índice de Desenvolvimento",
+        fig_heat.update_layout(
+            title="Comparativo de Indicadores por Região",
+            xaxis_title="Indicador",
+            yaxis_title="Região",
             font=dict(family="Inter", size=12),
-            plot_bgcolor="white",
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=12,
-                font_family="Inter"
-            ),
-            margin=dict(l=20, r=20, t=40, b=20)
+            coloraxis_colorbar=dict(
+                title="Valor",
+                tickformat=".2f"
+            )
         )
-        fig.update_traces(
-            marker_line_color='white',
-            marker_line_width=1.5,
-            opacity=0.85
-        )
-    st.plotly_chart(fig, use_container_width=True)
+        return fig_heat
+
+    fig_heat = figura("regional/mapa_calor", construir_fig_heat)
+    return {"fig": fig, "fig_heat": fig_heat}
+
+
+def renderizar_aba_regional(dados):
+    st.markdown('<div class="sub-header animate-fade-in">Análise Regional</div>', unsafe_allow_html=True)
+    st.markdown('<div class="section">', unsafe_allow_html=True)
+    st.markdown("### Índice de Desenvolvimento por Região")
+    st.plotly_chart(dados["fig"], use_container_width=True)
 
     st.markdown("### Mapa de Calor: Indicadores por Região")
-    heatmap_data = pd.DataFrame({
-        'Região': df['Região'].unique()
-    })
-    heatmap_data['Índice de Desenvolvimento'] = [df[df['Região'] == r]['indice_desenvolvimento'].mean() for r in
-                                                 heatmap_data['Região']]
-    heatmap_data['Acesso a Alimentos'] = [df[df['Região'] == r]['alimentos_score'].mean() for r in
-                                          heatmap_data['Região']]
-    heatmap_data['Infraestrutura'] = [df[df['Região'] == r]['cozinha_score'].mean() for r in heatmap_data['Região']]
-    fig_heat = px.imshow(
-        heatmap_data.set_index('Região')[['Índice de Desenvolvimento', 'Acesso a Alimentos', 'Infraestrutura']],
-        text_auto='.2f',
-        aspect="auto",
-        color_continuous_scale=px.colors.sequential.Blues
-    )
-    fig_heat.update_layout(
-        title="Comparativo de Indicadores por Região",
-        xaxis_title="Indicador",
-        yaxis_title="Região",
-        font=dict(family="Inter", size=12),
-        coloraxis_colorbar=dict(
-            title="Valor",
-            tickformat=".2f"
-        )
-    )
-    st.plotly_chart(fig_heat, use_container_width=True)
+    st.plotly_chart(dados["fig_heat"], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+
 # -- Aba 2: Determinantes Socioeconômicos --
-with tabs[1]:
-    st.markdown('<div class="sub-header">Determinantes Socioeconômicos</div>', unsafe_allow_html=True)
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown('<div class="section">', unsafe_allow_html=True)
-        st.markdown("### Índice de Desenvolvimento por Ocupação")
-        fig = px.box(
-            df,
-            x='Ocupação',
-            y='indice_desenvolvimento',
-            color='Ocupação',
-            color_discrete_sequence=nutrition_palette,
-            title="Índice de Desenvolvimento por Ocupação dos Pais"
-        )
-        fig.update_layout(
+def preparar_aba_socioeconomica():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from painel.beneficios import COLUNA_MASCARA, resumo_por_beneficio
+    from painel.distribuicao import correlacao_contagens, resumo_caixas_contagens
+
+    # Boxplot e correlação saem das contagens por valor do cubo, nunca das linhas filtradas
+    cubo = cubo_filtrado()
+
+    def construir_fig_box():
+        resumo = resumo_caixas_contagens(cubo.tabela('ocupacao_indice'), 'Ocupação', 'indice_desenvolvimento')
+        fig_box = go.Figure()
+        for i, caixa in enumerate(resumo.itertuples(index=False)):
+            fig_box.add_trace(go.Box(
+                name=caixa[0],
+                x=[caixa[0]],
+                q1=[caixa.q1],
+                median=[caixa.mediana],
+                q3=[caixa.q3],
+                lowerfence=[caixa.cerca_inferior],
+                upperfence=[caixa.cerca_superior],
+                y=[caixa.outliers.tolist()],
+                boxpoints='outliers',
+                marker_color=nutrition_palette[i % len(nutrition_palette)],
+            ))
+        fig_box.update_layout(
+            title="Índice de Desenvolvimento por Ocupação dos Pais",
             xaxis_title="Ocupação",
             yaxis_title="Índice de Desenvolvimento",
             font=dict(family="Inter", size=12),
@@ -663,232 +960,301 @@ with tabs[1]:
             showlegend=False,
             xaxis={'visible': False}
         )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-    with col2:
-        st.markdown('<div class="section">', unsafe_allow_html=True)
-        st.markdown("### Acesso a Alimentos por Faixa de Renda")
-        fig = px.histogram(
-            df,
+        return fig_box
+
+    fig_box = figura("socioeconomica/box_ocupacao", construir_fig_box)
+
+    def construir_fig_renda():
+        contagens = cubo.contagem('renda_alimentos', coluna='Contagem')
+        fig_renda = px.bar(
+            contagens,
             x='Faixa de Renda',
+            y='Contagem',
             color='Alimentos Básicos',
             barmode='group',
             color_discrete_sequence=nutrition_palette,
             title="Distribuição de Acesso a Alimentos por Faixa de Renda"
         )
-        fig.update_layout(
+        fig_renda.update_layout(
             xaxis_title="Faixa de Renda",
             yaxis_title="Contagem",
             font=dict(family="Inter", size=12),
             plot_bgcolor="white",
             xaxis={'categoryorder': 'total descending', 'tickangle': -45}
         )
-        st.plotly_chart(fig, use_container_width=True)
+        return fig_renda
+
+    fig_renda = figura("socioeconomica/alimentos_por_renda", construir_fig_renda)
+
+    def construir_fig_corr():
+        corr_cols = ['indice_desenvolvimento', 'alimentos_score', 'cozinha_score', 'tosse_score']
+        scores = cubo.tabela('scores')
+        valores = scores[list(COLUNAS_INDICE)].astype('float64')
+        valores['indice_desenvolvimento'] = valores.sum(axis=1) / len(COLUNAS_INDICE)
+        corr_data = correlacao_contagens(valores[corr_cols], scores['n'])
+        fig_corr = px.imshow(
+            corr_data,
+            text_auto='.2f',
+            color_continuous_scale=px.colors.diverging.RdBu_r,
+            zmin=-1, zmax=1
+        )
+        fig_corr.update_layout(
+            title="Matriz de Correlação entre Indicadores",
+            font=dict(family="Inter", size=12)
+        )
+        return fig_corr
+
+    fig_corr = figura("socioeconomica/correlacao", construir_fig_corr)
+
+    def construir_fig_beneficios():
+        tabela = cubo.tabela('beneficios')
+        resumo = resumo_por_beneficio(
+            tabela[COLUNA_MASCARA].astype('int64'), tabela['n'],
+            {'indice_desenvolvimento': tabela['soma_indice_desenvolvimento']}
+        )
+        resumo['indice_medio'] = resumo['soma_indice_desenvolvimento'] / resumo['n'].where(resumo['n'] > 0)
+        resumo['Percentual'] = resumo['n'] / max(tabela['n'].sum(), 1)
+        fig_beneficios = px.bar(
+            resumo,
+            x='Benefício',
+            y='indice_medio',
+            color='Percentual',
+            color_continuous_scale=px.colors.sequential.Greens,
+            hover_data={'n': ':,', 'Percentual': ':.1%'},
+            title="Índice de Desenvolvimento por Benefício Recebido"
+        )
+        fig_beneficios.update_layout(
+            xaxis_title="Benefício",
+            yaxis_title="Índice de Desenvolvimento (médio)",
+            font=dict(family="Inter", size=12),
+            plot_bgcolor="white",
+            coloraxis_colorbar=dict(title="% das crianças", tickformat=".0%")
+        )
+        return fig_beneficios
+
+    fig_beneficios = figura("socioeconomica/beneficios", construir_fig_beneficios)
+    return {"fig_box": fig_box, "fig_renda": fig_renda, "fig_corr": fig_corr, "fig_beneficios": fig_beneficios}
+
+
+def renderizar_aba_socioeconomica(dados):
+    st.markdown('<div class="sub-header">Determinantes Socioeconômicos</div>', unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown('<div class="section">', unsafe_allow_html=True)
+        st.markdown("### Índice de Desenvolvimento por Ocupação")
+        st.plotly_chart(dados["fig_box"], use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    with col2:
+        st.markdown('<div class="section">', unsafe_allow_html=True)
+        st.markdown("### Acesso a Alimentos por Faixa de Renda")
+        st.plotly_chart(dados["fig_renda"], use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
     st.markdown('<div class="section">', unsafe_allow_html=True)
     st.markdown("### Correlação entre Fatores Socioeconômicos e Desenvolvimento")
-    corr_cols = ['indice_desenvolvimento', 'alimentos_score', 'cozinha_score', 'tosse_score']
-    corr_data = df[corr_cols].corr()
-    fig_corr = px.imshow(
-        corr_data,
-        text_auto='.2f',
-        color_continuous_scale=px.colors.diverging.RdBu_r,
-        zmin=-1, zmax=1
-    )
-    fig_corr.update_layout(
-        title="Matriz de Correlação entre Indicadores",
-        font=dict(family="Inter", size=12)
-    )
-    st.plotly_chart(fig_corr, use_container_width=True)
+    st.plotly_chart(dados["fig_corr"], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+    st.markdown('<div class="section">', unsafe_allow_html=True)
+    st.markdown("### Benefícios Recebidos e Desenvolvimento")
+    st.plotly_chart(dados["fig_beneficios"], use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
 # -- Aba 3: Infraestrutura e Nutrição --
-with tabs[2]:
+def preparar_aba_infraestrutura():
+    import plotly.express as px
+    from painel.amostra import margem_erro
+
+    cubo = cubo_filtrado()
+
+    def construir_fig_bar():
+        df_grouped = cubo.media('regiao_faixa_domicilio')
+        fig_bar = px.bar(
+            df_grouped,
+            x='FaixaEtaria',
+            y='indice_medio',
+            error_y=margem_erro(cubo, 'regiao_faixa_domicilio'),
+            color='Tipo de Domicílio',
+            facet_col='Região',
+            facet_col_wrap=2,
+            barmode='group',
+            color_discrete_sequence=nutrition_palette,
+            title="Infraestrutura e Nutrição: Comparação em Barras Agrupadas"
+        )
+        fig_bar.update_layout(
+            xaxis_title="Faixa Etária (meses)",
+            yaxis_title="Índice de Desenvolvimento (médio)",
+            font=dict(family="Inter", size=12),
+            plot_bgcolor="white",
+            hovermode="x unified"
+        )
+        fig_bar.update_xaxes(categoryorder='array', categoryarray=ROTULOS_FAIXAS)
+        return fig_bar
+
+    fig_bar = figura("infraestrutura/barras_faixa_domicilio", construir_fig_bar)
+
+    def construir_fig_hist():
+        contagens = cubo.contagem('domicilio_cozinha', coluna='Contagem')
+        fig_hist = px.bar(
+            contagens,
+            x='Tipo de Domicílio',
+            y='Contagem',
+            color='Possui Cozinha',
+            barmode='group',
+            color_discrete_sequence=nutrition_palette,
+            title="Presença de Cozinha por Tipo de Domicílio"
+        )
+        fig_hist.update_layout(
+            xaxis_title="Tipo de Domicílio",
+            yaxis_title="Contagem",
+            font=dict(family="Inter", size=12),
+            plot_bgcolor="white"
+        )
+        return fig_hist
+
+    fig_hist = figura("infraestrutura/cozinha_por_domicilio", construir_fig_hist)
+
+    def construir_fig_pie():
+        domicilio_counts = cubo.contagem('domicilio', coluna='Contagem').sort_values('Contagem', ascending=False)
+        fig_pie = px.pie(
+            domicilio_counts,
+            values='Contagem',
+            names='Tipo de Domicílio',
+            color_discrete_sequence=nutrition_palette,
+            hole=0.4,
+            title="Distribuição de Tipos de Domicílio"
+        )
+        fig_pie.update_layout(
+            font=dict(family="Inter", size=12),
+            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+        )
+        fig_pie.update_traces(textinfo='percent+label', pull=[0.05, 0, 0])
+        return fig_pie
+
+    fig_pie = figura("infraestrutura/tipos_domicilio", construir_fig_pie)
+    return {"fig_bar": fig_bar, "fig_hist": fig_hist, "fig_pie": fig_pie}
+
+
+def renderizar_aba_infraestrutura(dados):
     st.markdown('<div class="sub-header">Infraestrutura e Nutrição</div>', unsafe_allow_html=True)
     st.markdown('<div class="section">', unsafe_allow_html=True)
-    bins = [0, 12, 24, 36, 48, 60]
-    labels = ["0-12m", "12-24m", "24-36m", "36-48m", "48-60m"]
-    df['FaixaEtaria'] = pd.cut(df['Idade em Meses'], bins=bins, labels=labels)
-    df_grouped = (
-        df.groupby(['Região', 'FaixaEtaria', 'Tipo de Domicílio'])['indice_desenvolvimento']
-        .mean()
-        .reset_index(name='indice_medio')
-    )
     st.markdown("### Índice de Desenvolvimento (médio) por Faixa Etária, Tipo de Domicílio e Região")
-    fig_bar = px.bar(
-        df_grouped,
-        x='FaixaEtaria',
-        y='indice_medio',
-        color='Tipo de Domicílio',
-        facet_col='Região',
-        facet_col_wrap=2,
-        barmode='group',
-        color_discrete_sequence=nutrition_palette,
-        title="Infraestrutura e Nutrição: Comparação em Barras Agrupadas"
-    )
-    fig_bar.update_layout(
-        xaxis_title="Faixa Etária (meses)",
-        yaxis_title="Índice de Desenvolvimento (médio)",
-        font=dict(family="Inter", size=12),
-        plot_bgcolor="white",
-        hovermode="x unified"
-    )
-    fig_bar.update_xaxes(categoryorder='array', categoryarray=labels)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    st.plotly_chart(dados["fig_bar"], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
     st.markdown('<div class="section">', unsafe_allow_html=True)
     st.markdown("### Distribuição de Cozinha por Tipo de Domicílio")
-    fig_hist = px.histogram(
-        df,
-        x='Tipo de Domicílio',
-        color='Possui Cozinha',
-        barmode='group',
-        color_discrete_sequence=nutrition_palette,
-        title="Presença de Cozinha por Tipo de Domicílio"
-    )
-    fig_hist.update_layout(
-        xaxis_title="Tipo de Domicílio",
-        yaxis_title="Contagem",
-        font=dict(family="Inter", size=12),
-        plot_bgcolor="white"
-    )
-    st.plotly_chart(fig_hist, use_container_width=True)
+    st.plotly_chart(dados["fig_hist"], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
     st.markdown('<div class="section">', unsafe_allow_html=True)
     st.markdown("### Distribuição de Tipos de Domicílio")
-    domicilio_counts = df['Tipo de Domicílio'].value_counts().reset_index()
-    domicilio_counts.columns = ['Tipo de Domicílio', 'Contagem']
-    fig_pie = px.pie(
-        domicilio_counts,
-        values='Contagem',
-        names='Tipo de Domicílio',
-        color_discrete_sequence=nutrition_palette,
-        hole=0.4,
-        title="Distribuição de Tipos de Domicílio"
-    )
-    fig_pie.update_layout(
-        font=dict(family="Inter", size=12),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-    )
-    fig_pie.update_traces(textinfo='percent+label', pull=[0.05, 0, 0])
-    st.plotly_chart(fig_pie, use_container_width=True)
+    st.plotly_chart(dados["fig_pie"], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+
 # -- Aba 4: Comparação Entre Regiões e Dimensões --
-with tabs[3]:
+def preparar_aba_comparacao():
+    from painel.comparacao import dados_comparacao, figura_comparacao
+
+    cubo = cubo_filtrado()
+
+    # Médias já agregadas no cubo para os quatro painéis (Região; Escolaridade, Renda e Cor x Região)
+    comparacao = dados_comparacao(cubo)
+    fig = figura("comparacao/dimensoes", lambda: figura_comparacao(comparacao, nutrition_palette))
+    return {"fig": fig, "comparacao": comparacao}
+
+
+@st.cache_data(max_entries=8, show_spinner="Gerando PNG...")
+def get_png_comparacao(chave, estado, _comparacao):
+    # PNG estático (matplotlib/seaborn) só quando pedido, uma vez por dataset + filtros
+    from painel.comparacao import png_comparacao
+    return png_comparacao(_comparacao)
+
+
+def renderizar_aba_comparacao(dados):
     st.markdown('<div class="sub-header">Comparação Entre Regiões e Dimensões</div>', unsafe_allow_html=True)
     st.markdown('<div class="section">', unsafe_allow_html=True)
+    st.plotly_chart(dados["fig"], use_container_width=True)
+    if st.checkbox("Exportar PNG estático", key="comparacao_png"):
+        st.download_button(
+            "Baixar PNG",
+            data=get_png_comparacao(chave_dataset, (estado_filtros, fase_cubo), dados["comparacao"]),
+            file_name="comparacao_regioes.png",
+            mime="image/png"
+        )
+    st.markdown('</div>', unsafe_allow_html=True)
 
-    # Calcula a média geral para a linha de referência
-    media_geral = df['indice_desenvolvimento'].mean()
 
-    # 1) Dados para o subplot de Regiões (apenas por Região)
-    df_regiao_plot = (
-        df.groupby('Região')['indice_desenvolvimento']
-        .mean()
-        .reset_index(name='indice_medio')
-    )
+# -- Aba 5: Somente Predição --
+def load_model_new():
+    # Espera a carga iniciada na abertura do app; recarrega se o pickle foi substituído
+    with instrumentacao.etapa("modelo/carga"):
+        return carregador_modelo.obter()
 
-    # 2) Dados para o subplot de Escolaridade (Região + Nivel Escolaridade)
-    df_escolaridade_plot = (
-        df.groupby(['Região', 'Nivel Escolaridade'])['indice_desenvolvimento']
-        .mean()
-        .reset_index(name='indice_medio')
-    )
 
-    # 3) Dados para o subplot de Faixa de Renda (Região + Faixa de Renda)
-    df_renda_plot = (
-        df.groupby(['Região', 'Faixa de Renda'])['indice_desenvolvimento']
-        .mean()
-        .reset_index(name='indice_medio')
-    )
+@st.cache_resource(max_entries=2)
+def get_floresta_compilada(hash_modelo, _modelo):
+    # Árvores achatadas em arrays NumPy, uma vez por versão do modelo; None se o modelo não for uma floresta
+    from painel.arvores import FlorestaCompilada
+    try:
+        return FlorestaCompilada.de_sklearn(_modelo)
+    except (AttributeError, ValueError):
+        return None
 
-    # 4) Dados para o subplot de Cor Pessoa (Região + Cor Pessoa)
-    df_cor_plot = (
-        df.groupby(['Região', 'Cor Pessoa'])['indice_desenvolvimento']
-        .mean()
-        .reset_index(name='indice_medio')
-    )
 
-    # Cria subplots: 1 linha, 4 colunas
-    fig, axes = plt.subplots(nrows=1, ncols=4, figsize=(22, 5), sharex=False, sharey=False)
+@st.cache_resource(max_entries=2)
+def get_cache_predicoes(hash_modelo):
+    # Probabilidades por vetor de atributos, compartilhadas entre sessões; uma instância por versão do modelo
+    from painel.cache import CacheLRU
+    return CacheLRU(max_itens=int(os.environ.get("PAINEL_CACHE_PREDICOES", "100000")), tamanho=lambda p: p.nbytes)
 
-    # --- Subplot (a) REGIÃO ---
-    sns.stripplot(
-        data=df_regiao_plot,
-        x='indice_medio',
-        y='Região',  # Eixo Y: as regiões
-        ax=axes[0],
-        color='blue'
-    )
-    axes[0].set_title("Índice de Desenvolvimento por Região")
-    axes[0].axvline(media_geral, linestyle='--', color='red', label=f'Média Geral = {media_geral:.2f}')
-    axes[0].set_xlabel("Índice de Desenvolvimento")
-    axes[0].legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), fancybox=True)
-
-    # --- Subplot (b) ESCOLARIDADE + REGIÃO ---
-    sns.stripplot(
-        data=df_escolaridade_plot,
-        x='indice_medio',
-        y='Nivel Escolaridade',  # Eixo Y: Escolaridade
-        hue='Região',  # Cores conforme Região
-        ax=axes[1]
-    )
-    axes[1].set_title("Escolaridade x Região")
-    axes[1].axvline(media_geral, linestyle='--', color='red')
-    axes[1].set_xlabel("Índice de Desenvolvimento")
-    axes[1].set_ylabel("")
-    axes[1].legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), fancybox=True)
-
-    # --- Subplot (c) FAIXA DE RENDA + REGIÃO ---
-    sns.stripplot(
-        data=df_renda_plot,
-        x='indice_medio',
-        y='Faixa de Renda',
-        hue='Região',
-        ax=axes[2]
-    )
-    axes[2].set_title("Faixa de Renda x Região")
-    axes[2].axvline(media_geral, linestyle='--', color='red')
-    axes[2].set_xlabel("Índice de Desenvolvimento")
-    axes[2].set_ylabel("")
-    axes[2].legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), fancybox=True)
-
-    # --- Subplot (d) COR DA PESSOA + REGIÃO ---
-    sns.stripplot(
-        data=df_cor_plot,
-        x='indice_medio',
-        y='Cor Pessoa',
-        hue='Região',
-        ax=axes[3]
-    )
-    axes[3].set_title("Cor da Pessoa x Região")
-    axes[3].axvline(media_geral, linestyle='--', color='red')
-    axes[3].set_xlabel("Índice de Desenvolvimento")
-    axes[3].set_ylabel("")
-    axes[3].legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), fancybox=True)
 
-    plt.tight_layout()
-    st.pyplot(fig)
+def preparar_aba_predicao():
+    # O modelo não entra no memo da aba: load_model_new precisa conferir o arquivo a cada execução
+    return {}
 
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# -- Aba 5: Somente Predição --
-with tabs[4]:
-    st.markdown('<div class="sub-header">Predição da Qualidade da Alimentação</div>', unsafe_allow_html=True)
 
+def renderizar_aba_predicao(dados):
+    from painel.arvores import escolher_motor
+    from painel.beneficios import BENEFICIOS
+    from painel.predicao import CODIFICADOR, MAPEAMENTO_ALIMENTOS_REVERSO, PreditorMemorizado, prever_dataset
+    from painel.treino import BALANCEAMENTOS, retreinar
 
-    @st.cache_resource
-    def load_model_new():
-        with open("modelo_alimentos_basicos.pkl", "rb") as f:
-            model = pickle.load(f)
-        return model
+    st.markdown('<div class="sub-header">Predição da Qualidade da Alimentação</div>', unsafe_allow_html=True)
+    if not carregador_modelo.pronto:
+        st.info("Carregando o modelo preditivo...")
+    try:
+        model_new, relatorio_modelo = load_model_new()
+    except Exception as erro:  # pickle ausente, hash divergente ou falha ao desserializar (erro da thread de carga)
+        st.error(f"Não foi possível carregar o modelo preditivo: {erro}. A predição fica desativada até o "
+                 f"arquivo ser corrigido ou um novo modelo ser treinado abaixo.")
+        model_new = relatorio_modelo = None
+    else:
+        st.caption(
+            f"Modelo {relatorio_modelo.hash[:12]} · carregado em {relatorio_modelo.segundos:.2f}s · "
+            f"{relatorio_modelo.bytes_residentes / 1e6:.1f} MB em memória"
+        )
+    modelo_disponivel = model_new is not None
+    floresta_compilada = get_floresta_compilada(relatorio_modelo.hash, model_new) if modelo_disponivel else None
+    motor_inferencia = st.radio(
+        "Motor de inferência",
+        ["Automático", "scikit-learn", "Compilado"],
+        horizontal=True,
+        disabled=floresta_compilada is None,
+        help="Compilado: árvores percorridas em NumPy, bem mais rápido para poucas linhas; "
+             "Automático usa o compilado em lotes pequenos e o scikit-learn nos grandes"
+    )
 
+    cache_predicoes = get_cache_predicoes(relatorio_modelo.hash) if modelo_disponivel else None
 
-    model_new = load_model_new()
+    def modelo_para(linhas):
+        if floresta_compilada is None or motor_inferencia == "scikit-learn":
+            return model_new
+        if motor_inferencia == "Compilado":
+            return floresta_compilada
+        return escolher_motor(model_new, floresta_compilada, linhas)
 
     st.subheader("🤖 Fazer uma Predição")
 
@@ -931,107 +1297,187 @@ with tabs[4]:
         "Pensão", "Aposentadoria", "Outro benefício"
     ]
     beneficios_selecionados = st.multiselect("Benefícios recebidos", beneficios_opcoes)
-    beneficios_mapping = {
-        "Programa Bolsa Família (PBF)": "A",
-        "Benefício de Prestação Continuada (BPC/LOAS)": "B",
-        "Bolsa ou benefício da Prefeitura Municipal": "C",
-        "Bolsa ou benefício do Governo do Estado": "D",
-        "Pensão": "E",
-        "Aposentadoria": "F",
-        "Outro benefício": "G"
-    }
-    beneficios_input = [1 if beneficios_mapping[ben] in beneficios_selecionados else 0 for ben in beneficios_opcoes]
-    total_beneficios = len(beneficios_selecionados)
-
-    mapping = {
-        "Região": {"Norte": 1, "Nordeste": 2, "Sudeste": 3, "Sul": 4, "Centro-Oeste": 5},
-        "Sexo": {"Masculino": 1, "Feminino": 2},
-        "Domicílio": {"Casa": 1, "Apartamento": 2, "Outros": 3},
-        "Cozinha": {"Sim": 1, "Não": 0},
-        "Ocupação": {
-            "Próprio de algum morador - já pago": 1,
-            "Próprio de algum morador - ainda pagando": 2,
-            "Alugado": 3,
-            "Cedido por empregador": 4,
-            "Cedido de outra forma": 5,
-            "Outra condição": 6
-        },
-        "Registro": {"Urbano": 1, "Rural": 2},
-        "Tosse": {"Sim": 1, "Não": 2, "Não sabe/ não quis responder": 9},
-        "Respiração": {"Sim": 1, "Não": 2, "Não sabe/ não quis responder": 9},
-        "Escolaridade": {
-            "Sem estudo": 0,
-            "1° ano do ensino fundamental": 1,
-            "1ª série/ 2°ano do ensino fundamental": 2,
-            "2ª série/ 3°ano do ensino fundamental": 3,
-            "3ª série/ 4°ano do ensino fundamental": 4,
-            "4ª série/ 5°ano do ensino fundamental": 5,
-            "5ª série/ 6°ano do ensino fundamental": 6,
-            "6ª série/ 7°ano do ensino fundamental": 7,
-            "7ª série/ 8°ano do ensino fundamental": 8,
-            "8ª série/ 9°ano do ensino fundamental": 9,
-            "1°ano do ensino médio": 10,
-            "2°ano do ensino médio": 11,
-            "3°ano do ensino médio": 12,
-            "Ensino superior incompleto": 13,
-            "Ensino superior completo": 14
-        },
-        "Renda": {
-            "Sem renda": 1,
-            "Até R$ 1.000,00": 2,
-            "De R$ 1.001,00 até R$ 2.000,00": 3,
-            "De R$ 2.001,00 até R$ 3.000,00": 4,
-            "De R$ 3.001,00 até R$ 5.000,00": 5,
-            "De R$ 5.001,00 até R$ 10.000,00": 6,
-            "R$ 10.001,00 ou mais": 7
-        }
-    }
-    mapping_cor_pessoa = {
-        "Branca": 1,
-        "Preta": 2,
-        "Amarela (origem japonesa, chinesa, coreana etc.)": 3,
-        "Parda (mulata, cabocla, cafuza, mameluca ou mestiça)": 4,
-        "Indígena": 5,
-        "Não sabe/não quis responder": 9
-    }
-    mapping_sim_nao = {"Sim": 1, "Não": 2}
-
-    input_data = [
-                     idade,
-                     idade_meses,
-                     mapping["Região"][selecao_regiao],
-                     mapping["Sexo"][selecao_sexo],
-                     mapping["Domicílio"][selecao_domicilio],
-                     mapping["Cozinha"][selecao_cozinha],
-                     mapping["Ocupação"][selecao_ocupacao],
-                     mapping["Registro"][selecao_registro],
-                     mapping["Tosse"][selecao_tosse],
-                     mapping["Respiração"][selecao_respiracao],
-                     mapping["Escolaridade"][selecao_escolaridade],
-                     mapping["Renda"][selecao_renda]
-                 ] + beneficios_input + [
-                     total_beneficios,
-                     mapping_cor_pessoa[selecao_cor_pessoa],
-                     mapping_sim_nao[selecao_moradores_alimentaram_sim],
-                     mapping_sim_nao[selecao_moradores_alimentaram_nao]
-                 ]
-
-    mapping_alimentos_reverse = {
-        1: "Não",
-        2: "Sim, raramente",
-        3: "Sim, às vezes",
-        4: "Sim, quase sempre",
-        5: "Sim, sempre",
-        6: "Não se cozinha em casa"
+    respostas = {
+        "Idade": idade,
+        "Idade em Meses": idade_meses,
+        "Região": selecao_regiao,
+        "Sexo": selecao_sexo,
+        "Tipo de Domicílio": selecao_domicilio,
+        "Possui Cozinha": selecao_cozinha,
+        "Ocupação": selecao_ocupacao,
+        "Situação do Registro": selecao_registro,
+        "Presença de Tosse": selecao_tosse,
+        "Tipo de Respiração": selecao_respiracao,
+        "Nivel Escolaridade": selecao_escolaridade,
+        "Faixa de Renda": selecao_renda,
+        "Beneficios": ",".join(BENEFICIOS[ben] for ben in beneficios_selecionados),
+        "Cor Pessoa": selecao_cor_pessoa,
+        "Moradores que Alimentaram Acabamento (Sim)": selecao_moradores_alimentaram_sim,
+        "Moradores que Alimentaram Acabamento (Não)": selecao_moradores_alimentaram_nao
     }
+    input_data = CODIFICADOR.codificar_linha(respostas)
 
-    if st.button("Prever Qualidade da Alimentação"):
-        resultado = model_new.predict([input_data])[0]
-        probabilidade = model_new.predict_proba([input_data]).max()
+    if st.button("Prever Qualidade da Alimentação", disabled=not modelo_disponivel):
+        with instrumentacao.etapa("predicao/formulario", linhas=1):
+            # Uma consulta só: classe e confiança saem das mesmas probabilidades, como no lote
+            modelo = PreditorMemorizado(modelo_para(1), cache_predicoes)
+            probabilidades = modelo.predict_proba(input_data)[0]
+            melhor = probabilidades.argmax()
+            resultado, probabilidade = modelo.classes_[melhor], probabilidades[melhor]
 
-        st.success(f"🍽️ O modelo previu a qualidade da alimentação como: **{mapping_alimentos_reverse[resultado]}**")
+        st.success(f"🍽️ O modelo previu a qualidade da alimentação como: **{MAPEAMENTO_ALIMENTOS_REVERSO[resultado]}**")
         st.write(f"Confiança da predição: {probabilidade:.2%}")
 
+    st.subheader("📦 Predição em Lote")
+    st.markdown("Pontua todas as linhas do arquivo carregado com as mesmas tabelas de codificação do formulário.")
+    if df_bruto is None:
+        st.info("No modo em fluxo só os agregados ficam em memória: predição em lote e retreino precisam das "
+                "linhas e estão desativados.")
+    col1, col2 = st.columns(2)
+    with col1:
+        n_jobs = st.number_input("Threads", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1)
+    with col2:
+        tamanho_bloco = st.select_slider("Linhas por bloco", options=[10_000, 50_000, 100_000, 500_000],
+                                         value=50_000)
+
+    if st.button("Prever Lote", disabled=df_bruto is None or not modelo_disponivel):
+        df_lote = linhas_do_dataset()
+        try:
+            with instrumentacao.etapa("predicao/lote", linhas=len(df_lote)):
+                resultados, relatorio = prever_dataset(modelo_para(len(df_lote)), df_lote,
+                                                       tamanho_bloco=tamanho_bloco, n_jobs=int(n_jobs),
+                                                       cache=cache_predicoes)
+        except KeyError as erro:
+            st.error(str(erro))
+        else:
+            # Guardado na sessão: o clique no download provoca um rerun e não deve repontuar o lote
+            st.session_state["predicao_lote"] = (
+                chave_dataset, resultados.to_csv(index=False).encode("utf-8"), relatorio
+            )
+
+    lote = st.session_state.get("predicao_lote")
+    if lote is not None and lote[0] == chave_dataset:
+        _, csv_resultados, relatorio = lote
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Linhas pontuadas", f"{relatorio.validas:,}",
+                    f"{relatorio.linhas - relatorio.validas:,} sem codificação", delta_color="off")
+        col2.metric("Vetores distintos", f"{relatorio.unicas:,}")
+        col3.metric("Tempo", f"{relatorio.segundos:.2f}s")
+        col4.metric("Vazão", f"{relatorio.linhas_por_segundo:,.0f} linhas/s")
+        st.download_button("Baixar resultados (CSV)", csv_resultados, file_name="predicoes_alimentacao.csv",
+                           mime="text/csv")
+
+    with st.expander("🛠️ Retreinar o modelo com os dados carregados"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            arvores = st.number_input("Árvores", min_value=10, max_value=1000, value=100, step=10)
+        with col2:
+            folds = st.number_input("Folds de validação cruzada", min_value=2, max_value=10, value=5)
+        with col3:
+            balanceamento = st.selectbox("Balanceamento", BALANCEAMENTOS,
+                                         help="Aplicado só aos dados de treino de cada fold (imbalanced-learn)")
+        if st.button("Retreinar Modelo", disabled=df_bruto is None):
+            with st.spinner("Treinando e validando..."):
+                df_treino = linhas_do_dataset()
+                try:
+                    with instrumentacao.etapa("treino", linhas=len(df_treino)):
+                        relatorio_treino = retreinar(df_treino, n_estimators=int(arvores), folds=int(folds),
+                                                     balanceamento=balanceamento, diretorio=diretorio_modelos)
+                except (ValueError, ImportError) as erro:
+                    st.error(str(erro))
+                    relatorio_treino = None
+            if relatorio_treino is not None:
+                st.success(
+                    f"Versão {relatorio_treino.versao} gravada ({relatorio_treino.linhas:,} linhas, "
+                    f"modelo {relatorio_treino.hash[:12]}); ela passa a ser servida na próxima interação."
+                )
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.dataframe(pd.DataFrame({
+                        "Etapa": list(relatorio_treino.etapas),
+                        "Segundos": [round(t, 3) for t in relatorio_treino.etapas.values()]
+                    }), hide_index=True)
+                with col2:
+                    st.dataframe(pd.DataFrame({
+                        "Métrica": list(relatorio_treino.validacao),
+                        "Média": [np.mean(v) for v in relatorio_treino.validacao.values()],
+                        "Desvio": [np.std(v) for v in relatorio_treino.validacao.values()]
+                    }), hide_index=True)
+
+    if cache_predicoes is None:
+        return
+    estatisticas_predicoes = cache_predicoes.estatisticas()
+    st.caption(
+        f"Cache de predições: {estatisticas_predicoes.acertos:,} acertos · {estatisticas_predicoes.falhas:,} falhas "
+        f"({estatisticas_predicoes.taxa_acerto:.0%}) · {estatisticas_predicoes.itens:,} vetores"
+    )
+
+
+painel_abas = PainelAbas([
+    Aba("regional", f"{nutrition_icons['development']} Indicadores Regionais",
+        preparar_aba_regional, renderizar_aba_regional),
+    Aba("socioeconomica", f"{nutrition_icons['socioeconomic']} Determinantes Socioeconômicos",
+        preparar_aba_socioeconomica, renderizar_aba_socioeconomica),
+    Aba("infraestrutura", f"{nutrition_icons['infrastructure']} Infraestrutura e Nutrição",
+        preparar_aba_infraestrutura, renderizar_aba_infraestrutura),
+    Aba("comparacao", f"{nutrition_icons['main']} Comparação Entre Regiões",
+        preparar_aba_comparacao, renderizar_aba_comparacao),
+    Aba("predicao", "🔮 Análise Preditiva", preparar_aba_predicao, renderizar_aba_predicao),
+], st.session_state, instrumentacao=instrumentacao)
+
+abas_prefetch = st.sidebar.multiselect(
+    "Pré-calcular abas",
+    options=list(painel_abas.titulos),
+    format_func=painel_abas.titulos.get,
+    help="Abas preparadas depois da aba ativa, na mesma execução (a página só termina de carregar depois "
+         "delas), para trocar de aba sem espera"
+)
+
+with st.container(key="seletor_abas"):
+    aba_ativa = st.radio(
+        "Aba",
+        options=list(painel_abas.titulos),
+        format_func=painel_abas.titulos.get,
+        horizontal=True,
+        label_visibility="collapsed",
+        key="aba_ativa"
+    )
+
+
+@st.fragment(run_every=1.0)
+def aviso_previa(linhas_amostra):
+    # Consulta o cálculo exato a cada segundo e refaz a página quando ele termina
+    erro = get_calculos_exatos().falha(futuro_exato)
+    if erro is not None:
+        # Sem rerun: a página continua com as estimativas; a próxima interação tenta o cálculo de novo
+        st.error(
+            f"⚠️ O cálculo exato falhou ({type(erro).__name__}: {erro}). As abas 1 a 4 continuam com as "
+            f"estimativas da amostra ({linhas_amostra:,} linhas nos filtros atuais); qualquer interação tenta o "
+            f"cálculo de novo."
+        )
+        return
+    if futuro_exato.done():
+        st.rerun()
+    st.warning(
+        f"⏳ Prévia: as abas 1 a 4 mostram estimativas de uma amostra estratificada por Região x Faixa de Renda "
+        f"({linhas_amostra:,} linhas da amostra nos filtros atuais), com barras de erro de 95%. "
+        f"Os números exatos substituem a prévia assim que o cálculo terminar."
+    )
+
+
+if aba_ativa != "predicao" and fase_cubo == "amostra":
+    aviso_previa(cubo_filtrado().linhas_amostra)
+elif aba_ativa != "predicao" and futuro_exato is not None:
+    st.caption("✅ Números exatos")
+painel_abas.executar(aba_ativa, assinatura_abas, prefetch=abas_prefetch)
+
+estatisticas_figuras = cache_figuras.estatisticas()
+st.sidebar.caption(
+    f"Cache de figuras: {estatisticas_figuras.acertos} acertos · {estatisticas_figuras.falhas} falhas "
+    f"({estatisticas_figuras.taxa_acerto:.0%}) · {estatisticas_figuras.itens} figuras, "
+    f"{estatisticas_figuras.bytes / 1e6:.1f} MB"
+)
+
 # ----------------------------------------------------------
 # Insights e Recomendações
 # ----------------------------------------------------------
@@ -1113,3 +1559,37 @@ st.markdown("""
     <p style="font-size: 0.9rem; margin-top: 20px; opacity: 0.8;">© 2025 Análise de Desnutrição Infantil | Todos os direitos reservados</p>
 </div>
 """, unsafe_allow_html=True)
+
+# ----------------------------------------------------------
+# Depuração: etapas deste rerun
+# ----------------------------------------------------------
+instrumentacao.gravar()
+with st.sidebar.expander("🐞 Etapas deste rerun"):
+    st.caption(f"Rerun {instrumentacao.id}: {instrumentacao.total:.3f}s no total")
+    medicoes = pd.DataFrame(instrumentacao.registros(), columns=["etapa", "nivel", "inicio", "segundos", "linhas",
+                                                                 "memoria"])
+    medicoes["etapa"] = ["· " * nivel + etapa for nivel, etapa in zip(medicoes["nivel"], medicoes["etapa"])]
+    medicoes["memoria"] = medicoes["memoria"].astype("float64") / 1e6
+    st.dataframe(
+        medicoes.drop(columns="nivel").rename(columns={
+            "etapa": "Etapa", "inicio": "Início (s)", "segundos": "Segundos", "linhas": "Linhas",
+            "memoria": "Δ memória (MB)"
+        }),
+        hide_index=True,
+        column_config={
+            "Início (s)": st.column_config.NumberColumn(format="%.3f"),
+            "Segundos": st.column_config.NumberColumn(format="%.3f"),
+            "Δ memória (MB)": st.column_config.NumberColumn(format="%.1f"),
+        }
+    )
+
+# ----------------------------------------------------------
+# Perfil de inicialização (PAINEL_PERFIL=1)
+# ----------------------------------------------------------
+segundos_execucao = PERFIL.fim_execucao()
+if PERFIL.ativo:
+    if PERFIL.total_execucoes == 1:
+        print("Perfil de inicialização\n" + PERFIL.resumo(), file=sys.stderr)
+    with st.sidebar.expander("Perfil de inicialização"):
+        st.caption(f"Esta execução do script: {segundos_execucao:.3f}s")
+        st.code(PERFIL.resumo(), language=None)
@@ -0,0 +1,95 @@
+"""Implementações de referência e dados para os testes de equivalência dos caminhos rápidos."""
+import numpy as np
+
+from painel.predicao import CODIFICADOR
+from painel.sintetico import gerar_pesquisa
+
+
+# Funções por linha que o app usava antes da tabela declarativa de painel.recodificacao
+def recode_alimentos(valor):
+    if isinstance(valor, str):
+        if "Sim, sempre" in valor:
+            return 1.0
+        elif "Sim, quase sempre" in valor:
+            return 0.5
+    return 0.0
+
+
+def recode_tosse(valor):
+    if isinstance(valor, str):
+        val = valor.strip().lower()
+        if val == "não":
+            return 1.0
+        elif val == "sim":
+            return 0.0
+    return 0.0
+
+
+def recode_cozinha(valor):
+    if isinstance(valor, str):
+        val = valor.strip().lower()
+        if val == "sim":
+            return 1.0
+        elif val == "não":
+            return 0.0
+    return 0.0
+
+
+RECODIFICACOES_LEGADAS = {
+    'alimentos_score': recode_alimentos,
+    'tosse_score': recode_tosse,
+    'cozinha_score': recode_cozinha,
+}
+
+
+def cubo_pandas(df, conjuntos, medidas, linhas=None):
+    """``{conjunto: tabela}`` com ``groupby`` do pandas sobre as linhas, na forma de ``Cubo.tabela``."""
+    import pandas as pd
+
+    if linhas is not None:
+        df = df.iloc[linhas]
+    tabelas = {}
+    for nome, dims in conjuntos.items():
+        agregacoes = {'n': (medidas[0], 'size')}
+        agregacoes.update({'soma_' + m: (m, 'sum') for m in medidas})
+        if dims:
+            tabela = df.groupby(list(dims), observed=True, sort=True).agg(**agregacoes).reset_index()
+        else:
+            tabela = df.agg({m: 'sum' for m in medidas}).add_prefix('soma_').to_frame().T
+            tabela.insert(0, 'n', len(df))
+        tabela['n'] = tabela['n'].astype('int64')
+        tabelas[nome] = tabela
+    return tabelas
+
+
+def assert_cubos_iguais(esperado, obtido):
+    """Mesmos conjuntos, grupos, contagens e somas; categorias comparadas pelos valores e pela ordem."""
+    import pandas as pd
+
+    assert esperado.conjuntos.keys() == obtido.conjuntos.keys()
+    for nome in esperado.conjuntos:
+        a, b = esperado.tabela(nome), obtido.tabela(nome)
+        # o agregado em fluxo guarda as categorias inteiras como int64 (o cubo usa o tipo da coluna)
+        pd.testing.assert_frame_equal(b, a, check_categorical=False, obj=nome)
+        for d in esperado.conjuntos[nome]:
+            assert list(b[d].cat.categories) == list(a[d].cat.categories), (nome, d)
+            assert b[d].cat.ordered == a[d].cat.ordered, (nome, d)
+
+
+def frame_questionario(linhas, seed=0, nulos=0.01, distintas=None):
+    """Respostas com as colunas do modelo; com ``distintas`` as linhas repetem as ``distintas`` primeiras."""
+    df = gerar_pesquisa(linhas if distintas is None else distintas, seed=seed, nulos=nulos)[CODIFICADOR.colunas]
+    if distintas is not None:
+        df = df.iloc[np.random.default_rng(seed).integers(0, distintas, linhas)].reset_index(drop=True)
+    return df
+
+
+def floresta(linhas=3000, seed=0, n_estimators=15, faltantes=True):
+    """``RandomForestClassifier`` pequeno sobre atributos codificados como os do app, com rótulos sorteados."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, _ = CODIFICADOR.codificar(frame_questionario(linhas, seed=seed))
+    if not faltantes:
+        X = np.nan_to_num(X)
+    modelo = RandomForestClassifier(n_estimators=n_estimators, random_state=seed)
+    return modelo.fit(X, np.random.default_rng(seed).integers(1, 7, len(X)))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.amostra import ESTRATOS, Z_95, amostra_estratificada, cubo_amostral, margem_erro
+from painel.cubo import CONJUNTOS, Cubo
+from painel.filtros import IndiceFiltros
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_dataset(gerar_pesquisa(20000, seed=8, nulos=0.02))
+
+
+def test_alocacao_proporcional_com_minimo(df):
+    amostra = amostra_estratificada(df, tamanho=2000, minimo=30, seed=1)
+    assert np.all(np.diff(amostra.posicoes) > 0)
+    estrato = df[list(ESTRATOS)].astype(object).fillna('nulo').apply(tuple, axis=1).to_numpy()
+    sorteados = pd.Series(estrato[amostra.posicoes]).value_counts()
+    populacao = pd.Series(estrato).value_counts()
+    assert amostra.estratos == len(populacao)
+    for chave, total in populacao.items():
+        esperado = min(max(round(2000 * total / len(df)), 30), total)
+        assert sorteados[chave] == esperado, chave
+    # cada estrato pesa exatamente a sua população
+    pesos = pd.Series(amostra.pesos).groupby(estrato[amostra.posicoes]).sum()
+    np.testing.assert_allclose(pesos.sort_index().to_numpy(), populacao.sort_index().to_numpy())
+    assert amostra.pesos.sum() == pytest.approx(len(df))
+
+
+def _estimativa(valores, pesos):
+    total = pesos.sum()
+    media = np.sum(pesos * valores) / total
+    variancia = np.sum(pesos * (valores - media) ** 2) / total
+    erro = Z_95 * np.sqrt(variancia * (1 - len(valores) / total) / len(valores)) if len(valores) > 1 else np.nan
+    return {'media': media, 'erro': erro, 'n': max(round(total), 1)}
+
+
+def test_intervalos_iguais_a_formula_ponderada(df):
+    amostra = amostra_estratificada(df, tamanho=3000, seed=2)
+    linhas = IndiceFiltros(df).selecionar(faixa_etaria=(12, 48))
+    cubo = cubo_amostral(df, amostra, linhas=linhas)
+    manter = np.isin(amostra.posicoes, linhas)
+    sorteadas = df.iloc[amostra.posicoes[manter]].assign(peso=amostra.pesos[manter])
+    medida = 'indice_desenvolvimento'
+    for nome in ('regiao', 'regiao_renda'):
+        dims = list(CONJUNTOS[nome])
+        grupos = sorteadas.dropna(subset=dims).groupby(dims, observed=True, sort=True)
+        esperado = grupos.apply(lambda g: pd.Series(_estimativa(g[medida].to_numpy(), g['peso'].to_numpy())),
+                                include_groups=False)
+        obtido = cubo.media(nome).set_index(dims)
+        obtido['erro'] = margem_erro(cubo, nome)
+        obtido['n'] = cubo.tabela(nome)['n'].to_numpy()
+        obtido = obtido.loc[esperado.index]
+        np.testing.assert_allclose(obtido['indice_medio'], esperado['media'], rtol=1e-9)
+        np.testing.assert_allclose(obtido['erro'], esperado['erro'], rtol=1e-9)
+        np.testing.assert_array_equal(obtido['n'], esperado['n'])
+
+
+def test_amostra_inteira_reproduz_o_cubo_exato(df):
+    amostra = amostra_estratificada(df, tamanho=len(df), minimo=1)
+    assert len(amostra.posicoes) == len(df)
+    exato, estimado = Cubo.construir(df), cubo_amostral(df, amostra)
+    assert estimado.media_geral() == pytest.approx(exato.media_geral())
+    for nome in CONJUNTOS:
+        np.testing.assert_array_equal(estimado.tabela(nome)['n'], exato.tabela(nome)['n'])
+        erro = estimado.erro(nome)
+        np.testing.assert_allclose(erro[~np.isnan(erro)], 0, atol=1e-12)
+    assert margem_erro(exato, 'regiao') is None
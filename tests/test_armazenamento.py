@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from painel.armazenamento import DatasetStore, RelatorioArmazenamento, load_or_ingest
+from painel.fluxo import AgregadoFluxo
+from painel.ingestao import RelatorioIngestao, read_survey
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa, gravar_csv
+
+
+@pytest.mark.parametrize('formato', ['feather', 'parquet'])
+def test_segunda_leitura_vem_do_store_sem_ler_o_csv(tmp_path, formato):
+    caminho = str(tmp_path / 'pesquisa.csv')
+    gravar_csv(caminho, 2000, seed=7, nulos=0.01)
+    store = DatasetStore(str(tmp_path / 'store'), max_bytes=1 << 30, formato=formato)
+    leituras = []
+
+    def ler(file):
+        leituras.append(file)
+        return read_survey(file)
+
+    df, relatorio, chave = load_or_ingest(store, caminho, ler)
+    assert isinstance(relatorio, RelatorioIngestao) and relatorio.origem == 'csv'
+    do_store, relatorio_store, chave_store = load_or_ingest(store, caminho, ler)
+    assert len(leituras) == 1 and chave_store == chave
+    assert isinstance(relatorio_store, RelatorioArmazenamento) and relatorio_store.origem == 'cache'
+    assert relatorio_store.formato == formato and relatorio_store.linhas == len(df)
+    pd.testing.assert_frame_equal(do_store, df)
+
+
+def test_agregado_volta_igual_do_zip(tmp_path):
+    store = DatasetStore(str(tmp_path), max_bytes=1 << 30)
+    agregado = AgregadoFluxo().adicionar(preparar_dataset(gerar_pesquisa(2000, seed=8, nulos=0.01)))
+    store.put_agregado('chave', agregado)
+    lido = store.get_agregado('chave')
+    assert (lido.linhas, lido.blocos, lido.ordinais) == (agregado.linhas, agregado.blocos, agregado.ordinais)
+    esperado, obtido = agregado.cubo(), lido.cubo()
+    for nome in esperado.conjuntos:
+        pd.testing.assert_frame_equal(obtido.tabela(nome), esperado.tabela(nome), obj=nome)
+    assert store.get_agregado('outra') is None
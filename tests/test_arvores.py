@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from painel import arvores
+from painel.arvores import FlorestaCompilada, escolher_motor
+from painel.predicao import CODIFICADOR
+from tests.referencias import frame_questionario
+
+
+@pytest.fixture(scope='module')
+def dados():
+    X, _ = CODIFICADOR.codificar(frame_questionario(3000, seed=1))
+    X_novo, _ = CODIFICADOR.codificar(frame_questionario(500, seed=2))
+    return X, np.random.default_rng(0).integers(1, 7, len(X)), X_novo
+
+
+@pytest.mark.parametrize('faltantes', [False, True])
+@pytest.mark.parametrize('min_samples_leaf', [1, 7])  # folhas com várias classes: frações que não somam 1 exato
+def test_compilada_igual_ao_sklearn(dados, faltantes, min_samples_leaf):
+    X, y, X_novo = dados
+    if not faltantes:
+        X, X_novo = np.nan_to_num(X), np.nan_to_num(X_novo)
+    modelo = RandomForestClassifier(n_estimators=15, min_samples_leaf=min_samples_leaf, random_state=0).fit(X, y)
+    compilada = FlorestaCompilada.de_sklearn(modelo)
+    for lote in (X_novo[:1], X_novo):
+        np.testing.assert_array_equal(compilada.predict_proba(lote), modelo.predict_proba(lote))
+        np.testing.assert_array_equal(compilada.predict(lote), modelo.predict(lote))
+
+    arvore = DecisionTreeClassifier(min_samples_leaf=min_samples_leaf, random_state=0).fit(X, y)
+    np.testing.assert_array_equal(FlorestaCompilada.de_sklearn(arvore).predict_proba(X_novo),
+                                  arvore.predict_proba(X_novo))
+
+
+def test_contagens_sao_divididas_pela_soma_como_no_sklearn_antigo(dados, monkeypatch):
+    X, y, X_novo = dados
+    modelo = RandomForestClassifier(n_estimators=5, min_samples_leaf=7, random_state=0).fit(np.nan_to_num(X), y)
+    monkeypatch.setattr(arvores, 'arvore_normaliza', lambda: True)
+    esperado = np.zeros((len(X_novo), len(modelo.classes_)))
+    for estimador in modelo.estimators_:
+        valores = estimador.tree_.value[estimador.apply(np.nan_to_num(X_novo).astype(np.float32)), 0, :]
+        soma = valores.sum(axis=1, keepdims=True)
+        soma[soma == 0.0] = 1.0
+        esperado += valores / soma
+    esperado /= len(modelo.estimators_)
+    obtido = FlorestaCompilada.de_sklearn(modelo).predict_proba(np.nan_to_num(X_novo))
+    np.testing.assert_array_equal(obtido, esperado)
+
+
+def test_motor_automatico_por_tamanho_do_lote():
+    assert escolher_motor('sklearn', 'compilada', arvores.LIMITE_LOTE_COMPILADO) == 'compilada'
+    assert escolher_motor('sklearn', 'compilada', arvores.LIMITE_LOTE_COMPILADO + 1) == 'sklearn'
+    assert escolher_motor('sklearn', None, 1) == 'sklearn'
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from painel.beneficios import (
+    LETRAS, NOMES, mascara_beneficios, mascara_resposta, matriz_beneficios, resumo_por_beneficio, total_beneficios
+)
+
+
+def _letras_marcadas(resposta):
+    if resposta is None or pd.isna(resposta):
+        return set()
+    return {parte.strip() for parte in str(resposta).split(',')} & set(LETRAS)
+
+
+def test_multi_hot_igual_ao_split_por_linha():
+    respostas = pd.Series(['A', 'A,F', ' B , G', '', None, 'Z', 'C,C', 'A,B,C,D,E,F,G', 'F,Z'] * 50,
+                          dtype='category')
+    mascaras = mascara_beneficios(respostas)
+    assert mascaras.dtype == np.uint8
+    esperada = np.array([[letra in _letras_marcadas(r) for letra in LETRAS] for r in respostas], dtype=np.uint8)
+    np.testing.assert_array_equal(matriz_beneficios(mascaras), esperada)
+    np.testing.assert_array_equal(total_beneficios(mascaras), esperada.sum(axis=1))
+    np.testing.assert_array_equal(mascaras, [mascara_resposta(r) for r in respostas.astype(object)])
+    # coluna object dá a mesma máscara que a categórica
+    np.testing.assert_array_equal(mascara_beneficios(respostas.astype(object)), mascaras)
+
+
+def test_resumo_por_beneficio_conta_cada_beneficio_marcado():
+    mascaras = mascara_beneficios(pd.Series(['A', 'A,F', 'F', None]))
+    resumo = resumo_por_beneficio(mascaras, n=[2, 3, 5, 7], somas={'indice': [1.0, 2.0, 4.0, 8.0]})
+    por_nome = resumo.set_index('Benefício')
+    assert list(resumo['Benefício']) == [NOMES[letra] for letra in LETRAS]
+    assert por_nome.loc[NOMES['A'], 'n'] == 5 and por_nome.loc[NOMES['F'], 'n'] == 8
+    assert por_nome.loc[NOMES['A'], 'soma_indice'] == 3.0 and por_nome.loc[NOMES['F'], 'soma_indice'] == 6.0
+    assert por_nome['n'].sum() == 13  # a linha sem benefício não conta; 'A,F' conta duas vezes
@@ -0,0 +1,54 @@
+import plotly.graph_objects as go
+
+from painel.cache import CacheLRU
+from painel.figuras import CacheFiguras
+
+
+def test_lru_remove_o_menos_usado_por_itens_e_por_bytes():
+    cache = CacheLRU(max_itens=2)
+    cache.put('a', 'x')
+    cache.put('b', 'y')
+    assert cache.get('a') == 'x'  # 'a' passa a ser o mais recente
+    cache.put('c', 'z')
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.get('b', 'ausente') == 'ausente'
+
+    por_bytes = CacheLRU(max_bytes=10)
+    por_bytes.put(1, 'abcd')
+    por_bytes.put(2, 'efg')
+    por_bytes.put(2, 'efghij')  # substituir desconta o tamanho antigo: 4 + 6 cabe
+    assert len(por_bytes) == 2 and por_bytes.estatisticas().bytes == 10
+    por_bytes.put(3, 'x' * 20)  # maior que o limite sozinho: fica, e os outros saem
+    estatisticas = por_bytes.estatisticas()
+    assert 3 in por_bytes and len(por_bytes) == 1
+    assert (estatisticas.bytes, estatisticas.remocoes) == (20, 2)
+
+def test_estatisticas_contam_acertos_e_falhas():
+    cache = CacheLRU()
+    cache.put('a', 'x')
+    cache.get('a')
+    cache.get('b')
+    estatisticas = cache.estatisticas()
+    assert (estatisticas.acertos, estatisticas.falhas, estatisticas.itens) == (1, 1, 1)
+    assert estatisticas.taxa_acerto == 0.5
+    cache.clear()
+    assert len(cache) == 0 and cache.estatisticas().bytes == 0
+
+
+def test_cache_de_figuras_so_constroi_uma_vez_por_estado():
+    cache = CacheFiguras()
+    construcoes = []
+
+    def construir():
+        construcoes.append(1)
+        return go.Figure(go.Bar(x=['Norte', 'Sul'], y=[1, 2])).update_layout(title='Região')
+
+    primeira = cache.obter('regiao', 'dataset', ('Norte',), construir)
+    segunda = cache.obter('regiao', 'dataset', ('Norte',), construir)
+    assert len(construcoes) == 1
+    assert segunda.to_dict() == primeira.to_dict()
+    cache.obter('regiao', 'dataset', ('Sul',), construir)  # outro estado dos filtros
+    cache.obter('regiao', 'outro', ('Norte',), construir)  # outro dataset
+    assert len(construcoes) == 3
+    estatisticas = cache.estatisticas()
+    assert (estatisticas.acertos, estatisticas.falhas) == (1, 3)
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from painel.amostra import amostra_estratificada, cubo_amostral
+from painel.comparacao import PAINEIS, dados_comparacao, figura_comparacao, png_comparacao
+from painel.cubo import CONJUNTOS, Cubo
+from painel.filtros import IndiceFiltros
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+
+PALETA = ['#1b9e77', '#d95f02', '#7570b3', '#e7298a', '#66a61e']
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_dataset(gerar_pesquisa(8000, seed=9, nulos=0.01))
+
+
+def test_paineis_iguais_as_medias_do_groupby(df):
+    linhas = IndiceFiltros(df).selecionar(faixa_etaria=(18, 60))
+    dados = dados_comparacao(Cubo.construir(df, linhas=linhas))
+    filtrado = df.iloc[linhas]
+    assert dados['media_geral'] == pytest.approx(filtrado['indice_desenvolvimento'].mean())
+    for (conjunto, coluna, titulo), (titulo_obtido, coluna_obtida, medias) in zip(PAINEIS, dados['paineis']):
+        assert (titulo_obtido, coluna_obtida) == (titulo, coluna)
+        dims = list(CONJUNTOS[conjunto])
+        esperado = filtrado.groupby(dims, observed=True)['indice_desenvolvimento'].mean()
+        obtido = medias.set_index(dims)['indice_medio']
+        pd.testing.assert_series_equal(obtido.sort_index(), esperado.sort_index(), check_names=False,
+                                       check_index_type=False, check_categorical=False)
+        assert 'erro' not in medias
+
+
+def test_figura_tem_uma_legenda_por_regiao_e_barras_na_previa(df):
+    dados = dados_comparacao(Cubo.construir(df))
+    fig = figura_comparacao(dados, PALETA)
+    regioes = {str(r) for r in df['Região'].dropna().unique()}
+    legendas = [t.name for t in fig.data if t.showlegend]
+    assert sorted(legendas) == sorted(regioes)
+    assert all(t.error_x.array is None for t in fig.data)
+
+    previa = dados_comparacao(cubo_amostral(df, amostra_estratificada(df, tamanho=2000)))
+    fig = figura_comparacao(previa, PALETA)
+    assert all(t.error_x.array is not None for t in fig.data)
+
+
+def test_figura_sem_linhas_nao_desenha_media(df):
+    dados = dados_comparacao(Cubo.construir(df, linhas=[]))
+    fig = figura_comparacao(dados, PALETA)
+    assert not fig.layout.shapes
+
+
+def test_matplotlib_so_e_importado_na_exportacao():
+    codigo = ("import sys; from painel import comparacao; "
+              "assert 'matplotlib' not in sys.modules and 'seaborn' not in sys.modules")
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', codigo], check=True, cwd=raiz)
+
+
+def test_exportacao_png(df):
+    pytest.importorskip('seaborn')
+    png = png_comparacao(dados_comparacao(Cubo.construir(df)), dpi=30)
+    assert png.startswith(b'\x89PNG')
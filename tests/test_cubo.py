@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel import cubo as modulo_cubo
+from painel.cubo import CONJUNTOS, MEDIDAS, Cubo, matriz_indicadores
+from painel.filtros import COLUNA_REGIAO, IndiceFiltros
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+from tests.referencias import cubo_pandas
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_dataset(gerar_pesquisa(10000, seed=5, nulos=0.01))
+
+
+def assert_igual_ao_pandas(cubo, esperado):
+    for nome, tabela in esperado.items():
+        obtida = cubo.tabela(nome).copy()
+        for d in cubo.conjuntos[nome]:
+            if not isinstance(tabela[d].dtype, pd.CategoricalDtype):  # scores e máscara: valores, não categorias
+                obtida[d] = obtida[d].astype(tabela[d].dtype)
+        pd.testing.assert_frame_equal(obtida, tabela, check_dtype=False, obj=nome)
+
+
+def test_cubo_igual_ao_groupby(df):
+    linhas = IndiceFiltros(df).selecionar(regioes=list(df[COLUNA_REGIAO].cat.categories[:2]),
+                                          faixa_etaria=(12, 48))
+    medidas = list(MEDIDAS)
+    assert_igual_ao_pandas(Cubo.construir(df), cubo_pandas(df, CONJUNTOS, medidas))
+    assert_igual_ao_pandas(Cubo.construir(df, linhas=linhas), cubo_pandas(df, CONJUNTOS, medidas, linhas))
+
+
+def test_chaves_compactadas_dao_o_mesmo_cubo(df, monkeypatch):
+    denso = Cubo.construir(df)
+    monkeypatch.setattr(modulo_cubo, 'LIMITE_CHAVES_DENSAS', 0)
+    compacto = Cubo.construir(df)
+    for nome in CONJUNTOS:
+        pd.testing.assert_frame_equal(compacto.tabela(nome), denso.tabela(nome), obj=nome)
+
+
+def test_medida_com_nulo_e_recusada(df):
+    com_nulo = df.copy()
+    com_nulo.loc[0, 'tosse_score'] = np.nan
+    with pytest.raises(ValueError, match='tosse_score'):
+        Cubo.construir(com_nulo)
+
+
+def test_matriz_indicadores_igual_a_media_do_groupby(df):
+    medidas = {'alimentos_score': 'Alimentos', 'tosse_score': 'Tosse', 'cozinha_score': 'Cozinha'}
+    linhas = IndiceFiltros(df).selecionar(faixa_etaria=(0, 36))
+    obtida = matriz_indicadores(df, COLUNA_REGIAO, medidas, linhas=linhas)
+    esperada = df.iloc[linhas].groupby(COLUNA_REGIAO, observed=True)[list(medidas)].mean().rename(columns=medidas)
+    pd.testing.assert_frame_equal(obtida, esperada, check_index_type=False, check_exact=False, rtol=1e-12)
+
+    por_dois = matriz_indicadores(df, ('Região', 'Faixa de Renda'), ['indice_desenvolvimento'])
+    esperada = df.groupby(['Região', 'Faixa de Renda'], observed=True)[['indice_desenvolvimento']].mean()
+    np.testing.assert_allclose(por_dois.to_numpy(), esperada.to_numpy(), rtol=1e-12)
+    assert list(por_dois.index) == list(esperada.index)
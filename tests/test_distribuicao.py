@@ -0,0 +1,28 @@
+import numpy as np
+
+from painel.cubo import Cubo
+from painel.distribuicao import correlacao_contagens, resumo_caixas_contagens
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+
+
+def test_caixas_e_correlacao_iguais_as_das_linhas():
+    df = preparar_dataset(gerar_pesquisa(8000, seed=6, nulos=0.01))
+    cubo = Cubo.construir(df)
+
+    resumo = resumo_caixas_contagens(cubo.tabela('ocupacao_indice'), 'Ocupação', 'indice_desenvolvimento')
+    grupos = df.dropna(subset=['Ocupação']).groupby('Ocupação', observed=True)['indice_desenvolvimento']
+    assert list(resumo['Ocupação']) == list(grupos.groups)
+    for caixa, (_, valores) in zip(resumo.itertuples(index=False), grupos):
+        valores = valores.to_numpy(dtype='float64')
+        q1, mediana, q3 = np.quantile(valores, [0.25, 0.5, 0.75])
+        assert caixa.n == len(valores)
+        np.testing.assert_allclose([caixa.q1, caixa.mediana, caixa.q3], [q1, mediana, q3], rtol=0, atol=1e-12)
+        dentro = (valores >= q1 - 1.5 * (q3 - q1)) & (valores <= q3 + 1.5 * (q3 - q1))
+        assert caixa.cerca_inferior == valores[dentro].min() and caixa.cerca_superior == valores[dentro].max()
+        np.testing.assert_array_equal(caixa.outliers, np.unique(valores[~dentro]))
+
+    colunas = ['alimentos_score', 'cozinha_score', 'tosse_score']
+    scores = cubo.tabela('scores')
+    obtida = correlacao_contagens(scores[colunas].astype('float64'), scores['n'])
+    np.testing.assert_allclose(obtida.to_numpy(), df[colunas].corr().to_numpy(), rtol=0, atol=1e-12)
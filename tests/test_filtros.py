@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from painel.filtros import COLUNA_ALIMENTOS, COLUNA_DOMICILIO, COLUNA_REGIAO, IndiceFiltros
+from painel.ingestao import COLUNA_IDADE_MESES
+from painel.sintetico import gerar_pesquisa
+
+
+@pytest.fixture(scope='module')
+def df():
+    return gerar_pesquisa(20000, seed=4, nulos=0.02)
+
+
+def _mascara(df, regioes=None, faixa_etaria=None, tipos_domicilio=None, acesso_alimentos=None):
+    mascara = np.ones(len(df), dtype=bool)
+    if regioes is not None:
+        mascara &= df[COLUNA_REGIAO].isin(regioes).to_numpy()
+    if tipos_domicilio is not None:
+        mascara &= df[COLUNA_DOMICILIO].isin(tipos_domicilio).to_numpy()
+    if acesso_alimentos is not None:
+        mascara &= (df[COLUNA_ALIMENTOS] == acesso_alimentos).to_numpy()
+    if faixa_etaria is not None:
+        mascara &= df[COLUNA_IDADE_MESES].between(*faixa_etaria).to_numpy()
+    return np.flatnonzero(mascara)
+
+
+def test_bitmaps_iguais_a_mascara_booleana(df):
+    regioes = list(df[COLUNA_REGIAO].cat.categories)
+    domicilios = list(df[COLUNA_DOMICILIO].cat.categories)
+    casos = [
+        {},
+        {'regioes': regioes[:2]},
+        {'regioes': [], 'faixa_etaria': (0, 60)},
+        {'faixa_etaria': (12, 36)},
+        {'faixa_etaria': (24, 24)},
+        {'tipos_domicilio': domicilios[1:], 'acesso_alimentos': df[COLUNA_ALIMENTOS].cat.categories[0]},
+        {'regioes': regioes[1:] + ['Inexistente'], 'faixa_etaria': (0, 48), 'tipos_domicilio': domicilios[:1],
+         'acesso_alimentos': df[COLUNA_ALIMENTOS].cat.categories[-1]},
+    ]
+    indice = IndiceFiltros(df)
+    for caso in casos:
+        np.testing.assert_array_equal(indice.selecionar(**caso), _mascara(df, **caso), err_msg=str(caso))
+
+
+def test_coluna_ausente_nao_restringe(df):
+    sem_domicilio = df.drop(columns=[COLUNA_DOMICILIO])
+    indice = IndiceFiltros(sem_domicilio)
+    assert indice.ausentes == {COLUNA_DOMICILIO}
+    regioes = list(df[COLUNA_REGIAO].cat.categories[:2])
+    np.testing.assert_array_equal(indice.selecionar(regioes=regioes, tipos_domicilio=['Casa']),
+                                  _mascara(df, regioes=regioes))
+    sem_idade = IndiceFiltros(df.drop(columns=[COLUNA_IDADE_MESES]))
+    np.testing.assert_array_equal(sem_idade.selecionar(faixa_etaria=(12, 24)), np.arange(len(df)))
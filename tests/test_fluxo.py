@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from painel.cubo import Cubo
+from painel.filtros import COLUNA_ALIMENTOS, COLUNA_DOMICILIO, COLUNA_REGIAO, IndiceFiltros
+from painel.fluxo import AgregadoFluxo, agregar_csv, classe_idade, classes_no_intervalo
+from painel.ingestao import concatenar, read_survey
+from painel.pipeline import FAIXAS_ETARIAS, preparar_dataset
+from painel.sintetico import blocos_pesquisa, gravar_csv
+from tests.referencias import assert_cubos_iguais
+
+
+@pytest.fixture(scope='module')
+def blocos():
+    return [preparar_dataset(bloco) for bloco in blocos_pesquisa(12000, tamanho_bloco=5000, seed=5, nulos=0.01)]
+
+
+@pytest.fixture(scope='module')
+def df(blocos):
+    return concatenar(blocos)
+
+
+# cada caso recebe o frame para usar categorias que o sintético de fato gera
+FILTROS = (
+    lambda df: {},
+    lambda df: {'faixa_etaria': (12, 48)},
+    lambda df: {'regioes': list(df[COLUNA_REGIAO].cat.categories[:2]), 'faixa_etaria': (0, 24)},
+    lambda df: {'tipos_domicilio': list(df[COLUNA_DOMICILIO].cat.categories[:1]),
+                'acesso_alimentos': df[COLUNA_ALIMENTOS].cat.categories[0]},
+)
+
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_fluxo_igual_ao_cubo_das_linhas(blocos, df, filtros):
+    filtros = filtros(df)
+    agregado = AgregadoFluxo()
+    for bloco in blocos:
+        agregado.adicionar(bloco)
+    assert agregado.linhas == len(df) and agregado.blocos == len(blocos)
+    linhas = IndiceFiltros(df).selecionar(**filtros)
+    assert_cubos_iguais(Cubo.construir(df, linhas=linhas), agregado.cubo(**filtros))
+
+
+def test_juntar_copia_e_estado(blocos, df):
+    primeiro, segundo = AgregadoFluxo(), AgregadoFluxo()
+    primeiro.adicionar(blocos[0])
+    for bloco in blocos[1:]:
+        segundo.adicionar(bloco)
+    copia = primeiro.copia()
+    primeiro.juntar(segundo)
+    assert copia.linhas == len(blocos[0])
+    esperado = Cubo.construir(df)
+    assert_cubos_iguais(esperado, primeiro.cubo())
+    assert_cubos_iguais(esperado, AgregadoFluxo.de_estado(*primeiro.estado()).cubo())
+    assert_cubos_iguais(Cubo.construir(blocos[0]), copia.cubo())
+
+
+def test_agregar_csv_igual_a_leitura_inteira(tmp_path):
+    caminho = str(tmp_path / 'pesquisa.csv')
+    gravar_csv(caminho, 3000, tamanho_bloco=1000, seed=3, nulos=0.02)
+    df = preparar_dataset(read_survey(caminho)[0])
+    agregado, relatorio = agregar_csv(caminho, tamanho_chunk=700)
+    assert (relatorio.linhas, relatorio.blocos) == (3000, 5)
+    assert relatorio.celulas == agregado.celulas
+    filtros = {'regioes': list(df[COLUNA_REGIAO].cat.categories[1:]), 'faixa_etaria': (12, 36)}
+    assert_cubos_iguais(Cubo.construir(df), agregado.cubo())
+    linhas = IndiceFiltros(df).selecionar(**filtros)
+    assert_cubos_iguais(Cubo.construir(df, linhas=linhas), agregado.cubo(**filtros))
+
+
+def test_classes_de_idade_reproduzem_o_intervalo():
+    idades = np.append(np.arange(-1, FAIXAS_ETARIAS[-1] + 3, 0.5), np.nan)
+    classes = classe_idade(idades)
+    for minimo in FAIXAS_ETARIAS:
+        for maximo in FAIXAS_ETARIAS:
+            if maximo < minimo:
+                continue
+            esperado = (minimo <= idades) & (idades <= maximo)
+            np.testing.assert_array_equal(np.isin(classes, classes_no_intervalo(minimo, maximo)), esperado)
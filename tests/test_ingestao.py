@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from painel.ingestao import MOTORES, concatenar, read_survey
+from painel.sintetico import gravar_csv
+
+
+@pytest.fixture(scope='module')
+def caminho(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('ingestao') / 'pesquisa.csv'
+    gravar_csv(str(caminho), 1500, tamanho_bloco=500, seed=2, nulos=0.02)
+    return str(caminho)
+
+
+def test_motores_devolvem_o_mesmo_frame(caminho):
+    esperado, _ = read_survey(caminho, motor='pyarrow')
+    for motor in MOTORES:
+        # blocos pequenos: cada um vê só parte das categorias
+        df, relatorio = read_survey(caminho, motor=motor, tamanho_chunk=7)
+        assert relatorio.linhas == len(esperado)
+        assert df.equals(esperado), motor
+        for col in df.select_dtypes('category'):
+            assert list(df[col].cat.categories) == list(esperado[col].cat.categories), (motor, col)
+
+
+def test_concatenar_ordena_categorias_novas():
+    partes = [pd.DataFrame({'Região': pd.Categorical(['Sul', 'Norte'])}),
+              pd.DataFrame({'Região': pd.Categorical(['Centro-Oeste'])})]
+    assert list(concatenar(partes)['Região'].cat.categories) == ['Centro-Oeste', 'Norte', 'Sul']
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from painel.instrumentacao import Instrumentacao
+
+
+def test_etapas_aninhadas_registram_nivel_tempo_e_linhas():
+    instrumentacao = Instrumentacao()
+    with instrumentacao.etapa('load_data', linhas=10) as externa:
+        with instrumentacao.etapa('filtros') as interna:
+            interna.linhas = 4
+    with instrumentacao.etapa('abas'):
+        pass
+    registros = instrumentacao.registros()
+    assert [(r['etapa'], r['nivel'], r['linhas']) for r in registros] == [
+        ('load_data', 0, 10), ('filtros', 1, 4), ('abas', 0, None)]
+    assert externa.segundos >= interna.segundos >= 0
+    assert registros[2]['inicio'] >= registros[0]['inicio']
+    assert instrumentacao.total >= externa.segundos
+
+
+def test_etapa_com_excecao_e_fechada():
+    instrumentacao = Instrumentacao()
+    with pytest.raises(ValueError):
+        with instrumentacao.etapa('falha'):
+            raise ValueError
+    with instrumentacao.etapa('depois'):
+        pass
+    assert [m.nivel for m in instrumentacao.medicoes] == [0, 0]
+
+
+def test_medir_aceita_funcao_para_as_linhas():
+    instrumentacao = Instrumentacao()
+
+    @instrumentacao.medir('prever', linhas=len)
+    def prever(n):
+        return list(range(n))
+
+    @instrumentacao.medir('fixa', linhas=7)
+    def fixa():
+        return None
+
+    assert prever(5) == [0, 1, 2, 3, 4]
+    fixa()
+    assert prever.__name__ == 'prever'
+    assert [(m.etapa, m.linhas) for m in instrumentacao.medicoes] == [('prever', 5), ('fixa', 7)]
+
+
+def test_gravar_acrescenta_linhas_json(tmp_path):
+    arquivo = tmp_path / 'reruns.jsonl'
+    Instrumentacao(arquivo=str(arquivo)).gravar()
+    assert not arquivo.exists()
+    execucoes = []
+    for _ in range(2):
+        instrumentacao = Instrumentacao(arquivo=str(arquivo))
+        with instrumentacao.etapa('load_data', linhas=3):
+            with instrumentacao.etapa('interna'):
+                pass
+        instrumentacao.gravar()
+        execucoes.append(instrumentacao.id)
+    registros = [json.loads(linha) for linha in arquivo.read_text(encoding='utf-8').splitlines()]
+    assert [r['rerun'] for r in registros] == [execucoes[0]] * 2 + [execucoes[1]] * 2
+    assert [r['etapa'] for r in registros] == ['load_data', 'interna'] * 2
+    assert {'segundos', 'linhas', 'memoria', 'nivel', 'momento'} <= set(registros[0])
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from painel.modelo import CarregadorModelo, HashModeloInvalido, carregar_modelo
+from painel.sintetico import gerar_pesquisa
+from painel.treino import gravar_versao, modelo_atual, retreinar
+
+
+def _gravar_base(tmp_path):
+    caminho = tmp_path / 'modelo_alimentos_basicos.pkl'
+    dados = pickle.dumps({'modelo': 'base'})
+    caminho.write_bytes(dados)
+    return str(caminho), hashlib.sha256(dados).hexdigest()
+
+
+def test_hash_do_ambiente_trava_so_o_pickle_base(tmp_path):
+    base, hash_base = _gravar_base(tmp_path)
+    diretorio = str(tmp_path / 'modelos')
+    carregador = CarregadorModelo(lambda: modelo_atual(base, diretorio), esperado={base: hash_base}).iniciar()
+    assert carregador.obter(timeout=30)[1].hash == hash_base
+
+    # o retreino grava modelos/...-v0001.pkl com o próprio .sha256; a recarga confere esse, não o do ambiente
+    relatorio = retreinar(gerar_pesquisa(600, seed=1), n_estimators=5, folds=2, n_jobs=1, diretorio=diretorio)
+    for _ in range(2):
+        _, relatorio_modelo = carregador.obter(timeout=30)
+        assert relatorio_modelo.hash == relatorio.hash
+
+
+def test_hash_divergente_nao_e_servido(tmp_path):
+    base, _ = _gravar_base(tmp_path)
+    with pytest.raises(HashModeloInvalido):
+        CarregadorModelo(base, esperado={base: '0' * 64}).iniciar().obter(timeout=30)
+
+    diretorio = str(tmp_path / 'modelos')
+    relatorio = retreinar(gerar_pesquisa(600, seed=1), n_estimators=5, folds=2, n_jobs=1, diretorio=diretorio)
+    with open(relatorio.caminho + '.sha256', 'w') as f:
+        f.write('0' * 64 + '\n')
+    with pytest.raises(HashModeloInvalido):
+        CarregadorModelo(lambda: modelo_atual(base, diretorio), esperado={base: None}).iniciar().obter(timeout=30)
+
+
+def test_carga_em_segundo_plano_confere_o_sidecar_e_recarrega(tmp_path):
+    base, hash_base = _gravar_base(tmp_path)
+    carregador = CarregadorModelo(base).iniciar()
+    modelo, relatorio = carregador.obter(timeout=30)
+    assert carregador.pronto and modelo == {'modelo': 'base'}
+    assert (relatorio.hash, relatorio.bytes_arquivo) == (hash_base, os.path.getsize(base))
+    assert carregador.obter(timeout=30)[0] is modelo  # sem mudança no arquivo, sem nova carga
+
+    # pickle substituído: recarrega; com um .sha256 que não bate, a carga falha em vez de servir o antigo
+    novo = pickle.dumps({'modelo': 'novo'})
+    with open(base, 'wb') as f:
+        f.write(novo)
+    os.utime(base, ns=(1, 1))
+    assert carregador.desatualizado
+    assert carregador.obter(timeout=30)[0] == {'modelo': 'novo'}
+    with open(base + '.sha256', 'w') as f:
+        f.write(f"{hash_base}  modelo_alimentos_basicos.pkl\n")
+    with pytest.raises(HashModeloInvalido):
+        carregar_modelo(base)
+    assert carregar_modelo(base, esperado=hashlib.sha256(novo).hexdigest())[0] == {'modelo': 'novo'}
+
+
+def test_arquivo_ausente_e_relancado_por_obter(tmp_path):
+    carregador = CarregadorModelo(str(tmp_path / 'nao_existe.pkl')).iniciar()
+    with pytest.raises(FileNotFoundError):
+        carregador.obter(timeout=30)
+    assert carregador.pronto
+
+
+def test_retreinos_simultaneos_reservam_versoes_distintas(tmp_path):
+    diretorio = str(tmp_path / 'modelos')
+    inicio = threading.Barrier(6)
+
+    def gravar(i):
+        inicio.wait()
+        return gravar_versao({'modelo': i, 'peso': list(range(i * 1000))}, {'origem': i}, diretorio)
+
+    with ThreadPoolExecutor(6) as executor:
+        gravadas = list(executor.map(gravar, range(6)))
+    assert sorted(v for v, _, _ in gravadas) == list(range(1, 7))
+    for i, (versao, caminho, hash_modelo) in enumerate(gravadas):
+        with open(caminho, 'rb') as f:
+            dados = f.read()
+        assert pickle.loads(dados)['modelo'] == i
+        assert hashlib.sha256(dados).hexdigest() == hash_modelo
+        with open(caminho + '.sha256') as f:
+            assert f.read().split()[0] == hash_modelo
+        with open(caminho[:-len('.pkl')] + '.json') as f:
+            assert json.load(f)['versao'] == versao
+
+
+def test_versao_reservada_nao_e_servida(tmp_path):
+    diretorio = str(tmp_path / 'modelos')
+    _, caminho, _ = gravar_versao({'modelo': 1}, {}, diretorio)
+    open(os.path.join(diretorio, 'modelo_alimentos_basicos-v0002.pkl'), 'x').close()
+    assert modelo_atual('base.pkl', diretorio) == caminho
+    versao, _, _ = gravar_versao({'modelo': 3}, {}, diretorio)
+    assert versao == 3
@@ -0,0 +1,52 @@
+from painel.armazenamento import DatasetStore
+from painel.ondas import combinar_ondas, verificar_consistencia
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+
+
+def _cadeia(store, brutos, preparados):
+    chaves = [f'onda-{i}' for i in range(len(brutos))]
+    return combinar_ondas(store, chaves, brutos, lambda i: preparados.append(i) or preparar_dataset(brutos[i]))
+
+
+def test_ondas_iguais_ao_recalculo_completo(tmp_path):
+    store = DatasetStore(str(tmp_path), max_bytes=1 << 30)
+    brutos = [gerar_pesquisa(3000, seed=seed, nulos=0.01) for seed in (10, 11, 12)]
+    filtros = {'regioes': list(brutos[0]['Região'].cat.categories[:2]), 'faixa_etaria': (12, 48)}
+
+    preparados = []
+    dataset = _cadeia(store, brutos[:2], preparados)
+    assert preparados == [0, 1]
+    assert verificar_consistencia(dataset, filtros) == []
+
+    # uma onda a mais: o prefixo gravado é reaproveitado e só a nova é pontuada
+    preparados = []
+    dataset = _cadeia(store, brutos, preparados)
+    assert preparados == [2] and dataset.relatorio.reaproveitados == 2
+    assert verificar_consistencia(dataset, filtros) == []
+
+    # cadeia inteira no disco (outra réplica): nada é pontuado
+    preparados = []
+    assert verificar_consistencia(_cadeia(store, brutos, preparados), filtros) == []
+    assert preparados == []
+
+
+def test_onda_com_categoria_nova(tmp_path):
+    store = DatasetStore(str(tmp_path), max_bytes=1 << 30)
+    base = gerar_pesquisa(3000, seed=20, nulos=0.01)
+    base = base[base['Região'] != 'Centro-Oeste'].reset_index(drop=True)
+    base['Região'] = base['Região'].cat.remove_unused_categories()
+    brutos = [base, gerar_pesquisa(2000, seed=21, nulos=0.01)]
+    dataset = _cadeia(store, brutos, [])
+    assert list(dataset.bruto['Região'].cat.categories) == ['Centro-Oeste', 'Nordeste', 'Norte', 'Sudeste', 'Sul']
+    assert verificar_consistencia(dataset, {'regioes': ['Centro-Oeste', 'Sul'], 'faixa_etaria': (0, 24)}) == []
+
+
+def test_divergencia_e_apontada(tmp_path):
+    store = DatasetStore(str(tmp_path), max_bytes=1 << 30)
+    brutos = [gerar_pesquisa(2000, seed=seed, nulos=0.01) for seed in (30, 31)]
+    dataset = _cadeia(store, brutos, [])
+    tabela = dataset.agregado.tabelas['regiao']
+    tabela.loc[tabela.index[0], 'soma_indice_desenvolvimento'] += 1.0
+    divergencias = verificar_consistencia(dataset)
+    assert divergencias == ["regiao (sem filtros): coluna 'soma_indice_desenvolvimento' difere"]
@@ -0,0 +1,39 @@
+import pytest
+
+from painel.cubo import Cubo
+from painel.filtros import COLUNA_REGIAO, IndiceFiltros
+from painel.paralelo import CuboParticionado, criar_executor
+from painel.pipeline import preparar_dataset
+from painel.sintetico import gerar_pesquisa
+from tests.referencias import assert_cubos_iguais
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preparar_dataset(gerar_pesquisa(12000, seed=5, nulos=0.01))
+
+
+@pytest.fixture(scope='module')
+def linhas(df):
+    return IndiceFiltros(df).selecionar(regioes=list(df[COLUNA_REGIAO].cat.categories[:3]), faixa_etaria=(12, 48))
+
+
+def test_sem_pool_igual_ao_cubo_de_um_nucleo(df, linhas):
+    particionado = CuboParticionado(df)
+    try:
+        assert_cubos_iguais(Cubo.construir(df), particionado.construir())
+        assert_cubos_iguais(Cubo.construir(df, linhas=linhas), particionado.construir(linhas=linhas))
+    finally:
+        particionado.fechar()
+
+
+def test_pool_igual_ao_cubo_de_um_nucleo(df, linhas):
+    with criar_executor(2) as executor:
+        particionado = CuboParticionado(df, executor=executor, processos=2, min_linhas=1000)
+        try:
+            assert len(particionado._faixas(len(df))) == 2
+            assert_cubos_iguais(Cubo.construir(df), particionado.construir())
+            assert_cubos_iguais(Cubo.construir(df, linhas=linhas), particionado.construir(linhas=linhas))
+            assert_cubos_iguais(Cubo.construir(df, linhas=[]), particionado.construir(linhas=[]))
+        finally:
+            particionado.fechar()
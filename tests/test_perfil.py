@@ -0,0 +1,39 @@
+import builtins
+import sys
+
+from painel.perfil import PerfilInicializacao
+
+
+def test_cronometra_so_o_import_de_nivel_mais_alto(tmp_path, monkeypatch):
+    (tmp_path / 'modulo_perfil_interno.py').write_text("VALOR = 1\n")
+    (tmp_path / 'modulo_perfil_externo.py').write_text("import modulo_perfil_interno\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    perfil = PerfilInicializacao()
+    original = builtins.__import__
+    perfil.ativar()
+    perfil.ativar()
+    try:
+        perfil.iniciar_execucao()
+        import modulo_perfil_externo  # noqa: F401
+        import modulo_perfil_externo  # noqa: F401,F811
+        perfil.fim_execucao()
+    finally:
+        perfil.desativar()
+        sys.modules.pop('modulo_perfil_externo', None)
+        sys.modules.pop('modulo_perfil_interno', None)
+    assert builtins.__import__ is original and not perfil.ativo
+    assert [(r.modulo, r.execucao) for r in perfil.imports] == [('modulo_perfil_externo', 1)]
+
+
+def test_boot_e_historico_limitado_das_execucoes():
+    perfil = PerfilInicializacao(max_execucoes=3)
+    assert perfil.fim_execucao() is None
+    segundos = []
+    for _ in range(5):
+        perfil.iniciar_execucao()
+        segundos.append(perfil.fim_execucao())
+    assert perfil.boot == segundos[0]
+    assert perfil.total_execucoes == 5
+    assert list(perfil.execucoes) == segundos[-3:]
+    assert perfil.resumo().startswith("boot:")
+    assert "4 reruns" in perfil.resumo()
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from painel.beneficios import COLUNA_BENEFICIOS, COLUNA_MASCARA
+from painel.ingestao import COLUNA_IDADE_MESES
+from painel.pipeline import FAIXAS_ETARIAS, ROTULOS_FAIXAS, preparar_dataset
+from painel.recodificacao import RECODIFICACOES
+from painel.sintetico import gerar_pesquisa
+from tests.referencias import RECODIFICACOES_LEGADAS
+
+
+def test_colunas_derivadas_iguais_ao_calculo_por_linha():
+    bruto = gerar_pesquisa(4000, seed=4, nulos=0.03)
+    colunas = list(bruto.columns)
+    df = preparar_dataset(bruto)
+    assert list(bruto.columns) == colunas  # o frame de entrada não muda
+    scores = {}
+    for nome, funcao in RECODIFICACOES_LEGADAS.items():
+        scores[nome] = bruto[RECODIFICACOES[nome].coluna].astype(object).apply(funcao).to_numpy(dtype='float64')
+        np.testing.assert_array_equal(df[nome].to_numpy(), scores[nome])
+    np.testing.assert_allclose(df['indice_desenvolvimento'], sum(scores.values()) / 3)
+    faixas = pd.cut(df[COLUNA_IDADE_MESES], bins=FAIXAS_ETARIAS, labels=ROTULOS_FAIXAS)
+    pd.testing.assert_series_equal(df['FaixaEtaria'], faixas, check_names=False)
+    assert df['FaixaEtaria'].cat.ordered
+
+
+def test_sem_coluna_de_beneficios_a_mascara_e_zero():
+    bruto = gerar_pesquisa(200, seed=1).drop(columns=[COLUNA_BENEFICIOS])
+    mascara = preparar_dataset(bruto)[COLUNA_MASCARA]
+    assert mascara.dtype == np.uint8 and not mascara.any()
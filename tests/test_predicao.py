@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from painel import predicao
+from painel.cache import CacheLRU
+from painel.predicao import (
+    CODIFICADOR, MAPEAMENTO_ALIMENTOS_REVERSO, PreditorMemorizado, linhas_unicas, prever_dataset,
+    probabilidades_em_lote
+)
+from tests.referencias import floresta, frame_questionario
+
+
+@pytest.fixture(scope='module')
+def modelo():
+    return floresta()
+
+
+def test_lote_em_blocos_igual_ao_predict_proba(modelo):
+    X, validas = CODIFICADOR.codificar(frame_questionario(1000, seed=2))
+    X = X[validas]
+    esperado = modelo.predict_proba(X)
+    np.testing.assert_array_equal(probabilidades_em_lote(modelo, X, tamanho_bloco=128, n_jobs=2), esperado)
+    assert probabilidades_em_lote(modelo, X[:0]).shape == (0, len(modelo.classes_))
+
+
+def test_prever_dataset_igual_ao_modelo_linha_a_linha(modelo):
+    df = frame_questionario(2000, seed=3, distintas=300)
+    X, validas = CODIFICADOR.codificar(df)
+    probabilidades = modelo.predict_proba(X[validas])
+    esperado = [MAPEAMENTO_ALIMENTOS_REVERSO[c] for c in modelo.classes_[probabilidades.argmax(axis=1)]]
+
+    for cache in (None, CacheLRU()):
+        for _ in range(2):  # com cache, a segunda passada não chega ao modelo
+            resultados, relatorio = prever_dataset(modelo, df, tamanho_bloco=100, cache=cache)
+            assert (relatorio.linhas, relatorio.validas) == (len(df), int(validas.sum()))
+            assert relatorio.unicas == len(linhas_unicas(X[validas])[0]) < relatorio.validas
+            assert list(resultados['Alimentação Prevista'][validas]) == esperado
+            np.testing.assert_array_equal(resultados['Confiança'].to_numpy()[validas], probabilidades.max(axis=1))
+            assert resultados['Alimentação Prevista'][~validas].isna().all()
+            assert resultados['Confiança'][~validas].isna().all()
+    assert cache.estatisticas().acertos == relatorio.unicas
+
+
+def test_codificar_frame_igual_a_codificar_linha():
+    df = frame_questionario(400, seed=4, nulos=0.05)
+    X, validas = CODIFICADOR.codificar(df)
+    assert X.dtype == np.float32 and X.flags.c_contiguous and X.shape == (len(df), len(CODIFICADOR.nomes))
+    for i, linha in enumerate(df.astype(object).where(df.notna(), None).to_dict('records')):
+        np.testing.assert_array_equal(X[i:i + 1], CODIFICADOR.codificar_linha(linha))
+    np.testing.assert_array_equal(validas, ~np.isnan(X).any(axis=1))
+    with pytest.raises(KeyError, match='Região'):
+        CODIFICADOR.codificar(df.drop(columns=['Região']))
+
+
+def test_memo_pontua_cada_vetor_distinto_uma_vez(modelo, monkeypatch):
+    X, validas = CODIFICADOR.codificar(frame_questionario(600, seed=5, distintas=50))
+    X = X[validas]
+    pontuadas = []
+
+    def pontuar(linhas):
+        pontuadas.append(len(linhas))
+        return modelo.predict_proba(linhas)
+
+    preditor = PreditorMemorizado(modelo, CacheLRU(), pontuar)
+    np.testing.assert_array_equal(preditor.predict_proba(X[:300]), modelo.predict_proba(X[:300]))
+    np.testing.assert_array_equal(preditor.predict(X), modelo.predict(X))
+    assert sum(pontuadas) == len(linhas_unicas(X)[0])
+
+    # prever_dataset deduplica uma vez e passa as linhas distintas direto ao memo
+    chamadas = []
+    original = predicao.linhas_unicas
+    monkeypatch.setattr(predicao, 'linhas_unicas', lambda atributos: chamadas.append(1) or original(atributos))
+    prever_dataset(modelo, frame_questionario(600, seed=5, distintas=50), cache=CacheLRU())
+    assert len(chamadas) == 1
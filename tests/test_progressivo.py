@@ -0,0 +1,40 @@
+import threading
+
+from painel.progressivo import CalculosEmSegundoPlano
+
+
+def test_aguardar_devolve_none_ate_ficar_pronto():
+    calculos = CalculosEmSegundoPlano()
+    liberar = threading.Event()
+    futuro = calculos.iniciar('a', lambda: liberar.wait(5) and 42)
+    assert calculos.aguardar(futuro, 0.01) is None
+    assert calculos.falha(futuro) is None
+    # mesma chave em andamento: o futuro é reaproveitado, não reagendado
+    assert calculos.iniciar('a', lambda: 0) is futuro
+    liberar.set()
+    assert calculos.aguardar(futuro, 5) == 42
+
+
+def test_falha_e_exposta_e_reagendada():
+    calculos = CalculosEmSegundoPlano()
+    erro = RuntimeError("cubo")
+
+    def falhar():
+        raise erro
+
+    futuro = calculos.iniciar('a', falhar)
+    assert calculos.aguardar(futuro, 5) is None
+    assert calculos.falha(futuro) is erro
+    novo = calculos.iniciar('a', lambda: 7)
+    assert novo is not futuro
+    assert calculos.aguardar(novo, 5) == 7
+    assert calculos.iniciar('a', lambda: 8) is novo
+
+
+def test_descarta_os_mais_antigos_terminados():
+    calculos = CalculosEmSegundoPlano(max_itens=2)
+    futuros = [calculos.iniciar(i, lambda i=i: i) for i in range(4)]
+    for futuro in futuros:
+        calculos.aguardar(futuro, 5)
+    calculos.iniciar(4, lambda: 4)
+    assert calculos.iniciar(0, lambda: 'de novo') is not futuros[0]
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.recodificacao import RECODIFICACOES, Recodificacao
+from painel.sintetico import gerar_pesquisa
+from tests.referencias import RECODIFICACOES_LEGADAS
+
+
+@pytest.mark.parametrize('nome', sorted(RECODIFICACOES_LEGADAS))
+def test_vetorizado_igual_ao_apply_por_linha(nome):
+    regra = RECODIFICACOES[nome]
+    serie = gerar_pesquisa(5000, seed=3, colunas=[regra.coluna], nulos=0.05)[regra.coluna]
+    esperado = serie.astype(object).apply(RECODIFICACOES_LEGADAS[nome]).to_numpy(dtype='float64')
+    np.testing.assert_array_equal(regra.aplicar(serie), esperado)
+    # coluna object (sem esquema tipado) passa pelo factorize
+    np.testing.assert_array_equal(regra.aplicar(serie.astype(object)), esperado)
+
+
+def test_valores_fora_das_regras_recebem_o_padrao():
+    serie = pd.Series([' SIM ', 'Não', 'talvez', None, 3], dtype=object)
+    np.testing.assert_array_equal(RECODIFICACOES['cozinha_score'].aplicar(serie), [1.0, 0.0, 0.0, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        Recodificacao('x', (), modo='regex')
@@ -0,0 +1,21 @@
+import io
+
+import pandas as pd
+import pytest
+
+from painel.ingestao import read_survey
+from painel.sintetico import gerar_pesquisa, gerar_respostas
+
+
+@pytest.mark.parametrize('nulos', [0.0, 0.02])
+def test_esquema_igual_ao_da_leitura_do_csv(nulos):
+    arquivo = io.BytesIO()
+    gerar_respostas(3000, seed=1, nulos=nulos).to_csv(arquivo, index=False)
+    arquivo.seek(0)
+    lido, _ = read_survey(arquivo)
+    pd.testing.assert_frame_equal(gerar_pesquisa(3000, seed=1, nulos=nulos), lido)
+
+
+def test_mesma_semente_mesmo_frame():
+    pd.testing.assert_frame_equal(gerar_pesquisa(2000, seed=7), gerar_pesquisa(2000, seed=7))
+    assert not gerar_pesquisa(2000, seed=7).equals(gerar_pesquisa(2000, seed=8))